@@ -14,7 +14,7 @@ print(f"Total profiles: {profiles.count()}")
 # Check each profile
 for profile in profiles:
     print(f"\nProfile for user: {profile.user.username}")
-    print(f"Selected universities: {profile.selected_universities}")
+    print(f"Selected universities: {profile.selected_university_ids()}")
     print(f"Subscription package: {profile.subscription_package}")
     print(f"Application count: {profile.application_count}")
     print(f"Marks: {profile.marks}")
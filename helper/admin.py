@@ -19,17 +19,17 @@ class DocumentUploadAdmin(admin.ModelAdmin):
 
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'subscription_package', 'stored_aps_score', 'application_count', 'whatsapp_enabled')
-    list_filter = ('subscription_package', 'whatsapp_enabled')
+    list_display = ('user', 'subscription_package', 'subscription_active', 'stored_aps_score', 'application_count', 'whatsapp_enabled')
+    list_filter = ('subscription_package', 'subscription_active', 'whatsapp_enabled')
     search_fields = ('user__username', 'user__email', 'phone_number')
     raw_id_fields = ('user',)
-    readonly_fields = ('stored_aps_score',)
+    readonly_fields = ('stored_aps_score', 'subscription_active', 'application_count')
 
 @admin.register(ApplicationStatus)
 class ApplicationStatusAdmin(admin.ModelAdmin):
     def university_name(self, obj):
         uni = get_university_by_id(obj.university_id)
-        return uni['name'] if uni else 'Unknown'
+        return uni.name if uni else 'Unknown'
     university_name.short_description = 'University'
 
     list_display = ('student', 'university_name', 'status', 'application_date', 'last_updated', 'payment_verified')
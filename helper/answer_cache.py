@@ -0,0 +1,271 @@
+# helper/answer_cache.py
+
+"""
+Semantic cache of chat answers, so repeated questions skip the paid LLM call.
+
+Answers are stored per partition of profile facets (APS band and subscription
+package), since the same question may deserve a different answer for a
+different student. Within a partition, a question first tries an exact match on
+its normalized text and then a TF-IDF cosine match against the cached
+questions. Terms are lightly stemmed (plural "s", "ed", "ing"), so "what APS is
+needed for Wits?" finds "What APS do I need for Wits?". Only cached questions
+sharing a term with the query are scored, through an inverted index, and only
+those naming the same universities, faculties, courses and numbers, and
+negated the same way, can match: "do I need maths?" never reuses the answer to
+"do I not need maths?". Entries expire after ANSWER_CACHE_TTL seconds and the least
+recently used are evicted beyond ANSWER_CACHE_MAX_ENTRIES. The cache and its
+hit, miss and tokens-saved counters are per process.
+"""
+
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .faculty_index import get_faculty_index
+from .search import abbreviation_of, normalize, without_abbreviation
+from .university_filters import APS_BUCKET_SIZE
+from .university_static_data import get_catalog
+
+# Filler words that do not change what is being asked. Question words (what,
+# when, how...) stay, since "when" and "how much" ask different things.
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'am', 'be', 'do', 'does', 'did', 'i', 'me', 'my', 'we', 'you',
+    'your', 'it', 'its', 'for', 'to', 'of', 'in', 'at', 'on', 'and', 'or', 'please', 'can', 'could',
+    'would', 'tell', 'about', 'know', 'want', 'there', 'this', 'that', 'with', 'hi', 'hello', 'hey',
+})
+
+# Words shared by many institution, faculty or course names, which do not identify one
+_GENERIC_NAME_WORDS = frozenset({
+    'university', 'universities', 'college', 'colleges', 'tvet', 'technology', 'institute', 'school',
+    'south', 'africa', 'african', 'national', 'central', 'campus', 'faculty', 'sciences', 'science',
+    'studies', 'the', 'of', 'and', 'for',
+})
+
+
+# Words that turn a question around. "don't" normalizes to "don t", so the lone
+# "t" of a contraction counts too.
+NEGATION_WORDS = frozenset({
+    'not', 'no', 'never', 'nor', 'without', 'cannot', 't', 'dont', 'doesnt', 'didnt', 'cant', 'isnt',
+    'arent', 'wasnt', 'wont', 'havent', 'hasnt', 'shouldnt', 'wouldnt', 'couldnt',
+})
+
+# Shortest stem left after removing a suffix, so "aps" and "fees" keep their meaning
+_MIN_STEM = 3
+
+
+def stem(word):
+    """Strip a plural "s", "ed" or "ing" from ``word``: "needed" and "needs" become "need"."""
+    for suffix in ('ing', 'ed', 's'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM and not word.endswith('ss'):
+            return word[:-len(suffix)]
+    return word
+
+
+def question_terms(normalized):
+    """Return the term counts of a normalized question's stemmed content words."""
+    return Counter(stem(word) for word in normalized.split() if word not in STOP_WORDS)
+
+
+def question_anchors(normalized):
+    """
+    Return the words of a question that must match exactly for an answer to be reused.
+
+    These are numbers and the catalog words naming a university (its
+    abbreviation or a distinctive word of its name), a faculty or a course:
+    "fees at UCT" and "fees at UJ" differ in one word, but need different
+    answers whatever their similarity. Any negation adds the anchor "not", so
+    a negated question only matches another negated one.
+    """
+    vocabulary = _anchor_vocabulary(get_catalog().version)
+    words = normalized.split()
+    anchors = {word for word in words if word.isdigit() or word in vocabulary}
+    if NEGATION_WORDS.intersection(words):
+        anchors.add('not')
+    return frozenset(anchors)
+
+
+@lru_cache(maxsize=None)
+def _anchor_vocabulary(catalog_version):
+    words = set()
+    for uni in get_catalog():
+        abbreviation = abbreviation_of(uni.name)
+        if abbreviation:
+            words.update(normalize(abbreviation).split())
+        words.update(normalize(without_abbreviation(uni.name)).split())
+    index = get_faculty_index()
+    for name in (*index.university_ids_by_faculty, *index.course_names.values()):
+        words.update(normalize(name).split())
+    return frozenset(words - _GENERIC_NAME_WORDS - STOP_WORDS)
+
+
+def profile_facets(profile):
+    """Return the partition key of a student: (APS band, subscription package)."""
+    aps = profile.stored_aps_score
+    band = aps - aps % APS_BUCKET_SIZE if aps is not None else None
+    return band, profile.subscription_package
+
+
+def estimate_tokens(*texts):
+    """Rough token count (about four characters per token) for answers without usage data."""
+    return sum(math.ceil(len(text) / 4) for text in texts if text)
+
+
+class CachedAnswer(NamedTuple):
+    answer: str
+    similarity: float
+    question: str   # The cached question that matched
+
+
+class _Entry:
+    __slots__ = ('question', 'terms', 'anchors', 'answer', 'tokens', 'expires_at')
+
+    def __init__(self, question, terms, anchors, answer, tokens, expires_at):
+        self.question = question
+        self.terms = terms
+        self.anchors = anchors
+        self.answer = answer
+        self.tokens = tokens
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    """TF-IDF matched answer cache with TTL and LRU eviction, safe across threads."""
+
+    def __init__(self, max_entries, ttl, threshold):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries = OrderedDict()        # (facets, normalized question) -> _Entry, LRU first
+        # Entry keys in insertion order; every entry lives for the same ttl, so this is expiry order too
+        self._expiry = OrderedDict()         # (facets, normalized question) -> expires_at, soonest first
+        self._postings = {}                  # (facets, term) -> set of entry keys
+        self._document_frequency = Counter() # term -> number of cached questions containing it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def lookup(self, question, facets, now=None):
+        """Return a CachedAnswer for ``question`` asked by a student with ``facets``, or None."""
+        now = now if now is not None else time.monotonic()
+        normalized = normalize(question)
+        with self._lock:
+            entry_key = (facets, normalized)
+            entry = self._entries.get(entry_key)
+            similarity = 1.0
+            if entry is None or entry.expires_at <= now:
+                entry_key, similarity = self._most_similar(
+                    facets, question_terms(normalized), question_anchors(normalized), now
+                )
+                entry = self._entries.get(entry_key) if entry_key else None
+
+            if entry is None or entry.expires_at <= now or similarity < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            self.tokens_saved += entry.tokens
+            return CachedAnswer(entry.answer, similarity, entry.question)
+
+    def store(self, question, facets, answer, tokens, now=None):
+        """Cache ``answer`` to ``question`` for students with ``facets``; ``tokens`` is what it cost."""
+        now = now if now is not None else time.monotonic()
+        normalized = normalize(question)
+        terms = question_terms(normalized)
+        if not terms:
+            return
+        with self._lock:
+            key = (facets, normalized)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(normalized, terms, question_anchors(normalized), answer, tokens,
+                                        now + self.ttl)
+            self._expiry[key] = now + self.ttl
+            for term in terms:
+                self._postings.setdefault((facets, term), set()).add(key)
+                self._document_frequency[term] += 1
+            self._evict(now)
+
+    def _most_similar(self, facets, terms, anchors, now):
+        if not terms:
+            return None, 0.0
+        total = len(self._entries) + 1
+
+        def idf(term):
+            return math.log(total / (1 + self._document_frequency[term])) + 1
+
+        query = {term: count * idf(term) for term, count in terms.items()}
+        query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+
+        candidates = set()
+        for term in terms:
+            candidates |= self._postings.get((facets, term), set())
+
+        best_key, best_score = None, 0.0
+        for key in candidates:
+            entry = self._entries[key]
+            if entry.expires_at <= now or entry.anchors != anchors:
+                continue
+            weights = {term: count * idf(term) for term, count in entry.terms.items()}
+            dot = sum(weight * weights.get(term, 0.0) for term, weight in query.items())
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            score = dot / (query_norm * norm)
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        del self._expiry[key]
+        facets = key[0]
+        for term in entry.terms:
+            postings = self._postings.get((facets, term))
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[(facets, term)]
+            self._document_frequency[term] -= 1
+            if self._document_frequency[term] <= 0:
+                del self._document_frequency[term]
+
+    def _evict(self, now):
+        # Only the expired head of the expiry order and the LRU head are visited, not every entry
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def stats(self):
+        """Return entry count, hit/miss counts, hit rate and tokens saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'tokens_saved': self.tokens_saved,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+            self._postings.clear()
+            self._document_frequency.clear()
+            self.hits = self.misses = self.tokens_saved = 0
+
+
+answer_cache = AnswerCache(
+    settings.ANSWER_CACHE_MAX_ENTRIES,
+    settings.ANSWER_CACHE_TTL,
+    settings.ANSWER_CACHE_SIMILARITY,
+)
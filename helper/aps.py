@@ -0,0 +1,104 @@
+# helper/aps.py
+
+"""
+APS (Admission Point Score) calculation for NSC marks.
+
+APS is the sum of points for the best 6 subjects, excluding Life Orientation:
+80-100% = 7, 70-79% = 6, 60-69% = 5, 50-59% = 4, 40-49% = 3, 30-39% = 2, 0-29% = 1.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+LIFE_ORIENTATION = 'Life Orientation'
+SUBJECT_COUNT = 7
+COUNTED_SUBJECTS = 6
+
+# Lower bound (inclusive) of each band from 2 to 7 points; anything below scores 1.
+POINT_BOUNDARIES = np.array([30, 40, 50, 60, 70, 80])
+
+# Points for every whole-number mark from 0 to 100. The band boundaries are whole
+# numbers, so a fractional mark scores the same as its integer part.
+POINTS_BY_MARK = tuple(int(points) for points in np.digitize(np.arange(101), POINT_BOUNDARIES) + 1)
+
+
+def counted_marks(marks):
+    """
+    Validate a marks dictionary and return the 6 marks that count towards APS.
+
+    Returns None unless there are exactly 7 numeric marks between 0 and 100.
+    Life Orientation never counts; without it, the best 6 of the 7 marks do.
+    """
+    if not marks or not isinstance(marks, dict) or len(marks) != SUBJECT_COUNT:
+        return None
+
+    values = []
+    for subject, mark in marks.items():
+        if mark is None:
+            return None
+        try:
+            mark = float(mark)
+        except (ValueError, TypeError):
+            return None
+        if not 0 <= mark <= 100:
+            return None
+        if subject == LIFE_ORIENTATION:
+            continue
+        values.append(mark)
+
+    # Points rise with the mark, so the best 6 marks score the best 6 points
+    return sorted(values, reverse=True)[:COUNTED_SUBJECTS]
+
+
+def calculate_aps(marks):
+    """
+    Calculate the APS for one student's marks dictionary.
+
+    Returns None if the marks are invalid (see counted_marks). Results are
+    cached on the frozen marks, so re-scoring unchanged marks is a dict hit.
+    """
+    if not marks or not isinstance(marks, dict):
+        return None
+    try:
+        frozen_marks = tuple(sorted(marks.items()))
+        return _calculate_frozen_aps(frozen_marks)
+    except TypeError:
+        # Unhashable or unorderable values; score without the cache.
+        return _score(marks)
+
+
+@lru_cache(maxsize=4096)
+def _calculate_frozen_aps(frozen_marks):
+    return _score(dict(frozen_marks))
+
+
+def _score(marks):
+    values = counted_marks(marks)
+    if values is None:
+        return None
+    return sum(POINTS_BY_MARK[int(mark)] for mark in values)
+
+
+def batch_calculate_aps(marks_list):
+    """
+    Calculate APS for many students in one vectorized pass.
+
+    Args:
+        marks_list: Sequence of marks dictionaries (subject -> mark).
+
+    Returns:
+        List with the APS for each entry, or None where the marks are invalid.
+    """
+    matrix = np.zeros((len(marks_list), COUNTED_SUBJECTS))
+    valid = np.zeros(len(marks_list), dtype=bool)
+    for row, marks in enumerate(marks_list):
+        values = counted_marks(marks)
+        if values is not None:
+            matrix[row] = values
+            valid[row] = True
+
+    # digitize gives the band index 0..6; points are one higher.
+    points = np.digitize(matrix, POINT_BOUNDARIES) + 1
+    scores = points.sum(axis=1)
+    return [int(score) if is_valid else None for score, is_valid in zip(scores, valid)]
@@ -0,0 +1,79 @@
+# helper/auto_verification.py
+
+"""
+The 24-hour auto-verification rule for uploaded payment proofs.
+
+Proofs that have waited longer than AUTO_VERIFY_AFTER without being reviewed
+are treated as verified. The sweep applies that rule in bulk from a background
+job, so read requests only ever display the state and never write it.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .dashboard_cache import invalidate_dashboard_contexts
+from .models import PAYMENT_DOCUMENT_TYPES, ApplicationStatus, DocumentUpload
+from .payment_status_markers import touch_payment_statuses
+from .subscriptions import SUBSCRIPTION_DOCUMENT_TYPE, sync_subscription_active
+
+logger = logging.getLogger('helper')
+
+AUTO_VERIFY_AFTER = timedelta(hours=24)
+AUTO_VERIFIED_DOCUMENT_TYPES = PAYMENT_DOCUMENT_TYPES
+
+
+def is_auto_verified(document, now=None):
+    """Return True if ``document`` is verified or has waited out the auto-verification period."""
+    now = now or timezone.now()
+    return document.verified or now - document.uploaded_at >= AUTO_VERIFY_AFTER
+
+
+def auto_verify_payments(now=None):
+    """
+    Mark overdue payment documents and their applications as verified.
+
+    Runs one UPDATE for documents uploaded before ``now - AUTO_VERIFY_AFTER`` and
+    one for applications that have such a payment proof.
+
+    Returns:
+        Tuple of (documents verified, applications verified).
+    """
+    now = now or timezone.now()
+    cutoff = now - AUTO_VERIFY_AFTER
+    overdue_proofs = DocumentUpload.objects.filter(
+        user=OuterRef('student__user'),
+        university=OuterRef('university'),
+        document_type='payment_proof',
+        uploaded_at__lt=cutoff,
+    )
+    overdue_documents = DocumentUpload.objects.filter(
+        document_type__in=AUTO_VERIFIED_DOCUMENT_TYPES,
+        verified=False,
+        uploaded_at__lt=cutoff,
+    )
+    with transaction.atomic():
+        # update() sends no post_save, so collect the students whose dashboards go stale
+        overdue = list(overdue_documents.values_list('user_id', 'document_type'))
+        affected_users = {user_id for user_id, _ in overdue}
+        documents = overdue_documents.update(verified=True, verification_date=now)
+        # ...nor does it reach the subscription_active flag
+        sync_subscription_active({
+            user_id for user_id, document_type in overdue if document_type == SUBSCRIPTION_DOCUMENT_TYPE
+        })
+        overdue_applications = ApplicationStatus.objects.filter(
+            Exists(overdue_proofs),
+            payment_verified=False,
+        )
+        affected_users.update(overdue_applications.values_list('student__user_id', flat=True))
+        applications = overdue_applications.update(payment_verified=True, last_updated=now)
+        # ...nor does it move the payment status stream's change markers
+        touch_payment_statuses(affected_users)
+    if affected_users:
+        invalidate_dashboard_contexts(affected_users)
+    if documents or applications:
+        logger.info(f"Auto-verified {documents} payment documents and {applications} applications")
+    return documents, applications
@@ -0,0 +1,135 @@
+# helper/autocomplete.py
+
+"""
+Prefix-trie autocomplete over NSC subjects, university names and course names.
+
+Entries are indexed by their full name and by every word in it ("sciences"
+finds "Physical Sciences"); universities additionally by their abbreviation.
+The tries are built once per catalog version, and a completion only walks the
+subtree under the typed prefix, so responses stay small and cheap to produce.
+"""
+
+from functools import lru_cache
+
+from .faculty_index import get_faculty_index
+from .nsc_subjects import NSC_SUBJECTS, subject_group
+from .search import abbreviation_of, normalize
+from .university_static_data import get_catalog
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class _Node:
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        self.children = {}
+        self.values = []
+
+
+class PrefixTrie:
+    """Maps normalized keys to values and returns the values under a prefix."""
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, key, value):
+        node = self._root
+        for char in normalize(key):
+            node = node.children.setdefault(char, _Node())
+        if value not in node.values:
+            node.values.append(value)
+
+    def complete(self, prefix, limit=DEFAULT_LIMIT, predicate=None):
+        """
+        Return up to ``limit`` distinct values whose key starts with ``prefix``.
+
+        Shorter keys come first, then alphabetical order, so the closest
+        completions win when results are cut off.
+        """
+        node = self._root
+        for char in normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        results = []
+        seen = set()
+        level = [node]
+        # Breadth-first: every key at depth n is shorter than those at depth n + 1
+        while level and len(results) < limit:
+            next_level = []
+            for current in level:
+                for value in current.values:
+                    if value not in seen and (predicate is None or predicate(value)):
+                        seen.add(value)
+                        results.append(value)
+                        if len(results) >= limit:
+                            return results
+                next_level.extend(current.children[char] for char in sorted(current.children))
+            level = next_level
+        return results
+
+
+def _index_words(trie, text, value):
+    """Insert ``value`` under ``text`` and under every word-suffix of it."""
+    words = normalize(text).split()
+    for start in range(len(words)):
+        trie.insert(' '.join(words[start:]), value)
+
+
+@lru_cache(maxsize=None)
+def _build_tries(catalog_version):
+    subjects = PrefixTrie()
+    for subject in NSC_SUBJECTS['compulsory'] + NSC_SUBJECTS['elective']:
+        _index_words(subjects, subject, ('subject', subject, subject_group(subject), None))
+
+    universities = PrefixTrie()
+    for uni in get_catalog():
+        value = ('university', uni.name, None, uni.id)
+        _index_words(universities, uni.name, value)
+        abbreviation = abbreviation_of(uni.name)
+        if abbreviation:
+            universities.insert(abbreviation, value)
+
+    courses = PrefixTrie()
+    for course in get_faculty_index().course_names.values():
+        _index_words(courses, course, ('course', course, None, None))
+
+    return {'subject': subjects, 'university': universities, 'course': courses}
+
+
+def autocomplete(prefix, kind='subject', group=None, limit=DEFAULT_LIMIT):
+    """
+    Return completions for ``prefix`` as JSON-ready dictionaries.
+
+    Args:
+        prefix: What the user has typed so far; an empty prefix lists everything.
+        kind: 'subject', 'university' or 'course'.
+        group: For subjects, optionally restrict to one subject_group().
+        limit: Maximum number of results (capped at MAX_LIMIT).
+
+    Returns:
+        Tuple of result dictionaries; cached, so callers must not mutate them.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    return _complete(get_catalog().version, normalize(prefix), kind, group, limit)
+
+
+@lru_cache(maxsize=1024)
+def _complete(catalog_version, prefix, kind, group, limit):
+    trie = _build_tries(catalog_version).get(kind)
+    if trie is None:
+        return ()
+    predicate = (lambda value: value[2] == group) if group else None
+
+    results = []
+    for value_kind, label, value_group, university_id in trie.complete(prefix, limit, predicate):
+        item = {'type': value_kind, 'value': label}
+        if value_group:
+            item['group'] = value_group
+        if university_id is not None:
+            item['id'] = university_id
+        results.append(item)
+    return tuple(results)
@@ -0,0 +1,125 @@
+# helper/catalog.py
+
+"""
+Indexed, read-only view over the static university data.
+
+The catalog is built once per process from ``UNIVERSITIES`` so that lookups by
+id, name or province are dictionary hits instead of list scans, and the
+APS-ordered listing never has to be re-sorted per request.
+"""
+
+import hashlib
+from types import MappingProxyType
+from typing import NamedTuple, Optional, Tuple
+
+from django.urls import reverse
+
+
+def parse_application_fee(fee: str) -> Tuple[int, Optional[int], bool]:
+    """
+    Parse an application fee label such as "R100", "R220 (on-time), R440 (late)"
+    or "FREE (online), R200 (manual)".
+
+    Returns:
+        Tuple of (on-time amount in rand, late amount or None, is_free).
+        Free and unparseable labels have an amount of 0.
+    """
+    if not fee or 'free' in fee.lower():
+        return 0, None, bool(fee)
+    if 'on-time' in fee.lower():
+        on_time_fee, _, late_fee = fee.partition(',')
+    else:
+        on_time_fee, late_fee = fee, ''
+    on_time_digits = ''.join(filter(str.isdigit, on_time_fee))
+    late_digits = ''.join(filter(str.isdigit, late_fee))
+    return (
+        int(on_time_digits) if on_time_digits else 0,
+        int(late_digits) if late_digits else None,
+        False,
+    )
+
+
+class UniversityRecord(NamedTuple):
+    """An immutable catalog entry with its URLs and fee amounts precomputed."""
+    id: int
+    name: str
+    minimum_aps: int
+    province: str
+    application_fee: str
+    due_date: str
+    description: str
+    detail_url: str
+    select_url: str
+    fee_amount: int
+    late_fee_amount: Optional[int]
+    is_free: bool
+
+    @classmethod
+    def from_dict(cls, uni):
+        fee = uni.get('application_fee', '')
+        fee_amount, late_fee_amount, is_free = parse_application_fee(fee)
+        return cls(
+            id=uni['id'],
+            name=uni['name'],
+            minimum_aps=uni['minimum_aps'],
+            province=uni.get('province', ''),
+            application_fee=fee,
+            due_date=uni.get('due_date', ''),
+            description=uni.get('description', ''),
+            detail_url=reverse('helper:university_detail', args=[uni['id']]),
+            select_url=reverse('helper:select_university', args=[uni['id']]),
+            fee_amount=fee_amount,
+            late_fee_amount=late_fee_amount,
+            is_free=is_free,
+        )
+
+    def as_dict(self):
+        """Return a plain, mutable dictionary copy (e.g. for JSON or template annotation)."""
+        return self._asdict()
+
+
+class UniversityCatalog:
+    """Read-only indexes over a list of university dictionaries."""
+
+    def __init__(self, universities):
+        self.records = tuple(UniversityRecord.from_dict(uni) for uni in universities)
+        self.by_id = MappingProxyType({uni.id: uni for uni in self.records})
+        self.by_name = MappingProxyType({uni.name: uni for uni in self.records})
+
+        by_province = {}
+        for uni in self.records:
+            by_province.setdefault(uni.province, []).append(uni)
+        self.by_province = MappingProxyType(
+            {province: tuple(unis) for province, unis in by_province.items()}
+        )
+
+        # sorted() is stable, so universities with the same minimum APS keep
+        # their catalog order, matching the old per-request sort.
+        self.sorted_by_aps = tuple(sorted(self.records, key=lambda uni: uni.minimum_aps))
+        self.minimum_aps = tuple(uni.minimum_aps for uni in self.sorted_by_aps)
+
+        # Changes whenever any record does, e.g. after a deploy that edits the data
+        self.version = hashlib.md5(repr(self.records).encode(), usedforsecurity=False).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, university_id):
+        """Return the record for ``university_id``, or None if it is unknown."""
+        try:
+            university_id = int(university_id)
+        except (TypeError, ValueError):
+            return None
+        return self.by_id.get(university_id)
+
+    def get_many(self, university_ids):
+        """Return the records for ``university_ids`` in order, skipping unknown IDs."""
+        records = []
+        for university_id in university_ids:
+            uni = self.get(university_id)
+            if uni is not None:
+                records.append(uni)
+        return records
@@ -0,0 +1,312 @@
+# helper/catalog_answers.py
+
+"""
+Answers factual chat questions from the in-memory catalog instead of the LLM.
+
+Questions about a university's minimum APS, application fee, closing date,
+province, open faculties or courses, or about the institutions in a province,
+are answered from ``UNIVERSITIES``, ``FACULTIES_OPEN`` and ``FACULTY_COURSES``
+in microseconds. Universities are recognised by abbreviation ("UCT", "Wits"),
+full name or a distinctive part of it ("Stellenbosch"). A question is only
+answered when every word in it is accounted for by a university, a province,
+an intent keyword or filler, so "can I get into UCT with 35 points?" or "what
+APS do I need for engineering at Wits?" still go to the model: the catalog
+has no answer to them. Fee and cost words only ask for the application fee
+next to "application" or "apply"; "fees at UCT" is about tuition, which the
+catalog does not hold.
+"""
+
+import re
+import threading
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+from .faculty_data import FACULTY_COURSES
+from .faculty_index import get_faculty_index
+from .search import abbreviation_of, normalize, without_abbreviation
+from .university_static_data import get_catalog
+
+_TOKEN_RE = re.compile(r'[A-Za-z0-9]+')
+
+# Intent keywords, by intent, in the order answers are given
+INTENT_KEYWORDS = {
+    'minimum_aps': {'aps', 'points', 'minimum', 'score'},
+    'application_fee': {'fee', 'fees', 'cost', 'costs', 'charge', 'charges', 'price'},
+    'due_date': {'due', 'deadline', 'deadlines', 'closing', 'close', 'closes', 'date', 'dates'},
+    'province': {'province', 'where', 'located', 'location'},
+    'faculties': {'faculty', 'faculties'},
+    'courses': {'course', 'courses', 'programme', 'programmes', 'program', 'programs', 'degree',
+                'degrees', 'qualification', 'qualifications', 'study', 'offer', 'offers', 'offered'},
+    'overview': {'about', 'info', 'information', 'details', 'overview'},
+}
+_INTENT_BY_WORD = {word: intent for intent, words in INTENT_KEYWORDS.items() for word in words}
+
+# Words that make a fee or cost question about the application fee rather than tuition
+_APPLICATION_WORDS = frozenset({'application', 'applications', 'apply', 'applying'})
+
+# Words that do not change which catalog fact is asked for
+FILLER_WORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'what', 'whats', 'which', 'when', 'how', 'much', 'many',
+    'for', 'of', 'at', 'to', 'in', 'on', 'and', 'or', 'by', 'do', 'does', 'did', 'i', 'me', 'my',
+    'it', 'its', 'their', 'there', 'you', 'please', 'tell', 'give', 'show', 'list', 'all', 'any',
+    'can', 'could', 'have', 'has', 'need', 'needed', 'required', 'requirement', 'requirements', 'apply',
+    'applying', 'application', 'applications', 'open', 'available', 'university', 'universities',
+    'uni', 'unis', 'varsity', 'college', 'colleges', 'tvet', 'institution', 'institutions',
+    'hi', 'hello', 'hey', 'thanks',
+})
+
+# Words shared by many institution names, which do not identify one
+_GENERIC_NAME_WORDS = frozenset({'university', 'of', 'the', 'technology', 'tvet', 'college'})
+
+# Abbreviations that are also everyday words only count when written in capitals ("UP", not "up")
+_MIN_LOWERCASE_ABBREVIATION = 3
+
+# Longest university or province alias, in words
+_MAX_ALIAS_WORDS = 6
+
+_PROVINCE_ALIASES = {'kzn': 'KwaZulu-Natal', 'gp': 'Gauteng', 'ec': 'Eastern Cape', 'wc': 'Western Cape'}
+
+
+class CatalogAnswer(NamedTuple):
+    answer: str
+    intents: Tuple[str, ...]
+    university_ids: Tuple[int, ...]
+
+
+class _Aliases(NamedTuple):
+    universities: dict   # normalized alias -> university ID
+    abbreviations: dict  # normalized abbreviation -> university ID
+    provinces: dict      # normalized province name or alias -> province
+
+
+def get_aliases():
+    """Return the university and province aliases for the current catalog."""
+    return _build_aliases(get_catalog().version)
+
+
+@lru_cache(maxsize=None)
+def _build_aliases(catalog_version):
+    catalog = get_catalog()
+    provinces = {normalize(province): province for province in catalog.by_province}
+    provinces.update((alias, province) for alias, province in _PROVINCE_ALIASES.items()
+                     if province in catalog.by_province)
+
+    universities, abbreviations, cores = {}, {}, {}
+    for uni in catalog:
+        abbreviation = abbreviation_of(uni.name)
+        if abbreviation:
+            abbreviations[normalize(abbreviation)] = uni.id
+        full_name = normalize(without_abbreviation(uni.name))
+        universities[full_name] = uni.id
+        core = ' '.join(word for word in full_name.split() if word not in _GENERIC_NAME_WORDS)
+        cores.setdefault(core, set()).add(uni.id)
+
+    # "Stellenbosch" names one university; "Cape Town" (UCT and College of Cape Town) or
+    # "Free State" (also a province) do not
+    for core, ids in cores.items():
+        if core and len(ids) == 1 and core not in provinces and core not in universities:
+            universities[core] = next(iter(ids))
+    return _Aliases(universities, abbreviations, provinces)
+
+
+@lru_cache(maxsize=None)
+def _subject_words(catalog_version, university_id):
+    """Normalized words of a university's open faculties and course names."""
+    index = get_faculty_index()
+    words = set()
+    for faculty in index.faculties_for(university_id):
+        words.update(normalize(faculty).split())
+    for faculty, courses in FACULTY_COURSES.get(get_catalog().get(university_id).name, {}).items():
+        words.update(normalize(faculty).split())
+        for course in courses:
+            words.update(normalize(course).split())
+    return frozenset(words - FILLER_WORDS)
+
+
+def _match_entities(tokens, aliases):
+    """
+    Split question tokens into universities, provinces and leftover words.
+
+    Aliases are matched longest first, so "university of cape town" wins over
+    "cape town". ``tokens`` are ``(original, normalized)`` word pairs.
+    """
+    university_ids, provinces, leftover = [], [], []
+    position = 0
+    while position < len(tokens):
+        for length in range(min(_MAX_ALIAS_WORDS, len(tokens) - position), 0, -1):
+            phrase = ' '.join(word for _, word in tokens[position:position + length])
+            if phrase in aliases.universities:
+                university_ids.append(aliases.universities[phrase])
+                break
+            if phrase in aliases.provinces:
+                provinces.append(aliases.provinces[phrase])
+                break
+            if length == 1 and phrase in aliases.abbreviations:
+                original = tokens[position][0]
+                if len(phrase) >= _MIN_LOWERCASE_ABBREVIATION or original.isupper():
+                    university_ids.append(aliases.abbreviations[phrase])
+                    break
+        else:
+            leftover.append(tokens[position][1])
+            position += 1
+            continue
+        position += length
+    return list(dict.fromkeys(university_ids)), list(dict.fromkeys(provinces)), leftover
+
+
+def answer_catalog_question(question, aps=None):
+    """
+    Answer ``question`` from the catalog, or return None if the model should.
+
+    Args:
+        question: The student's chat message.
+        aps: The student's APS, if known, to compare with a minimum APS.
+
+    Returns:
+        A CatalogAnswer, or None for anything the catalog cannot answer.
+    """
+    tokens = [(word, word.lower()) for word in _TOKEN_RE.findall(question or '')]
+    if not tokens:
+        return None
+    catalog = get_catalog()
+    university_ids, provinces, leftover = _match_entities(tokens, get_aliases())
+
+    intents, subjects = set(), set()
+    for word in leftover:
+        if word in _INTENT_BY_WORD:
+            intents.add(_INTENT_BY_WORD[word])
+        elif word not in FILLER_WORDS:
+            subjects.add(word)
+    if 'application_fee' in intents and not _APPLICATION_WORDS.intersection(leftover):
+        return None
+
+    if university_ids and not provinces:
+        if not intents:
+            return None
+        # Faculty and course names only narrow a faculty or course question
+        if subjects and not (intents & {'faculties', 'courses'} and all(
+            subjects <= _subject_words(catalog.version, university_id) for university_id in university_ids
+        )):
+            return None
+        ordered = tuple(intent for intent in INTENT_KEYWORDS if intent in intents)
+        answers = [_answer_university(catalog.get(university_id), ordered, subjects, aps)
+                   for university_id in university_ids]
+        # Missing faculty or course data: the model may still know
+        if None in answers:
+            return None
+        answer = '\n\n'.join(answers)
+        _record(ordered)
+        return CatalogAnswer(answer, ordered, tuple(university_ids))
+
+    if provinces and not university_ids and not subjects and intents <= {'province'}:
+        kind = _institution_kind(leftover)
+        answer = '\n\n'.join(_answer_province(province, kind) for province in provinces)
+        _record(('province_listing',))
+        return CatalogAnswer(answer, ('province_listing',), ())
+    return None
+
+
+def _institution_kind(words):
+    """'college' or 'university' if the question asks for only one kind of institution."""
+    asks_colleges = bool({'college', 'colleges', 'tvet'} & set(words))
+    asks_universities = bool({'university', 'universities', 'uni', 'unis', 'varsity'} & set(words))
+    if asks_colleges != asks_universities:
+        return 'college' if asks_colleges else 'university'
+    return None
+
+
+def _is_college(uni):
+    return 'TVET' in uni.name or uni.name.startswith('College')
+
+
+def _answer_province(province, kind):
+    unis = [uni for uni in get_catalog().by_province[province]
+            if kind is None or _is_college(uni) == (kind == 'college')]
+    label = {'college': 'colleges', 'university': 'universities'}.get(kind, 'institutions')
+    if not unis:
+        return f"I don't have any {label} in {province} in the catalog."
+    names = '\n'.join(f"- {uni.name} (minimum APS {uni.minimum_aps})" for uni in unis)
+    return f"The {label} in {province} are:\n{names}"
+
+
+def _format_due_date(value):
+    try:
+        due = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    return f"{due.day} {due:%B %Y}"
+
+
+def _answer_university(uni, intents, subjects, aps):
+    """Answer each intent about ``uni``, or return None if the catalog lacks one of the facts."""
+    lines = []
+    for intent in intents:
+        if intent == 'minimum_aps':
+            line = f"The minimum APS for {uni.name} is {uni.minimum_aps}."
+            if aps is not None:
+                if aps >= uni.minimum_aps:
+                    line += f" Your APS of {aps} meets it."
+                else:
+                    line += f" Your APS of {aps} is {uni.minimum_aps - aps} below it."
+            lines.append(line)
+        elif intent == 'application_fee':
+            lines.append(f"The application fee for {uni.name} is {uni.application_fee}.")
+        elif intent == 'due_date':
+            lines.append(f"Applications to {uni.name} close on {_format_due_date(uni.due_date)}.")
+        elif intent == 'province':
+            lines.append(f"{uni.name} is in {uni.province}.")
+        elif intent == 'faculties':
+            lines.append(_answer_faculties(uni, subjects))
+        elif intent == 'courses':
+            lines.append(_answer_courses(uni, subjects))
+        elif intent == 'overview':
+            lines.append(
+                f"{uni.name} ({uni.province}): {uni.description} Minimum APS {uni.minimum_aps}, "
+                f"application fee {uni.application_fee}, applications close on {_format_due_date(uni.due_date)}."
+            )
+    if None in lines:
+        return None
+    return '\n'.join(lines)
+
+
+def _mentions(name, subjects):
+    return not subjects or bool(subjects & set(normalize(name).split()))
+
+
+def _answer_faculties(uni, subjects):
+    faculties = [faculty for faculty in get_faculty_index().faculties_for(uni.id) if _mentions(faculty, subjects)]
+    if not faculties:
+        return None
+    return f"The open faculties at {uni.name} are:\n" + '\n'.join(f"- {faculty}" for faculty in faculties)
+
+
+def _answer_courses(uni, subjects):
+    lines = []
+    for faculty, courses in FACULTY_COURSES.get(uni.name, {}).items():
+        # A faculty named in the question lists all its courses; otherwise match course names
+        matching = list(courses) if _mentions(faculty, subjects) else [
+            course for course in courses if _mentions(course, subjects)
+        ]
+        if matching:
+            lines.append(f"- {faculty}: {', '.join(matching)}")
+    if not lines:
+        return None
+    return f"Courses at {uni.name}:\n" + '\n'.join(lines)
+
+
+_lock = threading.Lock()
+_answered = Counter()
+
+
+def _record(intents):
+    with _lock:
+        _answered.update(intents)
+        _answered['total'] += 1
+
+
+def catalog_answer_stats():
+    """Return how many chat questions the catalog answered, in total and per intent."""
+    with _lock:
+        return dict(_answered)
@@ -0,0 +1,51 @@
+# helper/chat_metrics.py
+
+"""
+In-process latency metrics of streamed chat answers.
+
+Time to first token (request start to the first streamed chunk) is what the
+student perceives as responsiveness; total stream time is what the answer costs
+the worker. The last CHAT_METRICS_WINDOW samples of each are kept per process.
+"""
+
+import threading
+from collections import deque
+
+from django.conf import settings
+
+from .utils import percentile
+
+
+class LatencyWindow:
+    """Ring buffer of millisecond samples with p50/p95, safe across threads."""
+
+    def __init__(self, window):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, ms):
+        with self._lock:
+            self._samples.append(ms)
+
+    def summary(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {'samples': 0, 'p50': None, 'p95': None}
+        return {
+            'samples': len(samples),
+            'p50': round(percentile(samples, 0.5), 2),
+            'p95': round(percentile(samples, 0.95), 2),
+        }
+
+
+time_to_first_token = LatencyWindow(settings.CHAT_METRICS_WINDOW)
+stream_duration = LatencyWindow(settings.CHAT_METRICS_WINDOW)
+
+
+def chat_stream_stats():
+    """Return p50/p95 time to first token and total stream time, in milliseconds."""
+    return {
+        'time_to_first_token_ms': time_to_first_token.summary(),
+        'stream_duration_ms': stream_duration.summary(),
+    }
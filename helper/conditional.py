@@ -0,0 +1,44 @@
+# helper/conditional.py
+
+"""
+Conditional GET support for per-student JSON endpoints.
+
+Views compute a cheap version token (and optionally a last-modified time) up
+front. When the client's If-None-Match / If-Modified-Since still match, a 304
+is returned without building the response body at all.
+"""
+
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def conditional_json_response(request, version, build, last_modified=None, **json_kwargs):
+    """
+    Return a 304 if the client already has ``version``, else ``JsonResponse(build())``.
+
+    Args:
+        request: The current request.
+        version: Token that changes whenever the response body would change.
+        build: Zero-argument callable returning the JSON-ready data, or bytes that
+            are already encoded JSON.
+        last_modified: Optional datetime of the newest change behind ``version``.
+        **json_kwargs: Passed through to JsonResponse (e.g. ``safe=False``).
+    """
+    etag = quote_etag(version)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        data = build()
+        if isinstance(data, bytes):
+            response = HttpResponse(data, content_type='application/json')
+        else:
+            response = JsonResponse(data, **json_kwargs)
+
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    # Per-student data: browsers may keep it, but must revalidate every time
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,90 @@
+# helper/dashboard_cache.py
+
+"""
+Per-student cache of the computed dashboard context.
+
+Entries are stored under the student's user ID together with the profile
+version (``StudentProfile.updated_at``) they were built from, so an entry built
+from an older profile is never served. Saves and deletes of profiles,
+applications and documents drop the entry through the signal handlers in
+``helper.signals``. Hit and miss counts are kept in the cache too, so they are
+shared by every worker.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('helper')
+
+HITS_KEY = 'dashboard-context:hits'
+MISSES_KEY = 'dashboard-context:misses'
+
+
+def _key(user_id):
+    return f'dashboard-context:{user_id}'
+
+
+def profile_version(profile):
+    """Return the version token of ``profile`` that cached contexts are keyed by."""
+    return profile.updated_at.isoformat() if profile.updated_at else ''
+
+
+def get_dashboard_context(profile, build):
+    """
+    Return the cached dashboard context for ``profile``, building it on a miss.
+
+    Args:
+        profile: The student's StudentProfile.
+        build: Zero-argument callable returning the context dictionary. Its values
+            must be picklable (evaluate querysets to lists first).
+    """
+    version = profile_version(profile)
+    entry = cache.get(_key(profile.user_id))
+    if entry is not None and entry.get('version') == version:
+        _count(HITS_KEY)
+        return entry['context']
+
+    _count(MISSES_KEY)
+    context = build()
+    cache.set(
+        _key(profile.user_id),
+        {'version': version, 'context': context},
+        settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+    return context
+
+
+def invalidate_dashboard_context(user_id):
+    """Drop the cached dashboard context of the student with ``user_id``."""
+    cache.delete(_key(user_id))
+
+
+def invalidate_dashboard_contexts(user_ids):
+    """Drop the cached dashboard contexts of several students at once (for bulk updates)."""
+    cache.delete_many([_key(user_id) for user_id in user_ids])
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Counter not created yet (or evicted); add() avoids clobbering a racing worker
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+
+def dashboard_cache_stats():
+    """Return hit/miss counts and the hit rate of the dashboard context cache."""
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else None,
+    }
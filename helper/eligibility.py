@@ -0,0 +1,34 @@
+# helper/eligibility.py
+
+"""
+APS eligibility queries over the catalog's presorted ``minimum_aps`` array.
+
+Every query is a bisect plus a slice of ``catalog.sorted_by_aps``. APS scores
+are integers in a small range (6 to 42 for six subjects), so results are
+memoized per score and shared by every request.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+
+from .university_static_data import get_catalog
+
+# Students this many points above a university's minimum are "highly qualified".
+HIGHLY_QUALIFIED_MARGIN = 5
+
+# Comfortably covers every reachable APS (and a few out-of-range values).
+_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def qualified_universities(aps):
+    """Return universities whose minimum APS is at most ``aps``, lowest minimum first."""
+    catalog = get_catalog()
+    return catalog.sorted_by_aps[:bisect_right(catalog.minimum_aps, aps)]
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def highly_qualified_universities(aps):
+    """Return universities the student exceeds by at least HIGHLY_QUALIFIED_MARGIN points."""
+    return qualified_universities(aps - HIGHLY_QUALIFIED_MARGIN)
+
@@ -0,0 +1,105 @@
+# helper/faculty_index.py
+
+"""
+Inverted faculty and course indexes over ``faculty_data``, keyed by university ID.
+
+``FACULTIES_OPEN`` and ``FACULTY_COURSES`` are keyed by university display name.
+The index resolves those names against the catalog once, so faculty and course
+filters become set intersections over university IDs instead of per-university
+string lookups, and courses become searchable.
+"""
+
+import logging
+from functools import lru_cache
+from types import MappingProxyType
+
+from .faculty_data import FACULTIES_OPEN, FACULTY_COURSES
+from .university_static_data import get_catalog
+
+logger = logging.getLogger('helper')
+
+
+def normalize_course(name):
+    """Normalize a course name for lookups: lower case with single spaces."""
+    return ' '.join((name or '').lower().split())
+
+
+class FacultyIndex:
+    """Faculty and course lookups for the universities in a catalog."""
+
+    def __init__(self, catalog, faculties_open, faculty_courses):
+        faculties_by_university = {}
+        university_ids_by_faculty = {}
+        university_ids_by_course = {}
+        course_names = {}
+
+        unknown = set()
+        for name, faculties in faculties_open.items():
+            uni = catalog.by_name.get(name)
+            if uni is None:
+                unknown.add(name)
+                continue
+            faculties_by_university[uni.id] = tuple(faculties)
+            for faculty in faculties:
+                university_ids_by_faculty.setdefault(faculty, set()).add(uni.id)
+
+        for name, faculties in faculty_courses.items():
+            uni = catalog.by_name.get(name)
+            if uni is None:
+                unknown.add(name)
+                continue
+            for courses in faculties.values():
+                for course in courses:
+                    key = normalize_course(course)
+                    university_ids_by_course.setdefault(key, set()).add(uni.id)
+                    course_names.setdefault(key, course)
+
+        if unknown:
+            logger.warning(f"Faculty data for universities not in the catalog was ignored: {sorted(unknown)}")
+
+        self.faculties_by_university = MappingProxyType(faculties_by_university)
+        self.university_ids_by_faculty = MappingProxyType(
+            {faculty: frozenset(ids) for faculty, ids in university_ids_by_faculty.items()}
+        )
+        self.university_ids_by_course = MappingProxyType(
+            {course: frozenset(ids) for course, ids in university_ids_by_course.items()}
+        )
+        # Display spelling of each normalized course name (first one seen)
+        self.course_names = MappingProxyType(course_names)
+
+    def faculties_for(self, university_id):
+        """Return the open faculties of a university, or an empty tuple."""
+        return self.faculties_by_university.get(university_id, ())
+
+    def university_ids_for_faculty(self, faculty):
+        """Return the IDs of universities with ``faculty`` open."""
+        return self.university_ids_by_faculty.get(faculty, frozenset())
+
+    def university_ids_for_course(self, course):
+        """
+        Return the IDs of universities offering ``course``.
+
+        An exact (normalized) course name is a single lookup; otherwise every
+        course whose name contains the term contributes its universities.
+        """
+        term = normalize_course(course)
+        if not term:
+            return frozenset()
+        exact = self.university_ids_by_course.get(term)
+        if exact is not None:
+            return exact
+        matches = set()
+        for key, ids in self.university_ids_by_course.items():
+            if term in key:
+                matches |= ids
+        return frozenset(matches)
+
+
+def get_faculty_index():
+    """Return the faculty index for the current catalog."""
+    return _build_index(get_catalog().version)
+
+
+@lru_cache(maxsize=None)
+def _build_index(catalog_version):
+    return FacultyIndex(get_catalog(), FACULTIES_OPEN, FACULTY_COURSES)
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import DocumentUpload, StudentProfile, University
+from .nsc_subjects import NSC_SUBJECTS
 from django.core.exceptions import ValidationError
 from django.core import validators
 
@@ -93,7 +94,6 @@ class MarksForm(forms.Form):
     """Form for entering subject marks."""
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        from .views import NSC_SUBJECTS
         
         # Add compulsory subjects first
         for subject in NSC_SUBJECTS['compulsory']:
@@ -169,6 +169,7 @@ class UniversitySearchForm(forms.Form):
     ])
     min_aps = forms.IntegerField(required=False, min_value=20, max_value=48, widget=forms.NumberInput(attrs={'placeholder': 'Minimum APS'}))
     faculty = forms.ChoiceField(required=False, choices=[('', 'All Faculties')])  # Choices will be populated in the view
+    course = forms.CharField(required=False, widget=forms.TextInput(attrs={'placeholder': 'Search courses...'}))
 
 class ChatForm(forms.Form):
     """Form for AI chat interactions."""
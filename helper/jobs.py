@@ -0,0 +1,16 @@
+# helper/jobs.py
+
+"""Background jobs run by the ``run_jobs`` management command."""
+
+from django.conf import settings
+
+from .auto_verification import auto_verify_payments
+from .scheduler import Scheduler
+
+scheduler = Scheduler()
+
+scheduler.add_job(
+    auto_verify_payments,
+    getattr(settings, 'AUTO_VERIFY_INTERVAL_SECONDS', 300),
+    name='auto_verify_payments',
+)
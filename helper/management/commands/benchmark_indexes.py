@@ -0,0 +1,180 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from helper.auto_verification import AUTO_VERIFY_AFTER, AUTO_VERIFIED_DOCUMENT_TYPES
+from helper.models import ApplicationStatus, DocumentUpload, StudentProfile, University
+from helper.university_static_data import get_all_universities
+
+# Indexes added in migration 0005, as (model, index name)
+BENCHMARKED_INDEXES = (
+    (DocumentUpload, 'document_user_type_uni_idx'),
+    (DocumentUpload, 'document_unverified_idx'),
+    (ApplicationStatus, 'application_student_status_idx'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Seed documents and compare query plans and timings of the hot payment lookups '
+            'with and without the composite/partial indexes. Everything is rolled back, but the '
+            'indexes are dropped and recreated on the configured database, which locks its tables '
+            'for the whole run, so it only runs with DEBUG on or with --force.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=100000,
+                            help='Number of documents to seed')
+        parser.add_argument('--students', type=int, default=5000,
+                            help='Number of students the documents are spread over')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Timed runs per query')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed for the generated data')
+        parser.add_argument('--force', action='store_true',
+                            help='Run even with DEBUG off. Never use this against a live database')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError(
+                'benchmark_indexes drops and recreates indexes on the configured database, holding '
+                'exclusive locks on its tables until it finishes. Run it with DEBUG on, or pass '
+                '--force against a database nobody else is using.'
+            )
+        random.seed(options['seed'])
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['documents']} documents for {options['students']} students...")
+            sample = self._seed(options['documents'], options['students'])
+            indexes = [self._index(model, name) for model, name in BENCHMARKED_INDEXES]
+
+            self._set_indexes(indexes, present=False)
+            before = self._measure(sample, options['repeat'], 'Without indexes')
+            self._set_indexes(indexes, present=True)
+            after = self._measure(sample, options['repeat'], 'With indexes')
+
+            self.stdout.write('\n=== Summary (median ms per query) ===')
+            for label in before:
+                speedup = before[label] / after[label] if after[label] else float('inf')
+                self.stdout.write(f'{label:<36} {before[label]:>8.3f} -> {after[label]:>8.3f}  ({speedup:.1f}x)')
+
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Benchmark finished; seeded data rolled back.'))
+
+    def _seed(self, document_count, student_count):
+        now = timezone.now()
+        universities = []
+        for uni in get_all_universities()[:20]:
+            university, _ = University.objects.get_or_create(
+                id=uni.id,
+                defaults={'name': uni.name, 'province': uni.province, 'minimum_aps': uni.minimum_aps,
+                          'application_fee': uni.application_fee or '0', 'due_date': uni.due_date},
+            )
+            universities.append(university)
+
+        users = User.objects.bulk_create(
+            [User(username=f'index-benchmark-{i}', password='!') for i in range(student_count)],
+            batch_size=1000,
+        )
+        profiles = StudentProfile.objects.bulk_create(
+            [StudentProfile(user=user) for user in users], batch_size=1000,
+        )
+
+        applications = []
+        for profile in profiles:
+            for university in random.sample(universities, 5):
+                applications.append(ApplicationStatus(
+                    student=profile, university=university,
+                    status=random.choice(['not_started', 'pending', 'submitted', 'completed']),
+                ))
+        ApplicationStatus.objects.bulk_create(applications, batch_size=5000)
+
+        document_types = [code for code, _ in DocumentUpload.DOCUMENT_TYPES]
+        documents = []
+        for _ in range(document_count):
+            document_type = random.choice(document_types)
+            documents.append(DocumentUpload(
+                user=random.choice(users),
+                document_type=document_type,
+                file='documents/benchmark.pdf',
+                university=random.choice(universities) if document_type == 'payment_proof' else None,
+                # Most documents were reviewed long ago; a small backlog is still waiting
+                verified=random.random() < 0.97,
+            ))
+        DocumentUpload.objects.bulk_create(documents, batch_size=5000)
+        # uploaded_at is auto_now_add, so spread it out after the insert
+        with connection.cursor() as cursor:
+            table = DocumentUpload._meta.db_table
+            for start in range(0, len(documents), 5000):
+                batch = documents[start:start + 5000]
+                cursor.executemany(
+                    f'UPDATE {table} SET uploaded_at = %s WHERE id = %s',
+                    [(now - timedelta(minutes=random.randint(0, 60 * 24 * 90)), doc.id) for doc in batch],
+                )
+
+        user = random.choice(users)
+        return {
+            'user': user,
+            'profile': profiles[users.index(user)],
+            'university': random.choice(universities),
+            'cutoff': now - AUTO_VERIFY_AFTER,
+        }
+
+    def _queries(self, sample):
+        return {
+            'Latest proof for one university': DocumentUpload.objects.filter(
+                user=sample['user'], document_type='payment_proof', university=sample['university'],
+            )[:1],
+            'All payment proofs of a student': DocumentUpload.objects.filter(
+                user=sample['user'], document_type='payment_proof', university__isnull=False,
+            ),
+            'Overdue unverified payments': DocumentUpload.objects.filter(
+                document_type__in=AUTO_VERIFIED_DOCUMENT_TYPES, verified=False, uploaded_at__lt=sample['cutoff'],
+            ).values('id'),
+            'Pending applications of a student': ApplicationStatus.objects.filter(
+                student=sample['profile'], status='pending',
+            ),
+        }
+
+    def _measure(self, sample, repeat, title):
+        self._analyze()
+        self.stdout.write(f'\n=== {title} ===')
+        medians = {}
+        for label, queryset in self._queries(sample).items():
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            medians[label] = statistics.median(timings)
+            self.stdout.write(f'\n{label}: median {medians[label]:.3f} ms')
+            self.stdout.write(queryset.explain())
+        return medians
+
+    def _index(self, model, name):
+        for index in model._meta.indexes:
+            if index.name == name:
+                return model, index
+        raise ValueError(f'{model.__name__} has no index named {name}')
+
+    def _set_indexes(self, indexes, present):
+        # Raw statements rather than the schema editor, which SQLite refuses inside a transaction
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model, index in indexes:
+                if present:
+                    statement = str(index.create_sql(model, editor))
+                else:
+                    statement = editor.sql_delete_index % {
+                        'name': editor.quote_name(index.name),
+                        'table': editor.quote_name(model._meta.db_table),
+                    }
+                cursor.execute(statement)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
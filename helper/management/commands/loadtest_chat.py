@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from helper import openai_client
+from helper.utils import percentile
+
+STUB_COMPLETION = {
+    'id': 'chatcmpl-stub',
+    'object': 'chat.completion',
+    'created': 0,
+    'model': 'stub',
+    'choices': [{
+        'index': 0,
+        'message': {'role': 'assistant', 'content': 'Stub answer.'},
+        'finish_reason': 'stop',
+    }],
+    'usage': {'prompt_tokens': 20, 'completion_tokens': 3, 'total_tokens': 23},
+}
+
+
+class StubUpstream:
+    """Minimal keep-alive HTTP server answering every request with a chat completion after a delay."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.writers = set()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, '127.0.0.1', 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def _shutdown(self):
+        self.server.close()
+        # Closing the sockets ends each handler's read loop, so no handler is left pending
+        for writer in list(self.writers):
+            writer.close()
+        await asyncio.gather(*(task for task in asyncio.all_tasks() if task is not asyncio.current_task()))
+
+    async def _handle(self, reader, writer):
+        body = json.dumps(STUB_COMPLETION).encode()
+        self.writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in head.decode('latin-1').split('\r\n'):
+                    name, _, value = line.partition(':')
+                    if name.lower() == 'content-length':
+                        length = int(value)
+                await reader.readexactly(length)
+
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                await asyncio.sleep(self.latency)
+                self.in_flight -= 1
+
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+
+class Command(BaseCommand):
+    help = ('Load test the chat completion path against a local stub upstream: thread-per-request '
+            '(sync workers) versus one event loop (ASGI worker)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Chat completions to send in each mode')
+        parser.add_argument('--concurrency', type=int, default=200,
+                            help='Completions in flight at once in async mode')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Threads in sync mode (one per sync gunicorn worker)')
+        parser.add_argument('--latency', type=float, default=0.5,
+                            help='Seconds the stub upstream takes per completion')
+
+    def handle(self, *args, **options):
+        messages = [{'role': 'user', 'content': 'What APS do I need for engineering?'}]
+
+        with StubUpstream(options['latency']) as upstream, override_settings(
+            OPENAI_API_KEY='stub',
+            OPENAI_BASE_URL=f'http://127.0.0.1:{upstream.port}/v1',
+            OPENAI_MAX_CONNECTIONS=max(options['concurrency'], options['threads']),
+            OPENAI_MAX_RETRIES=0,
+            OPENAI_CIRCUIT_FAILURE_THRESHOLD=options['requests'] + 1,
+        ):
+            openai_client.reset()
+            self.stdout.write(
+                f"Stub upstream on port {upstream.port}, {options['latency'] * 1000:.0f} ms per completion, "
+                f"{options['requests']} completions per mode"
+            )
+
+            upstream.peak_in_flight = 0
+            sync_elapsed, sync_latencies = self._run_sync(messages, options['requests'], options['threads'])
+            self._report(f"Sync, {options['threads']} threads", sync_elapsed, sync_latencies, upstream.peak_in_flight)
+
+            upstream.peak_in_flight = 0
+            async_elapsed, async_latencies = asyncio.run(
+                self._run_async(messages, options['requests'], options['concurrency'])
+            )
+            self._report(f"Async, {options['concurrency']} in flight", async_elapsed, async_latencies,
+                         upstream.peak_in_flight)
+
+            openai_client.reset()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Async throughput is {sync_elapsed / async_elapsed:.1f}x the sync throughput"
+        ))
+
+    def _timed_sync(self, messages):
+        start = time.perf_counter()
+        openai_client.chat_completion(messages)
+        return time.perf_counter() - start
+
+    def _run_sync(self, messages, count, threads):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(lambda _: self._timed_sync(messages), range(count)))
+        return time.perf_counter() - start, latencies
+
+    async def _run_async(self, messages, count, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                await openai_client.achat_completion(messages)
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(count)))
+        elapsed = time.perf_counter() - start
+        # The client's pool belongs to this event loop, which asyncio.run() closes next
+        await openai_client.get_async_client().close()
+        return elapsed, latencies
+
+    def _report(self, label, elapsed, latencies, peak_in_flight):
+        latencies = sorted(latencies)
+        self.stdout.write(
+            f"{label:<24} {len(latencies) / elapsed:>8.1f} req/s  wall {elapsed:>6.2f}s  "
+            f"p50 {percentile(latencies, 0.5) * 1000:>7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:>7.1f} ms  "
+            f"peak upstream concurrency {peak_in_flight}"
+        )
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from helper.aps import batch_calculate_aps
+from helper.models import StudentProfile
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored APS scores for all student profiles in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Number of profiles scored and written per batch')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report changes without writing them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        profiles = StudentProfile.objects.only('id', 'marks', 'stored_aps_score', 'updated_at').order_by('id')
+        scanned = updated = invalid = 0
+        batch = []
+        for profile in profiles.iterator(chunk_size=batch_size):
+            batch.append(profile)
+            if len(batch) >= batch_size:
+                changed, bad = self._process(batch, dry_run)
+                scanned += len(batch)
+                updated += changed
+                invalid += bad
+                batch = []
+        if batch:
+            changed, bad = self._process(batch, dry_run)
+            scanned += len(batch)
+            updated += changed
+            invalid += bad
+
+        verb = 'Would update' if dry_run else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {scanned} profiles. {verb} {updated}. Skipped {invalid} with invalid marks.'
+        ))
+
+    def _process(self, profiles, dry_run):
+        """Score a batch of profiles and persist changed scores with one bulk_update."""
+        scores = batch_calculate_aps([profile.marks for profile in profiles])
+        changed = []
+        invalid = 0
+        now = timezone.now()
+        for profile, aps in zip(profiles, scores):
+            if aps is None:
+                invalid += 1
+            elif aps != profile.stored_aps_score:
+                profile.stored_aps_score = aps
+                profile.updated_at = now  # bulk_update bypasses auto_now
+                changed.append(profile)
+        if changed and not dry_run:
+            StudentProfile.objects.bulk_update(changed, ['stored_aps_score', 'updated_at'])
+        return len(changed), invalid
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from helper.jobs import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs such as the 24-hour payment auto-verification sweep'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Run every job once and exit (e.g. from cron)')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            ran = scheduler.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Ran jobs: {', '.join(ran) or 'none'}"))
+            return
+
+        self.stdout.write(f"Running {len(scheduler.jobs)} background jobs. Press Ctrl+C to stop.")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped background jobs.")
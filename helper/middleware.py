@@ -0,0 +1,170 @@
+# helper/middleware.py
+
+"""
+Per-request SQL query accounting.
+
+QueryBudgetMiddleware wraps every request in ``connection.execute_wrapper`` to
+count queries and database time, then records the latency, query count and DB
+time under the resolved view name. Each view keeps its last
+QUERY_STATS_WINDOW samples in an in-process ring buffer, so the percentiles
+reflect recent traffic of this worker only. Requests that run more than
+QUERY_BUDGET queries are logged as warnings.
+
+The middleware is both sync and async capable, so async views (chat, SSE
+streams) are not adapted to sync around it. On the async path the counter is
+installed on the connection of the request's thread-sensitive sync thread,
+where ``sync_to_async`` calls and the async ORM run their queries, and a
+context variable keeps requests that share that thread from counting each
+other's queries. Queries run while a streaming response is consumed, after
+the view has returned, are not counted.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .utils import percentile
+
+logger = logging.getLogger('helper')
+
+# The QueryCounter of the request being handled in this context
+_active_counter = ContextVar('helper_query_counter', default=None)
+
+
+class QueryCounter:
+    """``execute_wrapper`` callable counting queries and their total duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if _active_counter.get() is not self:
+            # Another request's query on a sync thread the two requests share
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class QueryStats:
+    """Ring buffers of (latency ms, queries, DB ms) samples per view, safe across threads."""
+
+    def __init__(self, window):
+        self.window = window
+        self._samples = {}
+        self._over_budget = {}
+        self._lock = threading.Lock()
+
+    def record(self, view_name, latency_ms, queries, db_ms, over_budget):
+        with self._lock:
+            samples = self._samples.get(view_name)
+            if samples is None:
+                samples = self._samples[view_name] = deque(maxlen=self.window)
+            samples.append((latency_ms, queries, db_ms))
+            if over_budget:
+                self._over_budget[view_name] = self._over_budget.get(view_name, 0) + 1
+
+    def summary(self):
+        """Return ``{view_name: {...}}`` with p50/p95 latency, query count and DB time per view."""
+        with self._lock:
+            snapshot = {view: list(samples) for view, samples in self._samples.items()}
+            over_budget = dict(self._over_budget)
+
+        summary = {}
+        for view, samples in sorted(snapshot.items()):
+            latencies = sorted(sample[0] for sample in samples)
+            queries = sorted(sample[1] for sample in samples)
+            db_times = sorted(sample[2] for sample in samples)
+            summary[view] = {
+                'samples': len(samples),
+                'latency_ms': {'p50': round(percentile(latencies, 0.5), 2),
+                               'p95': round(percentile(latencies, 0.95), 2)},
+                'queries': {'p50': percentile(queries, 0.5), 'p95': percentile(queries, 0.95),
+                            'max': queries[-1]},
+                'db_ms': {'p50': round(percentile(db_times, 0.5), 2),
+                          'p95': round(percentile(db_times, 0.95), 2)},
+                'over_budget': over_budget.get(view, 0),
+            }
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._over_budget.clear()
+
+
+query_stats = QueryStats(settings.QUERY_STATS_WINDOW)
+
+
+def _install(counter):
+    connection.execute_wrappers.append(counter)
+
+
+def _uninstall(counter):
+    connection.execute_wrappers.remove(counter)
+
+
+class QueryBudgetMiddleware:
+    """Counts SQL queries per request, records per-view stats and warns above the budget."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = _active_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                response = self.get_response(request)
+        finally:
+            _active_counter.reset(token)
+        self._record(request, counter, start)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = _active_counter.set(counter)
+        start = time.perf_counter()
+        # Thread-sensitive, so this runs on the thread the request's sync code and async ORM use
+        await sync_to_async(_install)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_uninstall)(counter)
+            _active_counter.reset(token)
+        self._record(request, counter, start)
+        return response
+
+    def _record(self, request, counter, start):
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return  # 404s and other unrouted requests have no view to attribute to
+
+        budget = settings.QUERY_BUDGET
+        over_budget = counter.count > budget
+        query_stats.record(match.view_name, latency_ms, counter.count, counter.duration * 1000, over_budget)
+        if over_budget:
+            logger.warning(
+                f"View {match.view_name} ran {counter.count} queries (budget {budget}) "
+                f"in {latency_ms:.1f} ms, {counter.duration * 1000:.1f} ms in the database: {request.path}"
+            )
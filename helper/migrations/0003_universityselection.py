@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helper', '0002_studentprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UniversitySelection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='helper.studentprofile')),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='helper.university')),
+            ],
+            options={
+                'ordering': ['selected_at', 'id'],
+                'indexes': [models.Index(fields=['university', 'student'], name='selection_university_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'university'), name='unique_university_selection')],
+            },
+        ),
+        # Keep the JSON list until 0004 has copied it into the new table
+        migrations.RenameField(
+            model_name='studentprofile',
+            old_name='selected_universities',
+            new_name='legacy_selected_universities',
+        ),
+        migrations.AddField(
+            model_name='studentprofile',
+            name='selected_universities',
+            field=models.ManyToManyField(blank=True, related_name='selected_by', through='helper.UniversitySelection', to='helper.university'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def copy_selections(apps, schema_editor):
+    """
+    Create a UniversitySelection row for every ID in the legacy JSON lists.
+
+    application_count used to be the length of the list, so it is recomputed
+    for every profile from the rows created, including empty and null lists.
+    """
+    from helper.university_static_data import UNIVERSITIES
+
+    StudentProfile = apps.get_model('helper', 'StudentProfile')
+    University = apps.get_model('helper', 'University')
+    UniversitySelection = apps.get_model('helper', 'UniversitySelection')
+    static_by_id = {uni['id']: uni for uni in UNIVERSITIES}
+
+    selections = []
+    for profile in StudentProfile.objects.exclude(legacy_selected_universities=[]).iterator():
+        seen = set()
+        for university_id in profile.legacy_selected_universities or []:
+            try:
+                university_id = int(university_id)
+            except (TypeError, ValueError):
+                continue
+            if university_id in seen:
+                continue
+            # Selecting a university used to create its row too; do the same for old lists
+            if not University.objects.filter(id=university_id).exists():
+                data = static_by_id.get(university_id)
+                if data is None:
+                    continue
+                University.objects.create(
+                    id=university_id,
+                    name=data['name'],
+                    province=data['province'],
+                    minimum_aps=data['minimum_aps'],
+                    application_fee=data.get('application_fee') or '0',
+                    due_date=data.get('due_date'),
+                )
+            seen.add(university_id)
+            selections.append(UniversitySelection(student_id=profile.pk, university_id=university_id))
+    UniversitySelection.objects.bulk_create(selections, batch_size=1000, ignore_conflicts=True)
+
+    selection_counts = UniversitySelection.objects.filter(
+        student=OuterRef('pk'),
+    ).order_by().values('student').annotate(count=Count('id')).values('count')
+    StudentProfile.objects.update(application_count=Coalesce(Subquery(selection_counts), Value(0)))
+
+
+def restore_lists(apps, schema_editor):
+    StudentProfile = apps.get_model('helper', 'StudentProfile')
+    UniversitySelection = apps.get_model('helper', 'UniversitySelection')
+
+    lists = {}
+    for student_id, university_id in UniversitySelection.objects.order_by('selected_at', 'id').values_list('student_id', 'university_id'):
+        lists.setdefault(student_id, []).append(university_id)
+    for profile in StudentProfile.objects.filter(pk__in=lists).iterator():
+        profile.legacy_selected_universities = lists[profile.pk]
+        profile.save(update_fields=['legacy_selected_universities'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helper', '0003_universityselection'),
+    ]
+
+    # Data only: the legacy column is dropped by 0007 in a later deploy, so code still
+    # reading it keeps working and the copy never shares a transaction with the ALTER
+    operations = [
+        migrations.RunPython(copy_selections, restore_lists),
+    ]
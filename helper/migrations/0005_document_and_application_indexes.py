@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helper', '0004_copy_selected_universities'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicationstatus',
+            index=models.Index(fields=['student', 'status'], name='application_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentupload',
+            index=models.Index(fields=['user', 'document_type', 'university', '-uploaded_at'], name='document_user_type_uni_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentupload',
+            index=models.Index(condition=models.Q(('verified', False)), fields=['document_type', 'uploaded_at'], name='document_unverified_idx'),
+        ),
+    ]
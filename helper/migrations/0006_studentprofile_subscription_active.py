@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:42
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_subscription_active(apps, schema_editor):
+    """Set the flag from each student's newest subscription payment document."""
+    StudentProfile = apps.get_model('helper', 'StudentProfile')
+    DocumentUpload = apps.get_model('helper', 'DocumentUpload')
+
+    latest = DocumentUpload.objects.filter(
+        user=OuterRef('user'),
+        document_type='subscription_payment',
+    ).order_by('-uploaded_at', '-id').values('verified')[:1]
+    active_ids = list(
+        StudentProfile.objects.annotate(latest_verified=Subquery(latest))
+        .filter(latest_verified=True)
+        .values_list('pk', flat=True)
+    )
+    StudentProfile.objects.filter(pk__in=active_ids).update(subscription_active=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helper', '0005_document_and_application_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='subscription_active',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(backfill_subscription_active, migrations.RunPython.noop),
+    ]
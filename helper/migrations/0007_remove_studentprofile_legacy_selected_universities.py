@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('helper', '0006_studentprofile_subscription_active'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='studentprofile',
+            name='legacy_selected_universities',
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+import copy
 import re
 import logging
+from .aps import calculate_aps
 
 logger = logging.getLogger('helper')
 
@@ -27,6 +29,9 @@ class University(models.Model):
         ordering = ['name']
         verbose_name_plural = 'Universities'
 
+# Document types that prove a payment (application fees and subscriptions)
+PAYMENT_DOCUMENT_TYPES = ('payment_proof', 'subscription_payment')
+
 class DocumentUpload(models.Model):
     """Stores uploaded documents for a user, such as ID pictures, academic results, or proof of payment."""
     DOCUMENT_TYPES = [
@@ -52,6 +57,20 @@ class DocumentUpload(models.Model):
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Payment views: a user's documents of one type (for one university), newest first
+            models.Index(
+                fields=['user', 'document_type', 'university', '-uploaded_at'],
+                name='document_user_type_uni_idx',
+            ),
+            # Auto-verification sweep and staff queue: unverified documents of a type by age.
+            # The condition has no parameters, so SQLite can match it as well as PostgreSQL.
+            models.Index(
+                fields=['document_type', 'uploaded_at'],
+                condition=models.Q(verified=False),
+                name='document_unverified_idx',
+            ),
+        ]
 
 def validate_phone_number(value):
     """Validates that the phone number follows the format +27 followed by 9 digits."""
@@ -71,23 +90,30 @@ class StudentProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     subscription_package = models.CharField(max_length=20, choices=SUBSCRIPTION_PACKAGES, default='basic')
+    # Newest subscription payment is verified; kept in sync by helper.subscriptions
+    subscription_active = models.BooleanField(default=False, db_index=True)
     application_count = models.IntegerField(default=0)
-    selected_universities = models.JSONField(default=list, blank=True)  # Store list of university IDs
+    selected_universities = models.ManyToManyField(
+        University, through='UniversitySelection', related_name='selected_by', blank=True
+    )
     marks = models.JSONField(null=True, blank=True)
     stored_aps_score = models.IntegerField(null=True, blank=True)
     whatsapp_enabled = models.BooleanField(default=False)
     last_chat_date = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Drives ETags of per-student API responses
+
+    # Normally written by targeted UPDATEs: subscription_active by helper.subscriptions,
+    # application_count with F() when universities are (de)selected. See save().
+    MAINTAINED_FIELDS = frozenset({'subscription_active', 'application_count'})
+
+    def selected_university_ids(self):
+        """Return the IDs of the selected universities, in the order they were selected."""
+        return list(self.universityselection_set.values_list('university_id', flat=True))
 
     @property
     def subscription_status(self):
-        """Dynamically checks if the subscription is active based on verified payment proof."""
-        try:
-            subscription_payment_doc = self.user.documentupload_set.filter(document_type='subscription_payment').first()
-            if subscription_payment_doc and subscription_payment_doc.verified:
-                return True  # Active
-            return False  # Not Paid (or pending verification, or proof deleted)
-        except Exception:
-            return False  # Default to False if there's any error
+        """True if the subscription is active (the newest subscription payment is verified)."""
+        return self.subscription_active
 
     def get_subscription_fee(self):
         """Return the subscription fee based on the package."""
@@ -137,55 +163,73 @@ class StudentProfile(models.Model):
     @property
     def aps_score(self):
         """Calculates the APS score based on the best 6 subjects, excluding Life Orientation."""
-        if not self.marks or not isinstance(self.marks, dict) or len(self.marks) != 7:
-            logger.warning(f"APS calculation for {self.user.username}: Invalid marks - {self.marks}")
-            return None
-
-        try:
-            # Convert marks to points and store in a list
-            subject_points = []
-            for subject, mark in self.marks.items():
-                if subject == 'Life Orientation':
-                    continue
-                try:
-                    mark = int(mark)
-                    if mark >= 80:
-                        subject_points.append(7)
-                    elif mark >= 70:
-                        subject_points.append(6)
-                    elif mark >= 60:
-                        subject_points.append(5)
-                    elif mark >= 50:
-                        subject_points.append(4)
-                    elif mark >= 40:
-                        subject_points.append(3)
-                    elif mark >= 30:
-                        subject_points.append(2)
-                    else:
-                        subject_points.append(1)
-                except (ValueError, TypeError):
-                    logger.error(f"Invalid mark for {subject}: {mark}")
-                    return None
-
-            # Sort points in descending order and take top 6
-            subject_points.sort(reverse=True)
-            top_6_points = subject_points[:6]
-            
-            # Calculate total APS
-            aps = sum(top_6_points)
-            
-            logger.info(f"APS calculation for {self.user.username}: Calculated APS = {aps}")
-            return aps
-        except Exception as e:
-            logger.error(f"Error calculating APS for {self.user.username}: {str(e)}", exc_info=True)
-            return None
+        aps = calculate_aps(self.marks)
+        if aps is None:
+            logger.debug(f"APS calculation for profile {self.pk}: Invalid marks - {self.marks}")
+        return aps
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the marks as loaded so save() only rescores when they change
+        if 'marks' in instance.__dict__:
+            instance._loaded_marks = copy.deepcopy(instance.marks)
+        instance._remember_maintained()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._remember_maintained(fields)
+
+    def _remember_maintained(self, names=None):
+        """Record the current value of the (given) MAINTAINED_FIELDS as the database's."""
+        loaded = self.__dict__.setdefault('_loaded_maintained', {})
+        for name in self.MAINTAINED_FIELDS:
+            if name in self.__dict__ and (names is None or name in names):
+                loaded[name] = self.__dict__[name]
+
+    def _marks_changed(self):
+        """Return True if marks were assigned or edited since the profile was loaded."""
+        if 'marks' not in self.__dict__:
+            return False  # Deferred and never accessed, so it cannot have changed
+        if self._state.adding or not hasattr(self, '_loaded_marks'):
+            return True
+        return self.marks != self._loaded_marks
+
+    def _unchanged_maintained_fields(self):
+        """Return the MAINTAINED_FIELDS that still hold the value they were loaded with."""
+        loaded = self.__dict__.get('_loaded_maintained', {})
+        return {name for name, value in loaded.items() if self.__dict__.get(name) == value}
 
     def save(self, *args, **kwargs):
-        """Updates stored_aps_score with the calculated APS score before saving."""
-        calculated_aps = self.aps_score
-        if calculated_aps is not None:
-            self.stored_aps_score = calculated_aps
+        """
+        Updates stored_aps_score from the marks before saving, but only when the marks changed.
+
+        A save without ``update_fields`` of a loaded profile leaves out the
+        MAINTAINED_FIELDS this instance has not changed, so a stale instance
+        does not put back the value a targeted UPDATE wrote meanwhile. A
+        maintained field assigned on the instance (e.g. in the admin) is saved
+        as usual, and explicit ``update_fields`` are always honoured.
+        """
+        update_fields = kwargs.get('update_fields')
+        if self._marks_changed() and (update_fields is None or 'marks' in update_fields):
+            calculated_aps = self.aps_score
+            if calculated_aps is not None:
+                self.stored_aps_score = calculated_aps
+                if update_fields is not None:
+                    kwargs['update_fields'] = set(update_fields) | {'stored_aps_score'}
+        unchanged = self._unchanged_maintained_fields()
+        if (kwargs.get('update_fields') is None and unchanged
+                and not self._state.adding and not kwargs.get('force_insert')):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name not in unchanged
+            ]
         super().save(*args, **kwargs)
+        if 'marks' in self.__dict__:
+            self._loaded_marks = copy.deepcopy(self.marks)
+        self._remember_maintained(kwargs.get('update_fields'))
 
     def get_service_fee(self):
         """Returns the service fee for applications, free for ultimate package."""
@@ -198,6 +242,25 @@ class StudentProfile(models.Model):
         verbose_name = 'Student Profile'
         verbose_name_plural = 'Student Profiles'
 
+class UniversitySelection(models.Model):
+    """A university a student has selected to apply to."""
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE)
+    university = models.ForeignKey(University, on_delete=models.CASCADE)
+    selected_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student.user.username} selected {self.university.name}"
+
+    class Meta:
+        ordering = ['selected_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'university'], name='unique_university_selection'),
+        ]
+        # The unique constraint covers lookups by student; this one serves "who picked university X"
+        indexes = [
+            models.Index(fields=['university', 'student'], name='selection_university_idx'),
+        ]
+
 class ApplicationStatus(models.Model):
     """Tracks the status of university applications."""
     STATUS_CHOICES = (
@@ -223,6 +286,9 @@ class ApplicationStatus(models.Model):
     class Meta:
         ordering = ['-application_date']
         unique_together = ('student', 'university')
+        indexes = [
+            models.Index(fields=['student', 'status'], name='application_student_status_idx'),
+        ]
         verbose_name = 'Application Status'
         verbose_name_plural = 'Application Statuses'
 
@@ -0,0 +1,79 @@
+# helper/nsc_subjects.py
+
+"""
+National Senior Certificate subjects offered on the marks forms.
+
+Served to browsers through the autocomplete API (helper/autocomplete.py) rather
+than embedded in every page; the server still validates submitted subjects here.
+"""
+
+# Valid NSC subjects
+NSC_SUBJECTS = {
+    'compulsory': [
+        "English Home Language",
+        "English First Additional Language",
+        "Afrikaans Home Language",
+        "Afrikaans First Additional Language",
+        "IsiNdebele Home Language",
+        "IsiNdebele First Additional Language",
+        "IsiXhosa Home Language",
+        "IsiXhosa First Additional Language",
+        "IsiZulu Home Language",
+        "IsiZulu First Additional Language",
+        "Sepedi Home Language",
+        "Sepedi First Additional Language",
+        "Sesotho Home Language",
+        "Sesotho First Additional Language",
+        "Setswana Home Language",
+        "Setswana First Additional Language",
+        "Siswati Home Language",
+        "Siswati First Additional Language",
+        "Tshivenda Home Language",
+        "Tshivenda First Additional Language",
+        "Xitsonga Home Language",
+        "Xitsonga First Additional Language",
+        "Life Orientation",
+        "Mathematics",
+        "Mathematical Literacy"
+    ],
+    'elective': [
+        "Accounting",
+        "Agricultural Sciences",
+        "Business Studies",
+        "Consumer Studies",
+        "Dramatic Arts",
+        "Economics",
+        "Engineering Graphics and Design",
+        "Geography",
+        "History",
+        "Information Technology",
+        "Life Sciences",
+        "Music",
+        "Physical Sciences",
+        "Tourism",
+        "Visual Arts",
+        "Computer Applications Technology",
+        "Religion Studies"
+    ]
+}
+
+LIFE_ORIENTATION = 'Life Orientation'
+MATHEMATICS_SUBJECTS = ('Mathematics', 'Mathematical Literacy')
+
+_ALL_SUBJECTS = frozenset(NSC_SUBJECTS['compulsory']) | frozenset(NSC_SUBJECTS['elective'])
+
+
+def is_nsc_subject(subject):
+    """Return True if ``subject`` is one of the NSC subjects above."""
+    return subject in _ALL_SUBJECTS
+
+
+def subject_group(subject):
+    """Return the marks-form group of a subject: language, mathematics, life_orientation or elective."""
+    if subject == LIFE_ORIENTATION:
+        return 'life_orientation'
+    if subject in MATHEMATICS_SUBJECTS:
+        return 'mathematics'
+    if 'Language' in subject:
+        return 'language'
+    return 'elective'
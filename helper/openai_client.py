@@ -0,0 +1,379 @@
+# helper/openai_client.py
+
+"""
+Process-wide OpenAI client with bounded timeouts, retries and a circuit breaker.
+
+One client (and so one keep-alive connection pool) is shared by every request in
+the process instead of building a client, pool and TLS session per message.
+Transient upstream failures (connection errors, timeouts, 429 and 5xx) are
+retried with jittered exponential backoff; after OPENAI_CIRCUIT_FAILURE_THRESHOLD
+consecutive failed calls the circuit opens and calls fail fast with
+CircuitOpenError for OPENAI_CIRCUIT_RESET_SECONDS, after which one trial call is
+let through. A call that ends without an upstream outcome (the client
+disconnected and the request was cancelled) counts as neither a success nor a
+failure; it only frees the half-open trial slot it held. Everything is
+configured from settings, and OPENAI_BASE_URL can point the client at a local
+fake server.
+
+Async and streaming completions use an AsyncOpenAI client per event loop (an
+async connection pool cannot outlive its loop) and share the same circuit breaker.
+Each of those clients is closed on its own loop when the loop shuts down, or by
+reset().
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import httpx
+import openai
+from django.conf import settings
+
+logger = logging.getLogger('helper')
+
+# Errors that say nothing about the request itself, so a retry may succeed
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # Includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, safe across threads.
+
+    Closed: calls go through. Open: calls are refused until ``reset_after``
+    seconds have passed. Half-open: one trial call goes through; its success
+    closes the circuit and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold, reset_after):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return 'closed'
+        if now - self.opened_at >= self.reset_after:
+            return 'half-open'
+        return 'open'
+
+    def begin(self):
+        """
+        Start a call and return its CircuitCall.
+
+        Raises:
+            CircuitOpenError: The circuit is open, or half-open with its trial call in flight.
+        """
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == 'closed':
+                return CircuitCall(self, trial=False)
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return CircuitCall(self, trial=True)
+        raise CircuitOpenError('OpenAI circuit is open')
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                logger.warning(f"OpenAI circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Free the half-open trial slot without deciding the circuit's state."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {'state': self._state(time.monotonic()), 'consecutive_failures': self.failures}
+
+
+class CircuitCall:
+    """One call let through by a CircuitBreaker; records its outcome at most once."""
+
+    def __init__(self, breaker, trial):
+        self.breaker = breaker
+        self.trial = trial
+        self.settled = False
+
+    def success(self):
+        self.settled = True
+        self.breaker.record_success()
+
+    def failure(self):
+        self.settled = True
+        self.breaker.record_failure()
+
+    def abandon(self):
+        """End a call with no upstream outcome (e.g. cancelled): free its trial slot, record nothing."""
+        if not self.settled:
+            self.settled = True
+            if self.trial:
+                self.breaker.release_trial()
+
+
+_lock = threading.Lock()
+_client = None
+_breaker = None
+_async_clients = {}  # Event loop -> (AsyncOpenAI, task that closes it)
+
+
+def client_timeout():
+    """Return the httpx timeout for upstream calls."""
+    return httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+
+
+def client_limits():
+    """Return the connection pool limits shared by the process."""
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_client():
+    """Return the process-wide OpenAI client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = openai.OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL or None,
+                    timeout=client_timeout(),
+                    max_retries=0,  # Retries happen in chat_completion, where the breaker sees them
+                    http_client=openai.DefaultHttpxClient(limits=client_limits(), timeout=client_timeout()),
+                )
+    return _client
+
+
+def get_async_client():
+    """
+    Return the AsyncOpenAI client of the running event loop, creating it on first use.
+
+    A new client comes with a task that closes it once cancelled. Loops cancel
+    their remaining tasks when they shut down (asyncio.run and asgiref's
+    async_to_sync both do), so short-lived loops do not leak connection pools.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=client_timeout(),
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(limits=client_limits(), timeout=client_timeout()),
+        )
+        closer = loop.create_task(_close_when_cancelled(loop, client))
+        with _lock:
+            # Loops closed without cancelling their tasks never ran their closer
+            for closed in [other for other in _async_clients if other.is_closed()]:
+                del _async_clients[closed]
+            entry = _async_clients[loop] = (client, closer)
+    return entry[0]
+
+
+async def _close_when_cancelled(loop, client):
+    try:
+        await loop.create_future()  # Never resolved: wait for cancellation
+    finally:
+        with _lock:
+            if _async_clients.get(loop, (None, None))[0] is client:
+                del _async_clients[loop]
+        await client.close()
+
+
+def _close_async_client(loop, closer):
+    """Cancel the closer task of a client on its own loop, so the client is closed there."""
+    if loop.is_closed():
+        return
+    if loop.is_running():
+        loop.call_soon_threadsafe(closer.cancel)
+    else:
+        closer.cancel()
+        loop.run_until_complete(asyncio.wait([closer]))
+
+
+def get_breaker():
+    """Return the process-wide circuit breaker for OpenAI calls."""
+    global _breaker
+    if _breaker is None:
+        with _lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+                    settings.OPENAI_CIRCUIT_RESET_SECONDS,
+                )
+    return _breaker
+
+
+def reset():
+    """Close the shared clients and forget them and the breaker (after settings change, or in tests)."""
+    global _client, _breaker
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _breaker = None
+        async_clients = list(_async_clients.items())
+        _async_clients.clear()
+    # Outside the lock: a closer run here takes it to unregister its client
+    for loop, (client, closer) in async_clients:
+        _close_async_client(loop, closer)
+
+
+def backoff_delay(attempt):
+    """Return the sleep before retry number ``attempt`` (1-based): full jitter, capped."""
+    ceiling = min(settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+def chat_completion(messages, **kwargs):
+    """
+    Create a chat completion through the shared client.
+
+    Args:
+        messages: Chat messages for the completion.
+        **kwargs: Extra arguments for ``chat.completions.create``.
+
+    Returns:
+        The ChatCompletion.
+
+    Raises:
+        CircuitOpenError: The circuit is open; upstream was not called.
+        openai.OpenAIError: The call failed (after retries, for transient errors).
+    """
+    call = get_breaker().begin()
+    kwargs.setdefault('model', settings.OPENAI_CHAT_MODEL)
+    attempt = 0
+    try:
+        while True:
+            try:
+                response = get_client().chat.completions.create(messages=messages, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > settings.OPENAI_MAX_RETRIES:
+                    call.failure()
+                    raise
+                delay = backoff_delay(attempt)
+                logger.info(f"OpenAI call failed ({type(e).__name__}); retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+            except openai.OpenAIError:
+                # The request itself was rejected (auth, bad request); upstream is healthy
+                call.success()
+                raise
+            else:
+                call.success()
+                return response
+    finally:
+        call.abandon()
+
+
+async def achat_completion(messages, **kwargs):
+    """
+    Async chat_completion: same retries and circuit breaker, on the event loop's AsyncOpenAI client.
+
+    Waiting for upstream does not hold a thread, so one ASGI worker can keep
+    many completions in flight.
+    """
+    call = get_breaker().begin()
+    kwargs.setdefault('model', settings.OPENAI_CHAT_MODEL)
+    attempt = 0
+    try:
+        while True:
+            try:
+                response = await get_async_client().chat.completions.create(messages=messages, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > settings.OPENAI_MAX_RETRIES:
+                    call.failure()
+                    raise
+                delay = backoff_delay(attempt)
+                logger.info(f"OpenAI call failed ({type(e).__name__}); retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except openai.OpenAIError:
+                call.success()
+                raise
+            else:
+                call.success()
+                return response
+    finally:
+        # Cancelled (client disconnected) before upstream answered: no outcome to record
+        call.abandon()
+
+
+async def stream_chat_completion(messages, **kwargs):
+    """
+    Stream a chat completion, yielding the text of each chunk as it arrives.
+
+    Transient failures are retried like chat_completion, but only until the
+    first chunk arrives; after that an error ends the stream.
+
+    Raises:
+        CircuitOpenError: The circuit is open; upstream was not called.
+        openai.OpenAIError: The call or the stream failed.
+    """
+    call = get_breaker().begin()
+    kwargs.setdefault('model', settings.OPENAI_CHAT_MODEL)
+    attempt = 0
+    stream = None
+    try:
+        while True:
+            try:
+                stream = await get_async_client().chat.completions.create(messages=messages, stream=True, **kwargs)
+                break
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                if attempt > settings.OPENAI_MAX_RETRIES:
+                    call.failure()
+                    raise
+                delay = backoff_delay(attempt)
+                logger.info(f"OpenAI stream failed to start ({type(e).__name__}); retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except openai.OpenAIError:
+                call.success()
+                raise
+
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except RETRYABLE_ERRORS:
+            call.failure()
+            raise
+        else:
+            call.success()
+    finally:
+        # The consumer went away (client disconnected) or the task was cancelled mid-stream:
+        # no outcome to record
+        call.abandon()
+        if stream is not None:
+            await stream.close()
@@ -0,0 +1,46 @@
+# helper/payloads.py
+
+"""
+Pre-encoded JSON for the qualified-universities payloads.
+
+The list of universities a student qualifies for depends only on their APS,
+and there are only a few dozen reachable scores. Each payload is encoded once
+per (catalog version, APS) with orjson and then served as bytes, so requests
+never re-serialize the university records.
+"""
+
+from functools import lru_cache
+
+import orjson
+
+from .eligibility import qualified_universities
+from .university_static_data import get_catalog
+
+# Same escapes as django.utils.html.json_script, so the JSON can sit inside <script>
+_SCRIPT_ESCAPES = ((b'&', b'\\u0026'), (b'<', b'\\u003C'), (b'>', b'\\u003E'))
+
+
+def qualified_universities_script_json(aps):
+    """
+    Return the list of universities qualified for ``aps`` (``[]`` when None) as a
+    string that is safe to embed in a ``<script>`` element.
+    """
+    return _encode(get_catalog().version, aps)[0]
+
+
+def universities_api_payload(aps):
+    """Return the encoded ``{"universities": [...]}`` body of the universities API."""
+    return _encode(get_catalog().version, aps)[1]
+
+
+@lru_cache(maxsize=64)
+def _encode(catalog_version, aps):
+    # catalog_version is only part of the key: a new catalog never reuses old blobs
+    universities = qualified_universities(aps) if aps is not None else ()
+    encoded = orjson.dumps([uni.as_dict() for uni in universities])
+
+    script_safe = encoded
+    for char, escape in _SCRIPT_ESCAPES:
+        script_safe = script_safe.replace(char, escape)
+
+    return script_safe.decode(), b'{"universities":' + encoded + b'}'
@@ -0,0 +1,123 @@
+# helper/payment_status.py
+
+"""
+Per-application payment statuses for the status API, stream and pollers.
+
+``payment_status_state`` condenses everything the statuses depend on into a
+short token computed with two aggregate queries, so clients (via ETags) and the
+event stream can tell whether anything changed without rebuilding the statuses.
+The statuses depend on the clock only through the 24-hour auto-verification
+rule, so the token also counts the pending proofs that have waited it out; how
+long ago a proof was uploaded is left to the client, from ``uploaded_at``.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+from .auto_verification import AUTO_VERIFIED_DOCUMENT_TYPES, AUTO_VERIFY_AFTER, is_auto_verified
+from .models import ApplicationStatus, DocumentUpload
+from .reconciliation import latest_payment_proofs
+from .university_static_data import get_catalog
+
+
+def build_payment_statuses(user, profile):
+    """Return the JSON-ready payment status of each of the student's applications."""
+    applications = ApplicationStatus.objects.filter(student=profile)
+    proofs = latest_payment_proofs(user)
+    catalog = get_catalog()
+    now = timezone.now()
+
+    statuses = []
+    for application in applications:
+        payment = proofs.get(application.university_id)
+
+        # Get university data for fee information
+        university_data = catalog.get(application.university_id)
+        is_free = bool(university_data and university_data.application_fee.upper() == 'FREE')
+
+        # Determine payment status
+        if is_free:
+            status = 'free'
+            message = 'No payment required'
+        elif payment:
+            # Overdue proofs are persisted as verified by the run_jobs background sweep
+            if is_auto_verified(payment, now):
+                status = 'verified'
+                message = 'Payment verified'
+            else:
+                status = 'pending'
+                message = 'Pending verification'
+        else:
+            status = 'not_paid'
+            message = 'Payment not uploaded'
+
+        statuses.append({
+            'id': application.id,
+            'university_id': application.university_id,
+            'status': status,
+            'message': message,
+            'is_free': is_free,
+            'uploaded_at': payment.uploaded_at.isoformat() if payment else None,
+            'verified': is_auto_verified(payment, now) if payment else False
+        })
+    return statuses
+
+
+class PaymentStatusState(NamedTuple):
+    version: str
+    last_modified: Optional[datetime]  # Newest change behind the version, None if there is nothing yet
+    expires_at: Optional[datetime]     # When a pending proof next waits out AUTO_VERIFY_AFTER, if any
+
+
+def payment_status_state(user, now=None):
+    """
+    Return the PaymentStatusState of the student's payment statuses at ``now``.
+
+    The version is a short token that changes whenever the statuses can change:
+    uploads, deletions and (auto-)verification of payment documents, a pending
+    proof reaching AUTO_VERIFY_AFTER before the sweep has stored it as
+    verified, and any application being added, removed or updated.
+    ``expires_at`` is when the version next changes with no write at all.
+    """
+    now = now or timezone.now()
+    cutoff = now - AUTO_VERIFY_AFTER
+    pending = Q(verified=False)
+    documents = DocumentUpload.objects.filter(
+        user=user, document_type__in=AUTO_VERIFIED_DOCUMENT_TYPES
+    ).aggregate(
+        count=Count('id'),
+        verified_count=Count('id', filter=Q(verified=True)),
+        auto_verified=Count('id', filter=pending & Q(uploaded_at__lte=cutoff)),
+        latest_upload=Max('uploaded_at'),
+        latest_verification=Max('verification_date'),
+        latest_auto_verified_upload=Max('uploaded_at', filter=pending & Q(uploaded_at__lte=cutoff)),
+        next_auto_verified_upload=Min('uploaded_at', filter=pending & Q(uploaded_at__gt=cutoff)),
+    )
+    applications = ApplicationStatus.objects.filter(student__user=user).aggregate(
+        count=Count('id'),
+        latest_update=Max('last_updated'),
+    )
+    next_upload = documents.pop('next_auto_verified_upload')
+    fingerprint = repr((sorted(documents.items()), sorted(applications.items())))
+    version = hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest()[:16]
+
+    # A proof that waited out the period changed the statuses when it did so
+    latest_auto_verification = documents['latest_auto_verified_upload']
+    if latest_auto_verification is not None:
+        latest_auto_verification += AUTO_VERIFY_AFTER
+    timestamps = [
+        documents['latest_upload'], documents['latest_verification'], latest_auto_verification,
+        applications['latest_update'],
+    ]
+    last_modified = max((ts for ts in timestamps if ts is not None), default=None)
+    expires_at = next_upload + AUTO_VERIFY_AFTER if next_upload is not None else None
+    return PaymentStatusState(version, last_modified, expires_at)
+
+
+def payment_status_version(user):
+    """Return the version token of the student's payment statuses (see payment_status_state)."""
+    return payment_status_state(user).version
@@ -0,0 +1,48 @@
+# helper/payment_status_markers.py
+
+"""
+Per-student change markers for the payment status stream.
+
+Every write that can change a student's payment statuses replaces the marker
+stored in the cache under their user ID: the signal handlers in
+``helper.signals`` for single saves and deletes, and the bulk paths that use
+``update()`` or ``bulk_update()`` explicitly. The stream compares the marker on
+each tick, which is one cache read, and only runs the status queries when it
+has changed.
+"""
+
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(user_id):
+    return f'payment-status-marker:{user_id}'
+
+
+def touch_payment_statuses(user_ids):
+    """
+    Record that the payment statuses of the students with ``user_ids`` may have changed.
+
+    The marker is replaced once the current transaction commits, so a stream
+    that sees the new marker also sees the new rows.
+    """
+    keys = [_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, uuid.uuid4().hex), None))
+
+
+def payment_status_marker(user_id):
+    """
+    Return the student's current change marker.
+
+    A missing marker (never touched, or evicted) is created, so the next read
+    returns the same value. Returns None when the cache cannot store it (e.g.
+    DummyCache in development); callers must then check the database.
+    """
+    marker = cache.get(_key(user_id))
+    if marker is None:
+        cache.add(_key(user_id), uuid.uuid4().hex, None)
+        marker = cache.get(_key(user_id))
+    return marker
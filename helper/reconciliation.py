@@ -0,0 +1,127 @@
+# helper/reconciliation.py
+
+"""
+Payment state reconciliation for a student's applications.
+
+Payment state is derived from one prefetched set of payment proofs and Payment
+rows. Only real transitions are written back, in bulk, so read-only pages such
+as the payments overview never issue per-application writes.
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .dashboard_cache import invalidate_dashboard_context
+from .models import ApplicationStatus, DocumentUpload, Payment
+from .payment_status_markers import touch_payment_statuses
+
+logger = logging.getLogger('helper')
+
+PAYMENT_STATUS_LABELS = dict(Payment.PAYMENT_STATUS_CHOICES)
+
+
+def latest_payment_proofs(user):
+    """Return the newest payment proof per university ID for ``user``, using one query."""
+    proofs = {}
+    # DocumentUpload is ordered newest first, so the first proof seen per university wins
+    for proof in DocumentUpload.objects.filter(user=user, document_type='payment_proof', university__isnull=False):
+        proofs.setdefault(proof.university_id, proof)
+    return proofs
+
+
+def reconcile_payments(user, applications, universities_by_id):
+    """
+    Compute the payment state of each application and persist any transitions.
+
+    Each application is annotated with ``payment_proof``, ``payment_status`` and
+    ``payment_status_display`` for templates. Changed applications and existing
+    Payment rows are written with one bulk_update each. Missing Payment rows are
+    not created here, because they are created when a proof is uploaded.
+
+    Args:
+        user: The student's User.
+        applications: List of the student's ApplicationStatus objects.
+        universities_by_id: Catalog mapping of university ID to record.
+    """
+    proofs = latest_payment_proofs(user)
+    payments_by_university = {}
+    for payment in Payment.objects.filter(user=user):
+        payments_by_university.setdefault(payment.university, payment)
+
+    now = timezone.now()
+    changed_applications = []
+    changed_payments = []
+    for application in applications:
+        proof = proofs.get(application.university_id)
+        if proof:
+            target_status = 'pending'
+            target_verified = proof.verified
+            payment_status = 'paid' if proof.verified else 'pending'
+        elif application.status == 'not_started':
+            # Applications that have not started are left as they are
+            target_status = application.status
+            target_verified = application.payment_verified
+            payment_status = 'not_paid'
+        else:
+            target_status = 'not_started'
+            target_verified = False
+            payment_status = 'not_paid'
+
+        if application.status != target_status or application.payment_verified != target_verified:
+            application.status = target_status
+            application.payment_verified = target_verified
+            application.last_updated = now  # bulk_update bypasses auto_now
+            changed_applications.append(application)
+
+        university = universities_by_id.get(application.university_id)
+        payment = payments_by_university.get(university.name if university else '')
+        if payment and payment.payment_status != payment_status:
+            payment.payment_status = payment_status
+            changed_payments.append(payment)
+
+        application.payment_proof = proof
+        application.payment_status = payment_status
+        application.payment_status_display = PAYMENT_STATUS_LABELS[payment_status]
+
+    if changed_applications:
+        ApplicationStatus.objects.bulk_update(changed_applications, ['status', 'payment_verified', 'last_updated'])
+        touch_payment_statuses([user.id])
+    if changed_payments:
+        Payment.objects.bulk_update(changed_payments, ['payment_status'])
+
+
+def apply_subscription_verification(document):
+    """
+    Carry a staff decision on a subscription payment over to the student's pending records.
+
+    Pending Payment rows become paid (or not paid) and pending applications get
+    the document's ``payment_verified``. Both are bulk ``update()`` calls, which
+    send no post_save, so the student's payment status marker and cached
+    dashboard are invalidated here once the transaction commits.
+    """
+    user = document.user
+    now = timezone.now()
+    with transaction.atomic():
+        updated_payments = Payment.objects.filter(
+            user=user,
+            payment_status='pending'
+        ).update(
+            payment_status='paid' if document.verified else 'not_paid',
+            verification_date=now if document.verified else None
+        )
+        logger.info(f"Updated {updated_payments} payment records for user {user.id}")
+
+        updated_applications = ApplicationStatus.objects.filter(
+            student__user=user,
+            status='pending'
+        ).update(
+            payment_verified=document.verified,
+            last_updated=now,  # update() bypasses auto_now; the payment status version reads it
+        )
+        logger.info(f"Updated {updated_applications} application statuses for user {user.id}")
+
+        touch_payment_statuses([user.id])
+        transaction.on_commit(lambda: invalidate_dashboard_context(user.id))
+    return updated_payments, updated_applications
@@ -0,0 +1,83 @@
+# helper/scheduler.py
+
+"""
+A small in-process interval job scheduler.
+
+Jobs are plain callables that run every ``interval`` seconds. The clock and
+sleep functions are injectable, so schedules can be exercised locally without
+waiting in real time.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger('helper')
+
+
+class Job:
+    """A callable scheduled to run every ``interval`` seconds."""
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = None  # Run on the first tick
+
+    def is_due(self, now):
+        return self.next_run is None or now >= self.next_run
+
+
+class Scheduler:
+    """Runs registered jobs when they are due."""
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.jobs = []
+
+    def every(self, interval, name=None):
+        """Decorator registering the wrapped function to run every ``interval`` seconds."""
+        def decorator(func):
+            self.add_job(func, interval, name=name)
+            return func
+        return decorator
+
+    def add_job(self, func, interval, name=None):
+        job = Job(name or func.__name__, func, interval)
+        self.jobs.append(job)
+        return job
+
+    def run_pending(self):
+        """Run every due job once and return the names of the jobs that ran."""
+        ran = []
+        for job in self.jobs:
+            now = self.clock()
+            if not job.is_due(now):
+                continue
+            try:
+                job.func()
+            except Exception as e:
+                # One failing job must not stop the others or the worker loop
+                logger.error(f"Scheduled job {job.name} failed: {str(e)}", exc_info=True)
+            job.next_run = now + job.interval
+            ran.append(job.name)
+        return ran
+
+    def seconds_until_next_run(self):
+        """Return how long the worker can sleep before a job is due."""
+        if not self.jobs:
+            return None
+        now = self.clock()
+        return max(0, min((job.next_run or now) - now for job in self.jobs))
+
+    def run_forever(self, max_ticks=None):
+        """Run jobs as they become due. ``max_ticks`` bounds the loop for local runs."""
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            self.run_pending()
+            ticks += 1
+            delay = self.seconds_until_next_run()
+            if delay is None:
+                break
+            if max_ticks is None or ticks < max_ticks:
+                self.sleep(delay)
@@ -0,0 +1,193 @@
+# helper/search.py
+
+"""
+In-memory fuzzy search over universities, faculties and courses.
+
+Every searchable entry is indexed by the trigrams of its normalized text, so a
+query only scores entries that share at least one trigram with it. Scores are
+trigram (Jaccard) similarity plus boosts for abbreviation, exact, prefix and
+substring matches, which keeps "UCT", "Wits" and "stellenbosh" useful without
+touching the database. The index is built once per catalog version.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from .faculty_data import FACULTY_COURSES
+from .faculty_index import get_faculty_index
+from .university_static_data import get_catalog
+
+# Entries scoring below this are dropped (typo tolerance vs. noise)
+MIN_SCORE = 0.25
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_ABBREVIATION_RE = re.compile(r'\(([^)]+)\)')
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+
+# Ranking boosts on top of trigram similarity
+_ABBREVIATION_BOOST = 2.0
+_EXACT_BOOST = 1.5
+_PREFIX_BOOST = 0.75
+_WORD_PREFIX_BOOST = 0.5
+_SUBSTRING_BOOST = 0.4
+# Slight preference for universities over their faculties and courses on ties
+_KIND_WEIGHT = {'university': 0.05, 'faculty': 0.02, 'course': 0.0}
+
+
+def normalize(text):
+    """Lower-case ``text`` and collapse everything but letters and digits to single spaces."""
+    return _NON_WORD_RE.sub(' ', (text or '').lower()).strip()
+
+
+def trigrams(text):
+    """Return the set of trigrams of normalized ``text``, padded so word starts count."""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def abbreviation_of(name):
+    """Return the abbreviation in parentheses at the end of a university name, if any."""
+    match = _ABBREVIATION_RE.search(name)
+    return match.group(1) if match else None
+
+
+def without_abbreviation(name):
+    """Return a university name with its abbreviation in parentheses removed."""
+    return _ABBREVIATION_RE.sub('', name)
+
+
+class SearchEntry(NamedTuple):
+    kind: str                 # 'university', 'faculty' or 'course'
+    name: str
+    university_id: int
+    university_name: str
+    province: str
+    abbreviation: Optional[str]
+    faculty: Optional[str]
+
+    def as_dict(self, score):
+        return {
+            'type': self.kind,
+            'name': self.name,
+            'university_id': self.university_id,
+            'university': self.university_name,
+            'abbreviation': self.abbreviation,
+            'province': self.province,
+            'faculty': self.faculty,
+            'score': round(score, 3),
+        }
+
+
+class SearchIndex:
+    """Trigram index over a list of SearchEntry objects."""
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        self.texts = tuple(normalize(entry.name) for entry in self.entries)
+        self.words = tuple(tuple(text.split()) for text in self.texts)
+        self.abbreviations = tuple(normalize(entry.abbreviation) for entry in self.entries)
+        self.trigram_counts = []
+
+        postings = {}
+        for position, text in enumerate(self.texts):
+            grams = trigrams(text)
+            # Abbreviations are indexed too, so "wits" reaches its university directly
+            if self.abbreviations[position]:
+                grams |= trigrams(self.abbreviations[position])
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: tuple(positions) for gram, positions in postings.items()}
+
+    def search(self, query, limit=DEFAULT_LIMIT, kinds=None):
+        """
+        Return up to ``limit`` ``(entry, score)`` pairs for ``query``, best first.
+
+        Args:
+            query: Free-text query; case and punctuation are ignored.
+            limit: Maximum number of results, or None for every match.
+            kinds: Optional collection of entry kinds to keep.
+        """
+        text = normalize(query)
+        if not text:
+            return []
+
+        query_grams = trigrams(text)
+        shared = {}
+        for gram in query_grams:
+            for position in self.postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        scored = []
+        for position, overlap in shared.items():
+            entry = self.entries[position]
+            if kinds and entry.kind not in kinds:
+                continue
+            score = overlap / (len(query_grams) + self.trigram_counts[position] - overlap)
+
+            entry_text = self.texts[position]
+            if text == self.abbreviations[position]:
+                score += _ABBREVIATION_BOOST
+            if text == entry_text:
+                score += _EXACT_BOOST
+            elif entry_text.startswith(text):
+                score += _PREFIX_BOOST
+            elif any(word.startswith(text) for word in self.words[position]):
+                score += _WORD_PREFIX_BOOST
+            elif text in entry_text:
+                score += _SUBSTRING_BOOST
+
+            if score >= MIN_SCORE:
+                scored.append((score + _KIND_WEIGHT[entry.kind], position))
+
+        scored.sort(key=lambda item: (-item[0], self.texts[item[1]]))
+        return [(self.entries[position], score) for score, position in scored[:limit]]
+
+
+def build_entries(catalog, faculty_index, faculty_courses):
+    """Return the search entries for every university, open faculty and course."""
+    entries = []
+    for uni in catalog:
+        abbreviation = abbreviation_of(uni.name)
+        entries.append(SearchEntry('university', uni.name, uni.id, uni.name, uni.province, abbreviation, None))
+        for faculty in faculty_index.faculties_for(uni.id):
+            entries.append(SearchEntry('faculty', faculty, uni.id, uni.name, uni.province, None, None))
+        for faculty, courses in faculty_courses.get(uni.name, {}).items():
+            for course in courses:
+                entries.append(SearchEntry('course', course, uni.id, uni.name, uni.province, None, faculty))
+    return entries
+
+
+def get_search_index():
+    """Return the search index for the current catalog."""
+    return _build_index(get_catalog().version)
+
+
+@lru_cache(maxsize=None)
+def _build_index(catalog_version):
+    return SearchIndex(build_entries(get_catalog(), get_faculty_index(), FACULTY_COURSES))
+
+
+def search_catalog(query, limit=DEFAULT_LIMIT, kinds=None):
+    """
+    Search universities, faculties and courses and return JSON-ready results.
+
+    Args:
+        query: Free-text query.
+        limit: Maximum number of results (capped at MAX_LIMIT), or None for every match.
+        kinds: Optional tuple of entry kinds to keep.
+
+    Returns:
+        Tuple of result dictionaries, best match first. Results are cached per
+        normalized query, so callers must not mutate the dictionaries.
+    """
+    if limit is not None:
+        limit = max(1, min(limit, MAX_LIMIT))
+    return _search(get_catalog().version, normalize(query), limit, kinds)
+
+
+@lru_cache(maxsize=1024)
+def _search(catalog_version, text, limit, kinds):
+    return tuple(entry.as_dict(score) for entry, score in get_search_index().search(text, limit, kinds))
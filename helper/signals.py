@@ -0,0 +1,49 @@
+# helper/signals.py
+
+"""
+Signal handlers that keep per-student caches, payment status change markers
+and the denormalized ``StudentProfile.subscription_active`` flag in step with
+the database.
+
+Connected in ``HelperConfig.ready``. Bulk ``update()`` calls do not send these
+signals; code paths that use them invalidate explicitly where it matters.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .dashboard_cache import invalidate_dashboard_context
+from .models import PAYMENT_DOCUMENT_TYPES, ApplicationStatus, DocumentUpload, StudentProfile
+from .payment_status_markers import touch_payment_statuses
+from .subscriptions import SUBSCRIPTION_DOCUMENT_TYPE, sync_subscription_active
+
+
+@receiver([post_save, post_delete], sender=StudentProfile)
+def invalidate_profile_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard_context(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=ApplicationStatus)
+def invalidate_application_dashboard(sender, instance, **kwargs):
+    # student_id is the profile's primary key; look up its user without loading the profile
+    user_id = StudentProfile.objects.filter(pk=instance.student_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_dashboard_context(user_id)
+        touch_payment_statuses([user_id])
+
+
+@receiver([post_save, post_delete], sender=DocumentUpload)
+def invalidate_document_dashboard(sender, instance, **kwargs):
+    invalidate_dashboard_context(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=DocumentUpload)
+def touch_document_payment_statuses(sender, instance, **kwargs):
+    if instance.document_type in PAYMENT_DOCUMENT_TYPES:
+        touch_payment_statuses([instance.user_id])
+
+
+@receiver([post_save, post_delete], sender=DocumentUpload)
+def sync_subscription_document(sender, instance, **kwargs):
+    if instance.document_type == SUBSCRIPTION_DOCUMENT_TYPE:
+        sync_subscription_active([instance.user_id])
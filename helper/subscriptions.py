@@ -0,0 +1,62 @@
+# helper/subscriptions.py
+
+"""
+Keeps ``StudentProfile.subscription_active`` in step with subscription payments.
+
+A subscription is active when the student's newest ``subscription_payment``
+document is verified. The flag is stored on the profile so reading it costs no
+query and profiles can be filtered and counted by it. The signal handlers in
+``helper.signals`` resync it when such a document is saved or deleted; bulk
+``update()`` paths call ``sync_subscription_active`` themselves.
+"""
+
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import DocumentUpload, StudentProfile
+
+SUBSCRIPTION_DOCUMENT_TYPE = 'subscription_payment'
+
+
+def latest_subscription_verified(user_ref='user'):
+    """
+    Return an expression for whether the newest subscription payment of a user is verified.
+
+    Args:
+        user_ref: Name of the user field on the outer query.
+    """
+    latest = DocumentUpload.objects.filter(
+        user=OuterRef(user_ref),
+        document_type=SUBSCRIPTION_DOCUMENT_TYPE,
+    ).order_by('-uploaded_at', '-id').values('verified')[:1]
+    return Coalesce(Subquery(latest), Value(False))
+
+
+def sync_subscription_active(user_ids):
+    """
+    Recompute ``subscription_active`` for the profiles of ``user_ids``.
+
+    Only profiles whose flag actually changes are written, and those get a new
+    ``updated_at`` so cached dashboards and ETags of the student move on too.
+
+    Returns:
+        Number of profiles whose flag changed.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    now = timezone.now()
+    profiles = StudentProfile.objects.filter(user_id__in=user_ids).annotate(
+        latest_verified=latest_subscription_verified(),
+    )
+    activated = profiles.filter(latest_verified=True, subscription_active=False).values_list('pk', flat=True)
+    deactivated = profiles.filter(latest_verified=False, subscription_active=True).values_list('pk', flat=True)
+    # Evaluate both before writing, since the first update changes what the second would match
+    activated, deactivated = list(activated), list(deactivated)
+    changed = 0
+    if activated:
+        changed += StudentProfile.objects.filter(pk__in=activated).update(subscription_active=True, updated_at=now)
+    if deactivated:
+        changed += StudentProfile.objects.filter(pk__in=deactivated).update(subscription_active=False, updated_at=now)
+    return changed
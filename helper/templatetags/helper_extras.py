@@ -4,13 +4,14 @@ from django.utils import timezone
 from datetime import timedelta
 from django.utils.safestring import mark_safe
 import json
+from collections.abc import Mapping
 
 register = template.Library()
 
 @register.filter
 def get_item(dictionary, key):
     """Get an item from a dictionary using the key."""
-    if not isinstance(dictionary, dict):
+    if not isinstance(dictionary, Mapping):
         return None
     return dictionary.get(key)
 
@@ -1,3 +1,1362 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+import openai
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import openai_client
+from .answer_cache import AnswerCache, answer_cache, question_anchors, stem
+from .aps import LIFE_ORIENTATION, batch_calculate_aps, calculate_aps
+from .auto_verification import AUTO_VERIFY_AFTER, auto_verify_payments
+from .autocomplete import MAX_LIMIT, PrefixTrie, autocomplete
+from .catalog import UniversityCatalog, UniversityRecord, parse_application_fee
+from .catalog_answers import answer_catalog_question
+from .dashboard_cache import (
+    dashboard_cache_stats, get_dashboard_context, invalidate_dashboard_context, invalidate_dashboard_contexts,
+)
+from .eligibility import HIGHLY_QUALIFIED_MARGIN, highly_qualified_universities, qualified_universities
+from .faculty_data import FACULTIES_OPEN, FACULTY_COURSES
+from .faculty_index import FacultyIndex
+from .jobs import scheduler as job_scheduler
+from .middleware import QueryBudgetMiddleware, QueryStats, query_stats
+from .models import ApplicationStatus, DocumentUpload, Payment, StudentProfile, University, UniversitySelection
+from .payloads import qualified_universities_script_json, universities_api_payload
+from .payment_status import build_payment_statuses, payment_status_state, payment_status_version
+from .payment_status_markers import payment_status_marker, touch_payment_statuses
+from .reconciliation import latest_payment_proofs, reconcile_payments
+from .scheduler import Scheduler
+from .search import search_catalog
+from .university_filters import filter_universities, normalize_filters
+from .university_static_data import get_all_universities, get_catalog, get_university_by_id
+
+
+def make_marks(*marks, life_orientation=50):
+    """Build a marks dictionary from six counted marks plus Life Orientation."""
+    subjects = ['English Home Language', 'Mathematics', 'Physical Sciences',
+                'Life Sciences', 'Geography', 'Accounting']
+    return {**dict(zip(subjects, marks)), LIFE_ORIENTATION: life_orientation}
+
+
+class CalculateApsTests(SimpleTestCase):
+    def test_band_edges(self):
+        cases = [
+            (0, 1), (29, 1), (30, 2), (39, 2), (40, 3), (49, 3), (50, 4), (59, 4),
+            (60, 5), (69, 5), (70, 6), (79, 6), (79.5, 6), (80, 7), (100, 7),
+        ]
+        for mark, points in cases:
+            with self.subTest(mark=mark):
+                self.assertEqual(calculate_aps(make_marks(*[mark] * 6)), points * 6)
+
+    def test_mixed_marks(self):
+        self.assertEqual(calculate_aps(make_marks(85, 72, 64, 55, 43, 31)), 7 + 6 + 5 + 4 + 3 + 2)
+
+    def test_numeric_strings_are_accepted(self):
+        self.assertEqual(calculate_aps(make_marks('80', '70', '60', '50', '40', '30')), 27)
+
+    def test_life_orientation_is_excluded(self):
+        low = calculate_aps(make_marks(*[60] * 6, life_orientation=0))
+        high = calculate_aps(make_marks(*[60] * 6, life_orientation=100))
+        self.assertEqual(low, 30)
+        self.assertEqual(high, 30)
+
+    def test_without_life_orientation_the_best_six_of_seven_count(self):
+        marks = make_marks(85, 72, 64, 55, 43, 31)
+        del marks[LIFE_ORIENTATION]
+        marks['Dramatic Arts'] = 20
+        self.assertEqual(calculate_aps(marks), 7 + 6 + 5 + 4 + 3 + 2)
+        marks['Dramatic Arts'] = 90
+        self.assertEqual(calculate_aps(marks), 7 + 7 + 6 + 5 + 4 + 3)
+
+    def test_fewer_than_six_subjects_is_invalid(self):
+        marks = make_marks(*[60] * 6)
+        del marks['Accounting']
+        self.assertIsNone(calculate_aps(marks))
+
+    def test_out_of_range_marks_are_invalid(self):
+        for mark in (-1, 100.5, 101):
+            with self.subTest(mark=mark):
+                self.assertIsNone(calculate_aps(make_marks(mark, 60, 60, 60, 60, 60)))
+
+    def test_non_numeric_marks_are_invalid(self):
+        for mark in ('abc', '', None, [60], {'mark': 60}):
+            with self.subTest(mark=mark):
+                self.assertIsNone(calculate_aps(make_marks(mark, 60, 60, 60, 60, 60)))
+
+    def test_empty_or_wrong_type_is_invalid(self):
+        for marks in (None, {}, [], '60'):
+            with self.subTest(marks=marks):
+                self.assertIsNone(calculate_aps(marks))
+
+
+class BatchCalculateApsTests(SimpleTestCase):
+    CASES = [
+        make_marks(*[29] * 6),
+        make_marks(*[30] * 6),
+        make_marks(*[79.5] * 6),
+        make_marks(*[80] * 6),
+        make_marks(85, 72, 64, 55, 43, 31, life_orientation=99),
+        make_marks('80', '70', '60', '50', '40', '30'),
+        {'English Home Language': 85, 'Mathematics': 72, 'Physical Sciences': 64, 'Life Sciences': 55,
+         'Geography': 43, 'Accounting': 31, 'Dramatic Arts': 90},  # No Life Orientation: best 6 of 7
+        make_marks('abc', 60, 60, 60, 60, 60),
+        make_marks(101, 60, 60, 60, 60, 60),
+        {'Mathematics': 60},
+        None,
+    ]
+
+    def test_matches_single_scoring(self):
+        self.assertEqual(batch_calculate_aps(self.CASES), [calculate_aps(marks) for marks in self.CASES])
+
+    def test_invalid_rows_do_not_affect_valid_ones(self):
+        self.assertEqual(batch_calculate_aps([None, make_marks(*[80] * 6), {}]), [None, 42, None])
+
+    def test_empty_batch(self):
+        self.assertEqual(batch_calculate_aps([]), [])
+
+
+class StudentProfileApsTests(TestCase):
+    def test_batch_matches_profile_scores(self):
+        marks_list = BatchCalculateApsTests.CASES
+        profiles = []
+        for index, marks in enumerate(marks_list):
+            user = User.objects.create(username=f'student{index}')
+            profiles.append(StudentProfile.objects.create(user=user, marks=marks))
+
+        profiles = StudentProfile.objects.filter(pk__in=[p.pk for p in profiles]).order_by('pk')
+        self.assertEqual(
+            batch_calculate_aps([profile.marks for profile in profiles]),
+            [profile.aps_score for profile in profiles],
+        )
+        for profile in profiles:
+            with self.subTest(profile=profile.pk):
+                if profile.aps_score is not None:
+                    self.assertEqual(profile.stored_aps_score, profile.aps_score)
+
+
+class FakeClock:
+    """Manual clock whose sleep() advances time instead of waiting."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class SchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = Scheduler(clock=self.clock, sleep=self.clock.sleep)
+        self.calls = []
+
+    def test_jobs_run_on_first_tick_then_every_interval(self):
+        self.scheduler.add_job(lambda: self.calls.append('fast'), 10, name='fast')
+        self.scheduler.add_job(lambda: self.calls.append('slow'), 30, name='slow')
+
+        self.assertEqual(self.scheduler.run_pending(), ['fast', 'slow'])
+        self.assertEqual(self.scheduler.run_pending(), [])
+        self.clock.now += 10
+        self.assertEqual(self.scheduler.run_pending(), ['fast'])
+        self.clock.now += 20
+        self.assertEqual(self.scheduler.run_pending(), ['fast', 'slow'])
+
+    def test_every_decorator_registers_job(self):
+        @self.scheduler.every(60)
+        def sweep():
+            self.calls.append('sweep')
+
+        self.scheduler.run_pending()
+        self.assertEqual([job.name for job in self.scheduler.jobs], ['sweep'])
+        self.assertEqual(self.calls, ['sweep'])
+
+    def test_failing_job_does_not_stop_others(self):
+        def broken():
+            raise RuntimeError('boom')
+
+        self.scheduler.add_job(broken, 10)
+        self.scheduler.add_job(lambda: self.calls.append('ok'), 10, name='ok')
+        with self.assertLogs('helper', level='ERROR'):
+            self.assertEqual(self.scheduler.run_pending(), ['broken', 'ok'])
+        self.assertEqual(self.calls, ['ok'])
+        # The failed job is rescheduled rather than retried on every tick
+        self.assertEqual(self.scheduler.seconds_until_next_run(), 10)
+
+    def test_seconds_until_next_run(self):
+        self.assertIsNone(self.scheduler.seconds_until_next_run())
+        self.scheduler.add_job(lambda: None, 10, name='fast')
+        self.scheduler.add_job(lambda: None, 30, name='slow')
+        self.assertEqual(self.scheduler.seconds_until_next_run(), 0)
+        self.scheduler.run_pending()
+        self.clock.now += 4
+        self.assertEqual(self.scheduler.seconds_until_next_run(), 6)
+
+    def test_run_forever_sleeps_until_the_next_job(self):
+        self.scheduler.add_job(lambda: self.calls.append(self.clock.now), 10, name='tick')
+        self.scheduler.run_forever(max_ticks=3)
+        self.assertEqual(self.calls, [1000.0, 1010.0, 1020.0])
+        self.assertEqual(self.clock.sleeps, [10, 10])
+
+
+class AutoVerifyPaymentsTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.user = User.objects.create(username='payer')
+        self.profile = StudentProfile.objects.create(user=self.user)
+        self.university = University.objects.create(name='Test University', minimum_aps=20, province='Gauteng')
+        self.application = ApplicationStatus.objects.create(student=self.profile, university=self.university)
+
+    def upload(self, document_type, age, university=None):
+        document = DocumentUpload.objects.create(
+            user=self.user, document_type=document_type, file='documents/proof.pdf', university=university,
+        )
+        DocumentUpload.objects.filter(pk=document.pk).update(uploaded_at=self.now - age)
+        return document
+
+    def test_overdue_payment_proof_is_verified_with_its_application(self):
+        proof = self.upload('payment_proof', AUTO_VERIFY_AFTER + timedelta(minutes=1), self.university)
+
+        self.assertEqual(auto_verify_payments(now=self.now), (1, 1))
+        proof.refresh_from_db()
+        self.application.refresh_from_db()
+        self.assertTrue(proof.verified)
+        self.assertEqual(proof.verification_date, self.now)
+        self.assertTrue(self.application.payment_verified)
+        # Nothing is left to do on the next sweep
+        self.assertEqual(auto_verify_payments(now=self.now), (0, 0))
+
+    def test_recent_proof_and_other_documents_are_left_alone(self):
+        recent = self.upload('payment_proof', AUTO_VERIFY_AFTER - timedelta(minutes=1), self.university)
+        id_picture = self.upload('id_picture', AUTO_VERIFY_AFTER * 2)
+
+        self.assertEqual(auto_verify_payments(now=self.now), (0, 0))
+        recent.refresh_from_db()
+        id_picture.refresh_from_db()
+        self.application.refresh_from_db()
+        self.assertFalse(recent.verified)
+        self.assertFalse(id_picture.verified)
+        self.assertFalse(self.application.payment_verified)
+
+    def test_overdue_subscription_payment_activates_subscription(self):
+        self.upload('subscription_payment', AUTO_VERIFY_AFTER + timedelta(hours=1))
+
+        auto_verify_payments(now=self.now)
+        self.profile.refresh_from_db()
+        self.assertTrue(self.profile.subscription_active)
+
+
+class RunJobsCommandTests(TestCase):
+    def setUp(self):
+        # The command drives the process-wide scheduler; start every test from a fresh schedule
+        self.saved_next_runs = [job.next_run for job in job_scheduler.jobs]
+        for job in job_scheduler.jobs:
+            job.next_run = None
+
+    def tearDown(self):
+        for job, next_run in zip(job_scheduler.jobs, self.saved_next_runs):
+            job.next_run = next_run
+
+    def test_once_runs_every_job(self):
+        out = StringIO()
+        call_command('run_jobs', '--once', stdout=out)
+        self.assertIn('auto_verify_payments', out.getvalue())
+
+    def test_once_verifies_overdue_payments(self):
+        user = User.objects.create(username='cron')
+        document = DocumentUpload.objects.create(
+            user=user, document_type='subscription_payment', file='documents/proof.pdf',
+        )
+        DocumentUpload.objects.filter(pk=document.pk).update(
+            uploaded_at=timezone.now() - AUTO_VERIFY_AFTER - timedelta(minutes=1),
+        )
+
+        call_command('run_jobs', '--once', stdout=StringIO())
+        document.refresh_from_db()
+        self.assertTrue(document.verified)
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'helper-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PaymentStatusMarkerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='marker')
+
+    def test_missing_marker_is_created_once(self):
+        marker = payment_status_marker(self.user.id)
+        self.assertIsNotNone(marker)
+        self.assertEqual(payment_status_marker(self.user.id), marker)
+
+    def test_marker_moves_when_the_transaction_commits(self):
+        marker = payment_status_marker(self.user.id)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            touch_payment_statuses([self.user.id])
+        self.assertEqual(payment_status_marker(self.user.id), marker)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(payment_status_marker(self.user.id), marker)
+
+    def test_payment_document_save_moves_marker(self):
+        marker = payment_status_marker(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            DocumentUpload.objects.create(user=self.user, document_type='payment_proof', file='documents/p.pdf')
+        self.assertNotEqual(payment_status_marker(self.user.id), marker)
+
+    def test_other_documents_leave_marker_alone(self):
+        marker = payment_status_marker(self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            DocumentUpload.objects.create(user=self.user, document_type='id_picture', file='documents/id.png')
+        self.assertEqual(payment_status_marker(self.user.id), marker)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_no_marker_without_a_cache(self):
+        self.assertIsNone(payment_status_marker(self.user.id))
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PAYMENT_STATUS_STREAM_INTERVAL=0.01, PAYMENT_STATUS_STREAM_DURATION=0.2)
+class PaymentStatusStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='streamer')
+        StudentProfile.objects.create(user=self.user)
+
+    def read_stream(self, during=None):
+        """Collect the stream's frames, calling ``during`` after the first statuses event."""
+        async def read():
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            response = await client.get(reverse('helper:payment_status_stream'))
+            frames = []
+            async for chunk in response.streaming_content:
+                frames.append(chunk.decode())
+                if during and len(frames) == 2:
+                    await sync_to_async(during)()
+            return frames
+
+        with patch('helper.views.payment_status_state', wraps=payment_status_state) as state:
+            frames = async_to_sync(read)()
+        return frames, state.call_count
+
+    def test_status_queries_run_once_while_nothing_changes(self):
+        frames, version_checks = self.read_stream()
+        self.assertEqual(version_checks, 1)
+        self.assertEqual(sum('event: statuses' in frame for frame in frames), 1)
+        self.assertGreater(sum('keep-alive' in frame for frame in frames), 3)
+
+    def test_write_is_pushed_on_the_next_tick(self):
+        university = University.objects.create(name='Stream University', minimum_aps=20, province='Gauteng')
+
+        def apply():
+            profile = StudentProfile.objects.get(user=self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                ApplicationStatus.objects.create(student=profile, university=university)
+
+        frames, version_checks = self.read_stream(during=apply)
+        self.assertEqual(version_checks, 2)
+        self.assertEqual(sum('event: statuses' in frame for frame in frames), 2)
+
+
+class PaymentStatusStateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='payer')
+        self.profile = StudentProfile.objects.create(user=self.user)
+        university = University.objects.create(name='Clock University', minimum_aps=20, province='Gauteng')
+        ApplicationStatus.objects.create(student=self.profile, university=university)
+        self.proof = DocumentUpload.objects.create(
+            user=self.user, university=university, document_type='payment_proof', file='documents/p.pdf'
+        )
+        self.uploaded_at = self.proof.uploaded_at
+
+    def test_version_ignores_the_clock_while_a_proof_waits(self):
+        early = payment_status_state(self.user, now=self.uploaded_at + timedelta(minutes=1))
+        later = payment_status_state(self.user, now=self.uploaded_at + timedelta(hours=23))
+        self.assertEqual(early.version, later.version)
+        self.assertEqual(early.expires_at, self.uploaded_at + AUTO_VERIFY_AFTER)
+        statuses = build_payment_statuses(self.user, self.profile)
+        self.assertEqual(statuses[0]['message'], 'Pending verification')
+
+    def test_version_changes_when_a_proof_waits_out_the_period(self):
+        before = payment_status_state(self.user, now=self.uploaded_at + AUTO_VERIFY_AFTER - timedelta(seconds=1))
+        after = payment_status_state(self.user, now=self.uploaded_at + AUTO_VERIFY_AFTER)
+        self.assertNotEqual(before.version, after.version)
+        self.assertEqual(after.last_modified, self.uploaded_at + AUTO_VERIFY_AFTER)
+        self.assertIsNone(after.expires_at)
+
+    def test_sweep_keeps_the_auto_verified_version_moving(self):
+        now = self.uploaded_at + AUTO_VERIFY_AFTER + timedelta(minutes=1)
+        overdue = payment_status_state(self.user, now=now)
+        auto_verify_payments(now=now)
+        self.assertNotEqual(payment_status_state(self.user, now=now).version, overdue.version)
+
+    def test_stale_etag_gets_the_new_statuses(self):
+        self.client.force_login(self.user)
+        url = reverse('helper:payment_statuses')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        DocumentUpload.objects.filter(pk=self.proof.pk).update(uploaded_at=self.uploaded_at - AUTO_VERIFY_AFTER)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['status'], 'verified')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class VerifyDocumentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.student = User.objects.create(username='subscriber')
+        self.profile = StudentProfile.objects.create(user=self.student)
+        university = University.objects.create(name='Verify University', minimum_aps=20, province='Gauteng')
+        self.application = ApplicationStatus.objects.create(student=self.profile, university=university,
+                                                            status='pending')
+        self.payment = Payment.objects.create(user=self.student, university=university.name, amount=100,
+                                              payment_status='pending')
+        self.document = DocumentUpload.objects.create(user=self.student, document_type='subscription_payment',
+                                                      file='documents/s.pdf')
+        self.client.force_login(self.staff)
+
+    def assert_verification_invalidates(self, verify):
+        cache.set(f'dashboard-context:{self.student.id}', {'version': '', 'context': {}})
+        marker = payment_status_marker(self.student.id)
+        version = payment_status_version(self.student)
+        # The document's own post_save also moves the marker, so block it to see the bulk updates' share
+        with patch('helper.signals.touch_payment_statuses'), patch('helper.signals.invalidate_dashboard_context'):
+            with self.captureOnCommitCallbacks(execute=True):
+                verify()
+        self.application.refresh_from_db()
+        self.payment.refresh_from_db()
+        self.assertTrue(self.application.payment_verified)
+        self.assertEqual(self.payment.payment_status, 'paid')
+        self.assertNotEqual(payment_status_marker(self.student.id), marker)
+        self.assertNotEqual(payment_status_version(self.student), version)
+        self.assertIsNone(cache.get(f'dashboard-context:{self.student.id}'))
+
+    def test_verify_document_form(self):
+        self.assert_verification_invalidates(lambda: self.client.post(
+            reverse('helper:verify_document', args=[self.document.id]), {'verified': 'on', 'notes': ''}
+        ))
+
+    def test_verify_document_api(self):
+        self.assert_verification_invalidates(lambda: self.client.post(
+            reverse('helper:verify_document_api'), {'doc_id': self.document.id, 'verified': 'true'}
+        ))
+
+
+class ReconciliationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='reconciler')
+        self.profile = StudentProfile.objects.create(user=self.user)
+        self.paid_uni = University.objects.create(name='Proof University', minimum_aps=20, province='Gauteng')
+        self.unpaid_uni = University.objects.create(name='No Proof University', minimum_aps=20, province='Limpopo')
+        self.universities_by_id = {uni.id: uni for uni in (self.paid_uni, self.unpaid_uni)}
+
+    def upload_proof(self, university, age, verified=False):
+        proof = DocumentUpload.objects.create(user=self.user, document_type='payment_proof', file='documents/p.pdf',
+                                              university=university, verified=verified)
+        DocumentUpload.objects.filter(pk=proof.pk).update(uploaded_at=timezone.now() - age)
+        return proof
+
+    def test_latest_payment_proofs_keeps_the_newest_per_university(self):
+        self.upload_proof(self.paid_uni, timedelta(days=2))
+        newest = self.upload_proof(self.paid_uni, timedelta(hours=1), verified=True)
+        DocumentUpload.objects.create(user=self.user, document_type='payment_proof', file='documents/n.pdf')
+        DocumentUpload.objects.create(user=self.user, document_type='id_document', file='documents/i.pdf',
+                                      university=self.unpaid_uni)
+        with self.assertNumQueries(1):
+            proofs = latest_payment_proofs(self.user)
+        self.assertEqual(proofs, {self.paid_uni.id: newest})
+
+    def test_reconcile_writes_only_transitions(self):
+        self.upload_proof(self.paid_uni, timedelta(hours=1), verified=True)
+        paid = ApplicationStatus.objects.create(student=self.profile, university=self.paid_uni, status='not_started')
+        stale = ApplicationStatus.objects.create(student=self.profile, university=self.unpaid_uni, status='pending',
+                                                 payment_verified=True)
+        payment = Payment.objects.create(user=self.user, university=self.paid_uni.name, amount=100,
+                                         payment_status='pending')
+        applications = [paid, stale]
+
+        reconcile_payments(self.user, applications, self.universities_by_id)
+        self.assertEqual((paid.payment_status, paid.payment_status_display), ('paid', 'Paid'))
+        self.assertEqual(stale.payment_status, 'not_paid')
+        self.assertIsNone(stale.payment_proof)
+        paid.refresh_from_db()
+        stale.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual((paid.status, paid.payment_verified), ('pending', True))
+        self.assertEqual((stale.status, stale.payment_verified), ('not_started', False))
+        self.assertEqual(payment.payment_status, 'paid')
+
+        # Nothing changed since, so a second pass only reads the proofs and Payment rows
+        with self.assertNumQueries(2):
+            reconcile_payments(self.user, [paid, stale], self.universities_by_id)
+
+    def test_unstarted_applications_without_proof_are_left_alone(self):
+        application = ApplicationStatus.objects.create(student=self.profile, university=self.unpaid_uni,
+                                                       status='not_started', payment_verified=True)
+        with self.assertNumQueries(2):
+            reconcile_payments(self.user, [application], self.universities_by_id)
+        self.assertEqual(application.payment_status, 'not_paid')
+        self.assertTrue(application.payment_verified)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='cached')
+        self.profile = StudentProfile.objects.create(user=self.user)
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'build': self.builds}
+
+    def test_second_lookup_is_a_hit(self):
+        self.assertEqual(get_dashboard_context(self.profile, self.build), {'build': 1})
+        self.assertEqual(get_dashboard_context(self.profile, self.build), {'build': 1})
+        self.assertEqual(dashboard_cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_entry_from_an_older_profile_is_rebuilt(self):
+        get_dashboard_context(self.profile, self.build)
+        stale = StudentProfile.objects.get(pk=self.profile.pk)
+        self.profile.updated_at += timedelta(seconds=1)
+        self.assertEqual(get_dashboard_context(self.profile, self.build), {'build': 2})
+        # The entry now carries the newer version, so the older profile misses as well
+        self.assertEqual(get_dashboard_context(stale, self.build), {'build': 3})
+
+    def test_saves_of_related_rows_drop_the_entry(self):
+        university = University.objects.create(name='Signal University', minimum_aps=20, province='Gauteng')
+        saves = [
+            lambda: ApplicationStatus.objects.create(student=self.profile, university=university),
+            lambda: DocumentUpload.objects.create(user=self.user, document_type='id_document', file='documents/i.pdf'),
+            lambda: self.profile.save(),
+        ]
+        for save in saves:
+            get_dashboard_context(self.profile, self.build)
+            save()
+            self.assertIsNone(cache.get(f'dashboard-context:{self.user.id}'))
+
+    def test_bulk_invalidation(self):
+        other = StudentProfile.objects.create(user=User.objects.create(username='other'))
+        get_dashboard_context(self.profile, self.build)
+        get_dashboard_context(other, self.build)
+        invalidate_dashboard_contexts([self.user.id, other.user_id])
+        self.assertIsNone(cache.get(f'dashboard-context:{self.user.id}'))
+        self.assertIsNone(cache.get(f'dashboard-context:{other.user_id}'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DashboardQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='dashboard')
+        self.profile = StudentProfile.objects.create(user=self.user, marks=make_marks(70, 80, 75, 60, 65, 55))
+        self.client.force_login(self.user)
+
+    def add_universities(self, count):
+        for _ in range(count):
+            university = University.objects.create(name=f'Dashboard University {University.objects.count()}',
+                                                   minimum_aps=20, province='Gauteng')
+            ApplicationStatus.objects.create(student=self.profile, university=university)
+            UniversitySelection.objects.create(student=self.profile, university=university)
+            DocumentUpload.objects.create(user=self.user, university=university, document_type='payment_proof',
+                                          file='documents/p.pdf')
+
+    def test_query_count_does_not_grow_with_applications(self):
+        url = reverse('helper:dashboard_student')
+        for count in (1, 4):
+            self.add_universities(count)
+            invalidate_dashboard_context(self.user.id)
+            with self.subTest(universities=count):
+                # User, profile, selections and documents (the session is in the cache)
+                with self.assertNumQueries(4):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                # Cached context: user and profile only
+                with self.assertNumQueries(2):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class UniversitySearchApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create(username='searcher'))
+
+    def test_empty_query_lists_every_university(self):
+        for params in ({}, {'q': ''}, {'q': '   '}):
+            with self.subTest(params=params):
+                data = self.client.get(reverse('helper:university_search_api'), params).json()
+                self.assertEqual(data['results'], [])
+                self.assertEqual([uni['id'] for uni in data['universities']], [uni.id for uni in get_catalog()])
+
+    def test_query_returns_ranked_matches(self):
+        data = self.client.get(reverse('helper:university_search_api'), {'q': 'wits'}).json()
+        self.assertEqual(data['universities'][0]['name'], 'University of the Witwatersrand (Wits)')
+        self.assertEqual(data['results'][0]['type'], 'university')
+
+    def test_matches_are_only_capped_on_request(self):
+        url = reverse('helper:university_search_api')
+        data = self.client.get(url, {'q': 'university'}).json()
+        self.assertGreater(len(data['universities']), 10)
+        self.assertEqual(len(data['results']), len(search_catalog('university', None)))
+        capped = self.client.get(url, {'q': 'university', 'limit': 3}).json()
+        self.assertEqual(capped['results'], data['results'][:3])
+        self.assertLessEqual(len(capped['universities']), 3)
+
+
+class StudentProfileSaveTests(TestCase):
+    def setUp(self):
+        self.profile = StudentProfile.objects.create(user=User.objects.create(username='saver'))
+
+    def test_full_save_keeps_concurrent_maintained_fields(self):
+        stale = StudentProfile.objects.get(pk=self.profile.pk)
+        StudentProfile.objects.filter(pk=self.profile.pk).update(
+            application_count=F('application_count') + 2, subscription_active=True,
+        )
+
+        stale.phone_number = '0820000000'
+        stale.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.phone_number, '0820000000')
+        self.assertEqual(self.profile.application_count, 2)
+        self.assertTrue(self.profile.subscription_active)
+
+    def test_explicit_update_fields_still_write_them(self):
+        self.profile.application_count = 5
+        self.profile.save(update_fields=['application_count'])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.application_count, 5)
+
+    def test_full_save_writes_maintained_fields_changed_on_purpose(self):
+        profile = StudentProfile.objects.get(pk=self.profile.pk)
+        profile.subscription_active = True
+        profile.application_count = 3
+        profile.save()
+        self.profile.refresh_from_db()
+        self.assertTrue(self.profile.subscription_active)
+        self.assertEqual(self.profile.application_count, 3)
+
+    def test_refreshed_instance_keeps_later_concurrent_updates(self):
+        profile = StudentProfile.objects.get(pk=self.profile.pk)
+        StudentProfile.objects.filter(pk=self.profile.pk).update(application_count=1)
+        profile.refresh_from_db()
+        StudentProfile.objects.filter(pk=self.profile.pk).update(application_count=2)
+        profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.application_count, 2)
+
+
+class BenchmarkIndexesCommandTests(SimpleTestCase):
+    @override_settings(DEBUG=False)
+    def test_refuses_without_debug_or_force(self):
+        with self.assertRaisesMessage(CommandError, '--force'):
+            call_command('benchmark_indexes', stdout=StringIO())
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        # Build the search index up front so its own warnings stay out of the budget assertions
+        search_catalog('wits')
+        query_stats.clear()
+        self.user = User.objects.create(username='counted')
+        StudentProfile.objects.create(user=self.user)
+
+    @override_settings(DEBUG=True)  # Django only logs handler adaptation in debug mode
+    def test_async_view_runs_without_adaptation_and_counts_its_queries(self):
+        async def post():
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            return await client.post(reverse('helper:chat_message_api'), 'not json', content_type='application/json')
+
+        with self.assertLogs('django.request', level='DEBUG') as logs:
+            response = async_to_sync(post)()
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse([line for line in logs.output if 'QueryBudgetMiddleware' in line])
+        stats = query_stats.summary()['helper:chat_message_api']
+        # The session and user lookups behind request.user run through sync_to_async
+        self.assertGreater(stats['queries']['max'], 0)
+
+    def test_sync_view_queries_are_counted(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('helper:university_search_api'), {'q': 'wits'})
+        self.assertGreater(query_stats.summary()['helper:university_search_api']['queries']['max'], 0)
+
+    @override_settings(QUERY_BUDGET=0)
+    def test_requests_over_budget_are_logged_and_counted(self):
+        self.client.force_login(self.user)
+        with self.assertLogs('helper', 'WARNING') as logs:
+            self.client.get(reverse('helper:university_search_api'), {'q': 'wits'})
+        self.assertIn('View helper:university_search_api ran', logs.output[0])
+        self.assertIn('(budget 0)', logs.output[0])
+        self.assertEqual(query_stats.summary()['helper:university_search_api']['over_budget'], 1)
+
+    @override_settings(QUERY_BUDGET=1000)
+    def test_requests_within_budget_are_not_flagged(self):
+        self.client.force_login(self.user)
+        with self.assertNoLogs('helper', 'WARNING'):
+            self.client.get(reverse('helper:university_search_api'), {'q': 'wits'})
+        self.assertEqual(query_stats.summary()['helper:university_search_api']['over_budget'], 0)
+
+    def test_unrouted_requests_are_not_recorded(self):
+        middleware = QueryBudgetMiddleware(lambda request: HttpResponse())
+        middleware(RequestFactory().get('/no-such-page/'))
+        self.assertEqual(query_stats.summary(), {})
+
+    def test_stats_keep_the_last_window_of_samples(self):
+        stats = QueryStats(window=3)
+        for queries in (100, 1, 2, 3):
+            stats.record('view', 10.0, queries, 1.0, over_budget=queries > 50)
+        summary = stats.summary()['view']
+        self.assertEqual(summary['samples'], 3)
+        self.assertEqual(summary['queries']['max'], 3)
+        # Over-budget counts are totals, not limited to the window
+        self.assertEqual(summary['over_budget'], 1)
+
+    def test_staff_stats_endpoint(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('helper:query_stats_api')).status_code, 403)
+        self.client.force_login(User.objects.create(username='ops', is_staff=True))
+        self.client.get(reverse('helper:university_search_api'), {'q': 'wits'})
+        data = self.client.get(reverse('helper:query_stats_api')).json()
+        self.assertEqual(data['budget'], settings.QUERY_BUDGET)
+        self.assertIn('helper:university_search_api', data['views'])
+
+
+class FakeUpstream(ThreadingHTTPServer):
+    """Local OpenAI-compatible server answering with the scripted status codes, then 200s."""
+
+    daemon_threads = True
+
+    def __init__(self, statuses=(), delay=0.0):
+        super().__init__(('127.0.0.1', 0), FakeUpstreamHandler)
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        server = self.server
+        server.requests += 1
+        status = server.statuses.pop(0) if server.statuses else 200
+        time.sleep(server.delay)
+        if status != 200:
+            return self._send(status, {'error': {'message': 'upstream failed'}})
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            chunk = {'id': 'c', 'object': 'chat.completion.chunk', 'created': 0, 'model': body['model'],
+                     'choices': [{'index': 0, 'delta': {'content': 'Hello'}, 'finish_reason': None}]}
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n'.encode())
+            self.close_connection = True
+            return
+        self._send(200, {'id': 'c', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+                         'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': 'Hello'},
+                                      'finish_reason': 'stop'}]})
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+MESSAGES = [{'role': 'user', 'content': 'Hi'}]
+
+
+class OpenAIClientTests(SimpleTestCase):
+    """Retries and the circuit breaker against a local fake upstream."""
+
+    def upstream(self, statuses=(), delay=0.0, **overrides):
+        server = FakeUpstream(statuses, delay)
+        self.enterContext(server)
+        settings = {
+            'OPENAI_API_KEY': 'test', 'OPENAI_BASE_URL': server.base_url, 'OPENAI_MAX_RETRIES': 2,
+            'OPENAI_RETRY_BASE_DELAY': 0.001, 'OPENAI_CIRCUIT_FAILURE_THRESHOLD': 2,
+            'OPENAI_CIRCUIT_RESET_SECONDS': 60, **overrides,
+        }
+        self.enterContext(override_settings(**settings))
+        openai_client.reset()
+        self.addCleanup(openai_client.reset)
+        return server
+
+    def open_circuit(self):
+        breaker = openai_client.get_breaker()
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        breaker.opened_at -= breaker.reset_after  # Reset period over: half-open
+        return breaker
+
+    def run_async(self, coroutine_function):
+        # asyncio.run cancels the client's closer task on shutdown, which closes the client
+        return asyncio.run(coroutine_function())
+
+    def test_transient_errors_are_retried(self):
+        server = self.upstream(statuses=[500, 503])
+        response = openai_client.chat_completion(MESSAGES)
+        self.assertEqual(response.choices[0].message.content, 'Hello')
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(openai_client.get_breaker().stats(), {'state': 'closed', 'consecutive_failures': 0})
+
+    def test_circuit_opens_after_threshold_and_fails_fast(self):
+        server = self.upstream(statuses=[500] * 6)
+        for _ in range(2):
+            with self.assertRaises(openai.InternalServerError):
+                openai_client.chat_completion(MESSAGES)
+        self.assertEqual(openai_client.get_breaker().state, 'open')
+        with self.assertRaises(openai_client.CircuitOpenError):
+            openai_client.chat_completion(MESSAGES)
+        self.assertEqual(server.requests, 6)  # Two calls of three attempts; none while open
+
+    def test_client_errors_do_not_count_as_failures(self):
+        self.upstream(statuses=[400])
+        with self.assertRaises(openai.BadRequestError):
+            openai_client.chat_completion(MESSAGES)
+        self.assertEqual(openai_client.get_breaker().failures, 0)
+
+    def test_half_open_trial_success_closes_the_circuit(self):
+        self.upstream()
+        breaker = self.open_circuit()
+        openai_client.chat_completion(MESSAGES)
+        self.assertEqual(breaker.stats(), {'state': 'closed', 'consecutive_failures': 0})
+
+    def test_half_open_trial_failure_reopens_the_circuit(self):
+        self.upstream(statuses=[500] * 3)
+        breaker = self.open_circuit()
+        with self.assertRaises(openai.InternalServerError):
+            openai_client.chat_completion(MESSAGES)
+        self.assertEqual(breaker.state, 'open')
+
+    def test_half_open_allows_one_trial_at_a_time(self):
+        self.upstream()
+        breaker = self.open_circuit()
+        trial = breaker.begin()
+        with self.assertRaises(openai_client.CircuitOpenError):
+            breaker.begin()
+        trial.success()
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_async_completion_is_retried(self):
+        server = self.upstream(statuses=[502])
+        response = self.run_async(lambda: openai_client.achat_completion(MESSAGES))
+        self.assertEqual(response.choices[0].message.content, 'Hello')
+        self.assertEqual(server.requests, 2)
+
+    def test_cancelled_call_is_neither_success_nor_failure(self):
+        self.upstream(delay=0.5)
+        breaker = openai_client.get_breaker()
+        breaker.record_failure()
+
+        async def cancelled():
+            await asyncio.wait_for(openai_client.achat_completion(MESSAGES), timeout=0.05)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_async(cancelled)
+        self.assertEqual(breaker.stats(), {'state': 'closed', 'consecutive_failures': 1})
+
+    def test_cancelled_trial_frees_the_slot_and_keeps_the_circuit_half_open(self):
+        self.upstream(delay=0.5)
+        breaker = self.open_circuit()
+
+        async def cancelled():
+            await asyncio.wait_for(openai_client.achat_completion(MESSAGES), timeout=0.05)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_async(cancelled)
+        self.assertEqual(breaker.stats(), {'state': 'half-open', 'consecutive_failures': 2})
+        breaker.begin().success()  # The slot is free for the next trial
+
+    def test_stream_records_success_when_completed(self):
+        self.upstream()
+        breaker = self.open_circuit()
+
+        async def consume():
+            return [text async for text in openai_client.stream_chat_completion(MESSAGES)]
+
+        self.assertEqual(self.run_async(consume), ['Hello'])
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_abandoned_stream_is_neither_success_nor_failure(self):
+        self.upstream()
+        breaker = self.open_circuit()
+
+        async def abandon():
+            stream = openai_client.stream_chat_completion(MESSAGES)
+            await anext(stream)
+            await stream.aclose()  # The client disconnected after the first chunk
+
+        self.run_async(abandon)
+        self.assertEqual(breaker.stats(), {'state': 'half-open', 'consecutive_failures': 2})
+
+    def test_async_client_is_closed_when_its_loop_shuts_down(self):
+        self.upstream()
+
+        async def complete():
+            await openai_client.achat_completion(MESSAGES)
+            return openai_client.get_async_client()
+
+        client = self.run_async(complete)
+        self.assertTrue(client.is_closed())
+        self.assertEqual(openai_client._async_clients, {})
+
+    def test_reset_closes_async_clients_on_their_loop(self):
+        self.upstream()
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        async def complete():
+            await openai_client.achat_completion(MESSAGES)
+            return openai_client.get_async_client()
+
+        client = loop.run_until_complete(complete())
+        self.assertFalse(client.is_closed())
+        openai_client.reset()
+        self.assertTrue(client.is_closed())
+        self.assertEqual(openai_client._async_clients, {})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ChatStreamApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        answer_cache.clear()
+        self.addCleanup(answer_cache.clear)
+        self.user = User.objects.create(username='streamer')
+        StudentProfile.objects.create(user=self.user, subscription_package='premium')
+        self.server = FakeUpstream()
+        self.enterContext(self.server)
+        self.enterContext(override_settings(OPENAI_API_KEY='test', OPENAI_BASE_URL=self.server.base_url))
+        openai_client.reset()
+        self.addCleanup(openai_client.reset)
+
+    async def stream(self, message):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        response = await client.post(reverse('helper:chat_stream_api'), {'message': message},
+                                     content_type='application/json')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        return response, [
+            (event.split('\n')[0].removeprefix('event: '), json.loads(event.split('\n')[1].removeprefix('data: ')))
+            for event in body.strip().split('\n\n')
+        ]
+
+    def test_answer_streams_as_token_then_done_events(self):
+        response, events = async_to_sync(self.stream)('How do I write a good motivation letter?')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual([name for name, _ in events], ['token', 'done'])
+        self.assertEqual(events[0][1], {'text': 'Hello'})
+        self.assertIsNotNone(events[1][1]['time_to_first_token_ms'])
+        self.assertEqual(self.server.requests, 1)
+        self.assertEqual(openai_client.get_breaker().state, 'closed')
+        self.assertIsNotNone(StudentProfile.objects.get(user=self.user).last_chat_date)
+
+
+class AnswerCacheTests(SimpleTestCase):
+    FACETS = (30, 'basic')
+
+    def setUp(self):
+        self.cache = AnswerCache(max_entries=100, ttl=3600, threshold=0.75)
+        self.cache.store('What APS do I need for Wits?', self.FACETS, 'Wits needs 34.', tokens=50)
+
+    def test_exact_and_reworded_questions_hit(self):
+        for question in ('what aps do I need for WITS', 'What APS is needed for Wits?', 'Wits APS needed'):
+            with self.subTest(question=question):
+                self.assertEqual(self.cache.lookup(question, self.FACETS).answer, 'Wits needs 34.')
+        self.assertEqual(self.cache.stats()['tokens_saved'], 150)
+
+    def test_unrelated_question_and_other_facets_miss(self):
+        self.assertIsNone(self.cache.lookup('When do applications close at Wits?', self.FACETS))
+        self.assertIsNone(self.cache.lookup('What APS do I need for Wits?', (40, 'basic')))
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_different_university_or_number_misses(self):
+        self.cache.store('Can I get into Wits with 30 points?', self.FACETS, 'No.', tokens=50)
+        self.assertIsNone(self.cache.lookup('What APS do I need for UJ?', self.FACETS))
+        self.assertIsNone(self.cache.lookup('Can I get into Wits with 35 points?', self.FACETS))
+
+    def test_negated_question_misses(self):
+        for question in ('What APS do I not need for Wits?', "What APS don't I need for Wits?"):
+            with self.subTest(question=question):
+                self.assertIsNone(self.cache.lookup(question, self.FACETS))
+
+    def test_anchors(self):
+        self.assertEqual(question_anchors('fees at uct'), {'uct'})
+        self.assertNotEqual(question_anchors('fees at uct'), question_anchors('fees at uj'))
+        self.assertEqual(question_anchors('isn t there a fee at uct'), {'uct', 'not'})
+        self.assertEqual(question_anchors('what aps for 35 points'), {'35'})
+
+    def test_expired_entry_misses(self):
+        self.cache.store('Wits closing date', self.FACETS, '30 September.', tokens=50, now=0)
+        self.assertIsNotNone(self.cache.lookup('Wits closing date', self.FACETS, now=1))
+        self.assertIsNone(self.cache.lookup('Wits closing date', self.FACETS, now=3600))
+
+    def test_store_evicts_expired_then_least_recently_used(self):
+        cache = AnswerCache(max_entries=2, ttl=100, threshold=0.75)
+        cache.store('Wits closing date', self.FACETS, '30 September.', tokens=1, now=0)
+        cache.store('UCT closing date', self.FACETS, '31 July.', tokens=1, now=50)
+        cache.store('UJ closing date', self.FACETS, '31 October.', tokens=1, now=120)
+        # The Wits entry expired at 100, so nothing live had to go
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertIsNotNone(cache.lookup('UCT closing date', self.FACETS, now=121))
+        cache.store('UP closing date', self.FACETS, '30 June.', tokens=1, now=122)
+        # Over max_entries: UJ is the least recently used, UCT was just looked up
+        self.assertIsNone(cache.lookup('UJ closing date', self.FACETS, now=123))
+        self.assertIsNotNone(cache.lookup('UCT closing date', self.FACETS, now=123))
+        self.assertIsNotNone(cache.lookup('UP closing date', self.FACETS, now=123))
+
+    def test_stem(self):
+        self.assertEqual([stem(word) for word in ('needed', 'needs', 'applying', 'fees', 'aps', 'class')],
+                         ['need', 'need', 'apply', 'fee', 'aps', 'class'])
+
+
+class CatalogAnswerTests(SimpleTestCase):
+    def test_application_fee_question_is_answered(self):
+        for question in ('What is the application fee at UCT?', 'How much does it cost to apply to UCT?'):
+            with self.subTest(question=question):
+                result = answer_catalog_question(question)
+                self.assertEqual(result.intents, ('application_fee',))
+                self.assertIn('application fee for University of Cape Town', result.answer)
+
+    def test_fee_and_cost_questions_without_application_go_to_the_model(self):
+        for question in ('fees at UCT', 'What are the Wits fees?', 'How much does UCT cost?',
+                         'What is the tuition fee at UJ?'):
+            with self.subTest(question=question):
+                self.assertIsNone(answer_catalog_question(question))
+
+    def test_other_intents_are_unaffected(self):
+        self.assertEqual(answer_catalog_question('What is the minimum APS for Wits?').intents, ('minimum_aps',))
+
+
+def make_university(university_id, minimum_aps, province='Gauteng', **fields):
+    return {'id': university_id, 'name': f'University {university_id}', 'minimum_aps': minimum_aps,
+            'province': province, 'application_fee': 'R100', 'due_date': '2025-09-30', **fields}
+
+
+class ParseApplicationFeeTests(SimpleTestCase):
+    def test_labels(self):
+        cases = [
+            ('R100', (100, None, False)),
+            ('R220 (on-time), R440 (late)', (220, 440, False)),
+            ('FREE (online), R200 (manual)', (0, None, True)),
+            ('Free', (0, None, True)),
+            ('R1 000', (1000, None, False)),
+            ('To be confirmed', (0, None, False)),
+            ('', (0, None, False)),
+            (None, (0, None, False)),
+        ]
+        for label, expected in cases:
+            with self.subTest(label=label):
+                self.assertEqual(parse_application_fee(label), expected)
+
+
+class UniversityCatalogTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog = UniversityCatalog([
+            make_university(1, 30, 'Western Cape'),
+            make_university(2, 20),
+            make_university(3, 30),
+            make_university(4, 25, 'Western Cape', application_fee='FREE (online), R200 (manual)'),
+        ])
+
+    def test_get(self):
+        self.assertEqual(self.catalog.get(2).id, 2)
+        self.assertEqual(self.catalog.get('2').id, 2)
+        for unknown in (99, 'abc', None):
+            with self.subTest(university_id=unknown):
+                self.assertIsNone(self.catalog.get(unknown))
+
+    def test_get_many_keeps_order_and_skips_unknown_ids(self):
+        self.assertEqual([uni.id for uni in self.catalog.get_many([3, 99, '1', 'x', 2])], [3, 1, 2])
+
+    def test_by_province_keeps_catalog_order(self):
+        self.assertEqual({province: [uni.id for uni in unis] for province, unis in self.catalog.by_province.items()},
+                         {'Western Cape': [1, 4], 'Gauteng': [2, 3]})
+
+    def test_sorted_by_aps_is_stable(self):
+        self.assertEqual([uni.id for uni in self.catalog.sorted_by_aps], [2, 4, 1, 3])
+        self.assertEqual(self.catalog.minimum_aps, (20, 25, 30, 30))
+
+    def test_version_follows_the_data(self):
+        same = UniversityCatalog([make_university(1, 30, 'Western Cape'), make_university(2, 20),
+                                  make_university(3, 30),
+                                  make_university(4, 25, 'Western Cape',
+                                                  application_fee='FREE (online), R200 (manual)')])
+        changed = UniversityCatalog([make_university(1, 31, 'Western Cape'), make_university(2, 20),
+                                     make_university(3, 30), make_university(4, 25, 'Western Cape')])
+        self.assertEqual(same.version, self.catalog.version)
+        self.assertNotEqual(changed.version, self.catalog.version)
+
+
+class FacultyIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog = UniversityCatalog([make_university(1, 30), make_university(2, 25)])
+        self.index = FacultyIndex(
+            self.catalog,
+            {'University 1': ['Engineering', 'Health Sciences'], 'University 2': ['Engineering']},
+            {'University 1': {'Health Sciences': ['BSc Nursing', 'Bachelor of Nursing Science']},
+             'University 2': {'Engineering': ['BEng  Civil Engineering', 'BSc Nursing']}},
+        )
+
+    def test_faculties_by_university(self):
+        self.assertEqual(self.index.faculties_for(1), ('Engineering', 'Health Sciences'))
+        self.assertEqual(self.index.faculties_for(99), ())
+        self.assertEqual(self.index.university_ids_for_faculty('Engineering'), {1, 2})
+        self.assertEqual(self.index.university_ids_for_faculty('Law'), frozenset())
+
+    def test_exact_course_lookup_ignores_case_and_spacing(self):
+        self.assertEqual(self.index.university_ids_for_course('bsc  NURSING'), {1, 2})
+        self.assertEqual(self.index.course_names['beng civil engineering'], 'BEng  Civil Engineering')
+
+    def test_course_substring_falls_back_to_every_match(self):
+        self.assertEqual(self.index.university_ids_for_course('nursing'), {1, 2})
+        self.assertEqual(self.index.university_ids_for_course('civil'), {2})
+        self.assertEqual(self.index.university_ids_for_course('dentistry'), frozenset())
+        self.assertEqual(self.index.university_ids_for_course('  '), frozenset())
+
+    def test_names_missing_from_the_catalog_are_logged_and_skipped(self):
+        # faculty_data spells Nelson Mandela University differently from the catalog
+        with self.assertLogs('helper', 'WARNING') as logs:
+            index = FacultyIndex(get_catalog(), FACULTIES_OPEN, FACULTY_COURSES)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Nelson Mandela University (NMU)', logs.output[0])
+        self.assertNotIn(None, index.faculties_by_university)
+        self.assertEqual(set(index.faculties_by_university), {
+            uni.id for uni in get_catalog() if uni.name in FACULTIES_OPEN
+        })
+
+
+class SearchCatalogTests(SimpleTestCase):
+    def test_abbreviation_ranks_its_university_first(self):
+        for query, name in (('UCT', 'University of Cape Town (UCT)'),
+                            ('wits', 'University of the Witwatersrand (Wits)')):
+            top = search_catalog(query)[0]
+            self.assertEqual((top['type'], top['name']), ('university', name))
+
+    def test_exact_name_beats_similar_names(self):
+        results = search_catalog('University of Pretoria (UP)')
+        self.assertEqual(results[0]['name'], 'University of Pretoria (UP)')
+        self.assertGreater(results[0]['score'], results[1]['score'])
+
+    def test_typos_are_tolerated(self):
+        self.assertEqual(search_catalog('stellenbosh')[0]['name'], 'Stellenbosch University (SU)')
+
+    def test_scores_are_descending(self):
+        scores = [result['score'] for result in search_catalog('university of technology', limit=20)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_kinds_and_limit(self):
+        results = search_catalog('nursing', limit=3, kinds=('course',))
+        self.assertEqual(len(results), 3)
+        self.assertEqual({result['type'] for result in results}, {'course'})
+        self.assertEqual(search_catalog('nursing', kinds=('university',)), ())
+        self.assertEqual(search_catalog('   '), ())
+
+
+class UniversityRecordTests(SimpleTestCase):
+    def test_records_are_immutable_with_precomputed_fields(self):
+        record = get_university_by_id(5)  # UJ: "FREE (online), R200 (manual)"
+        self.assertIsInstance(record, UniversityRecord)
+        self.assertEqual((record.fee_amount, record.late_fee_amount, record.is_free), (0, None, True))
+        self.assertEqual(record.detail_url, reverse('helper:university_detail', args=[5]))
+        self.assertEqual(record.select_url, reverse('helper:select_university', args=[5]))
+        with self.assertRaises(AttributeError):
+            record.minimum_aps = 10
+        copy = record.as_dict()
+        copy['minimum_aps'] = 10
+        self.assertEqual(get_university_by_id(5).minimum_aps, 30)
+
+    def test_static_data_accessors(self):
+        self.assertEqual(len(get_all_universities()), len(get_catalog()))
+        self.assertIs(get_university_by_id(1), get_catalog().by_id[1])
+        self.assertEqual(get_university_by_id(1).name, 'University of Cape Town (UCT)')
+        self.assertIsNone(get_university_by_id(-1))
+
+
+class EligibilityTests(SimpleTestCase):
+    def test_qualified_universities_at_the_bisect_boundaries(self):
+        catalog = get_catalog()
+        lowest = catalog.minimum_aps[0]
+        self.assertEqual(qualified_universities(lowest - 1), ())
+        self.assertEqual(qualified_universities(0), ())
+        at_lowest = qualified_universities(lowest)
+        self.assertTrue(at_lowest)
+        self.assertTrue(all(uni.minimum_aps == lowest for uni in at_lowest))
+
+        for uni in catalog:
+            with self.subTest(university=uni.name):
+                self.assertIn(uni, qualified_universities(uni.minimum_aps))
+                self.assertNotIn(uni, qualified_universities(uni.minimum_aps - 1))
+        self.assertEqual(qualified_universities(catalog.minimum_aps[-1]), catalog.sorted_by_aps)
+
+    def test_highly_qualified_needs_the_margin(self):
+        uni = get_university_by_id(1)
+        self.assertIn(uni, highly_qualified_universities(uni.minimum_aps + HIGHLY_QUALIFIED_MARGIN))
+        self.assertNotIn(uni, highly_qualified_universities(uni.minimum_aps + HIGHLY_QUALIFIED_MARGIN - 1))
+
+
+class UniversitiesListTests(TestCase):
+    def test_qualification_status_follows_the_eligibility_helpers(self):
+        user = User.objects.create(username='browser')
+        StudentProfile.objects.create(user=user, stored_aps_score=35)
+        self.client.force_login(user)
+        response = self.client.get(reverse('helper:universities_list'))
+        statuses = {uni['id']: uni['qualification_status'] for uni in response.context['eligible_universities']}
+        self.assertEqual(len(statuses), len(get_catalog()))
+        for uni in get_catalog():
+            expected = ('highly_qualified' if uni.minimum_aps <= 35 - HIGHLY_QUALIFIED_MARGIN
+                        else 'qualified' if uni.minimum_aps <= 35 else 'not_qualified')
+            self.assertEqual(statuses[uni.id], expected, uni.name)
+
+
+class PayloadTests(SimpleTestCase):
+    def test_payloads_list_the_qualified_universities(self):
+        expected = [uni.id for uni in qualified_universities(30)]
+        self.assertEqual([uni['id'] for uni in json.loads(universities_api_payload(30))['universities']], expected)
+        self.assertEqual([uni['id'] for uni in json.loads(qualified_universities_script_json(30))], expected)
+        self.assertEqual(json.loads(universities_api_payload(None)), {'universities': []})
+
+    def test_script_json_is_safe_inside_a_script_element(self):
+        self.assertNotIn('<', qualified_universities_script_json(42))
+        self.assertNotIn('&', qualified_universities_script_json(42))
+
+
+class UniversityFilterTests(SimpleTestCase):
+    def test_empty_filters_list_the_whole_catalog(self):
+        key = normalize_filters()
+        self.assertEqual(key, normalize_filters(search='  ', province='', faculty=None, course=''))
+        result = filter_universities(key)
+        self.assertEqual(result.ids, tuple(uni.id for uni in get_catalog()))
+        self.assertEqual(result.ids_by_aps, tuple(uni.id for uni in get_catalog().sorted_by_aps))
+
+    def test_mixed_case_input_shares_a_key(self):
+        self.assertEqual(
+            normalize_filters(search=' Cape  TOWN ', province='western cape', faculty='engineering', course='BSc  '),
+            normalize_filters(search='cape town', province='Western Cape', faculty='Engineering', course='bsc'),
+        )
+
+    def test_province_filter(self):
+        result = filter_universities(normalize_filters(province='GAUTENG'))
+        self.assertTrue(result.ids)
+        self.assertEqual({get_university_by_id(uni_id).province for uni_id in result.ids}, {'Gauteng'})
+
+    def test_unknown_province_matches_nothing(self):
+        self.assertEqual(filter_universities(normalize_filters(province='Atlantis')).ids, ())
+
+    def test_filters_combine(self):
+        result = filter_universities(normalize_filters(province='Western Cape', min_aps=30, search='university'))
+        for uni_id in result.ids:
+            uni = get_university_by_id(uni_id)
+            self.assertEqual(uni.province, 'Western Cape')
+            self.assertLessEqual(uni.minimum_aps, 30)
+            self.assertIn('university', uni.name.lower())
+        self.assertEqual(sorted(result.ids), sorted(result.ids_by_aps))
+
+
+class CacheStatsApiTests(TestCase):
+    def test_staff_see_the_university_filter_cache(self):
+        filter_universities(normalize_filters(province='Gauteng'))
+        self.client.force_login(User.objects.create(username='ops', is_staff=True))
+        stats = self.client.get(reverse('helper:dashboard_cache_stats_api')).json()
+        self.assertEqual(set(stats['university_filters']), {'hits', 'misses', 'maxsize', 'currsize'})
+        self.assertGreater(stats['university_filters']['currsize'], 0)
+
+    def test_students_are_refused(self):
+        self.client.force_login(User.objects.create(username='student'))
+        self.assertEqual(self.client.get(reverse('helper:dashboard_cache_stats_api')).status_code, 403)
+
+
+class AutocompleteTests(SimpleTestCase):
+    def test_trie_completes_shorter_keys_first_then_alphabetically(self):
+        trie = PrefixTrie()
+        for key in ('mathematics', 'maths', 'math', 'physics', 'mat'):
+            trie.insert(key, key)
+        self.assertEqual(trie.complete('mat'), ['mat', 'math', 'maths', 'mathematics'])
+        self.assertEqual(trie.complete('MATH'), ['math', 'maths', 'mathematics'])
+        self.assertEqual(trie.complete('chem'), [])
+
+    def test_trie_respects_limit_and_predicate(self):
+        trie = PrefixTrie()
+        for key in ('ab', 'abc', 'abd', 'abcd'):
+            trie.insert(key, key)
+        self.assertEqual(trie.complete('ab', limit=2), ['ab', 'abc'])
+        self.assertEqual(trie.complete('ab', predicate=lambda value: value.endswith('d')), ['abd', 'abcd'])
+
+    def test_limit_is_capped(self):
+        self.assertEqual(len(autocomplete('', 'university', limit=1000)), min(MAX_LIMIT, len(get_catalog())))
+        self.assertEqual(len(autocomplete('', 'subject', limit=0)), 1)
+
+    def test_words_inside_a_name_match(self):
+        self.assertIn({'type': 'subject', 'value': 'Physical Sciences', 'group': 'elective'},
+                      autocomplete('sciences', 'subject'))
+
+    def test_universities_match_by_abbreviation(self):
+        uct = next(uni for uni in get_catalog() if uni.name.startswith('University of Cape Town'))
+        self.assertIn({'type': 'university', 'value': uct.name, 'id': uct.id}, autocomplete('uct', 'university'))
+
+    def test_courses_complete(self):
+        results = autocomplete('nurs', 'course', limit=MAX_LIMIT)
+        self.assertTrue(results)
+        for result in results:
+            self.assertEqual(result['type'], 'course')
+            self.assertIn('nurs', result['value'].lower())
+
+
+class AutocompleteApiTests(TestCase):
+    def test_unknown_type_is_rejected(self):
+        response = self.client.get(reverse('helper:autocomplete_api'), {'q': 'a', 'type': 'planet'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_course_suggestions(self):
+        response = self.client.get(reverse('helper:autocomplete_api'), {'q': 'nurs', 'type': 'course'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['results'])
+
+    def test_universities_list_no_longer_embeds_the_course_list(self):
+        user = User.objects.create(username='browser')
+        StudentProfile.objects.create(user=user, stored_aps_score=30)
+        self.client.force_login(user)
+        response = self.client.get(reverse('helper:universities_list'))
+        self.assertNotIn('all_courses', response.context)
+        self.assertContains(response, 'data-autocomplete="course"')
+        self.assertContains(response, '<datalist id="courseOptions"></datalist>', html=False)
@@ -0,0 +1,137 @@
+# helper/university_filters.py
+
+"""
+Facets and filtered result lists for the universities page.
+
+Facet lists (faculties, provinces, APS buckets) depend only on the
+static data, so they are built once per catalog version. Filtered results depend
+only on the normalized filter values, so the matching university IDs are kept in
+a bounded LRU; the per-student qualification annotations are applied by the view
+on top. Province, faculty and course filters are intersections of ID sets.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from .faculty_index import get_faculty_index, normalize_course
+from .university_static_data import get_catalog
+
+# Width of each bucket in the minimum-APS facet
+APS_BUCKET_SIZE = 5
+
+# Distinct filter combinations kept; searches are free text, so this must be bounded
+FILTER_CACHE_SIZE = 256
+
+
+class ApsBucket(NamedTuple):
+    low: int
+    high: int
+    count: int
+
+
+class Facets(NamedTuple):
+    faculties: Tuple[str, ...]
+    provinces: Tuple[str, ...]
+    aps_buckets: Tuple[ApsBucket, ...]
+
+
+class FilterKey(NamedTuple):
+    search: str
+    province: str
+    min_aps: Optional[int]
+    faculty: str
+    course: str
+
+
+class FilterResult(NamedTuple):
+    ids: Tuple[int, ...]          # Catalog order
+    ids_by_aps: Tuple[int, ...]   # Lowest minimum APS first, catalog order within ties
+
+
+def get_facets():
+    """Return the filter facets of the current catalog."""
+    return _build_facets(get_catalog().version)
+
+
+@lru_cache(maxsize=None)
+def _build_facets(catalog_version):
+    catalog = get_catalog()
+    index = get_faculty_index()
+
+    buckets = {}
+    for aps in catalog.minimum_aps:
+        low = aps - aps % APS_BUCKET_SIZE
+        buckets[low] = buckets.get(low, 0) + 1
+
+    return Facets(
+        faculties=tuple(sorted(index.university_ids_by_faculty)),
+        provinces=tuple(sorted(catalog.by_province)),
+        aps_buckets=tuple(
+            ApsBucket(low, low + APS_BUCKET_SIZE - 1, count) for low, count in sorted(buckets.items())
+        ),
+    )
+
+
+def normalize_filters(search=None, province=None, min_aps=None, faculty=None, course=None):
+    """
+    Return the cache key for a set of filter values; equivalent filters share a key.
+
+    Provinces and faculties are matched case-insensitively and keyed by their
+    catalog spelling. Unknown ones are kept (stripped), so they match nothing.
+    """
+    spellings = _spellings(get_catalog().version)
+    province = ' '.join((province or '').split())
+    faculty = ' '.join((faculty or '').split())
+    return FilterKey(
+        search=' '.join((search or '').lower().split()),
+        province=spellings.get(province.lower(), province),
+        min_aps=int(min_aps) if min_aps is not None else None,
+        faculty=spellings.get(faculty.lower(), faculty),
+        course=normalize_course(course),
+    )
+
+
+@lru_cache(maxsize=None)
+def _spellings(catalog_version):
+    """Lower-cased province and faculty names mapped to their catalog spelling."""
+    facets = _build_facets(catalog_version)
+    return {name.lower(): name for name in (*facets.provinces, *facets.faculties)}
+
+
+def filter_universities(key):
+    """Return the FilterResult for a FilterKey from normalize_filters."""
+    return _filter(get_catalog().version, key)
+
+
+def filter_cache_stats():
+    """Return the hit, miss and size counters of the filtered result cache."""
+    return _filter.cache_info()._asdict()
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _filter(catalog_version, key):
+    catalog = get_catalog()
+    index = get_faculty_index()
+
+    # Set filters first: each is an index lookup intersected with the IDs so far
+    id_sets = []
+    if key.province:
+        id_sets.append(frozenset(uni.id for uni in catalog.by_province.get(key.province, ())))
+    if key.faculty:
+        id_sets.append(index.university_ids_for_faculty(key.faculty))
+    if key.course:
+        id_sets.append(index.university_ids_for_course(key.course))
+
+    universities = catalog.records
+    if id_sets:
+        candidate_ids = frozenset.intersection(*id_sets)
+        universities = [uni for uni in universities if uni.id in candidate_ids]
+    if key.search:
+        universities = [uni for uni in universities if key.search in uni.name.lower()]
+    if key.min_aps is not None:
+        universities = [uni for uni in universities if uni.minimum_aps <= key.min_aps]
+
+    ids = tuple(uni.id for uni in universities)
+    # sorted() is stable, so ties keep catalog order like the old per-request sort
+    ids_by_aps = tuple(uni.id for uni in sorted(universities, key=lambda uni: uni.minimum_aps))
+    return FilterResult(ids, ids_by_aps)
@@ -6,6 +6,10 @@
 # but can be strings like "Contact University" or "Varies".
 # Application fees can also be strings like "R100", "Free", or "Check Website".
 
+from functools import lru_cache
+
+from .catalog import UniversityCatalog
+
 UNIVERSITIES = [
     {
         "id": 1,
@@ -648,17 +652,20 @@ UNIVERSITIES = [
     }
 ]
 
+@lru_cache(maxsize=None)
+def get_catalog():
+    """
+    Returns the process-wide catalog of immutable university records.
+
+    Built on first use rather than at import because records carry reversed
+    URLs, which need the URLconf (and therefore the views) to be loaded.
+    """
+    return UniversityCatalog(UNIVERSITIES)
+
 def get_all_universities():
-    """Returns the list of all universities."""
-    return UNIVERSITIES
+    """Returns all universities as immutable records, in catalog order."""
+    return get_catalog().records
 
 def get_university_by_id(university_id):
-    """Returns a single university dictionary by its ID, or None if not found."""
-    try:
-        university_id = int(university_id)
-    except ValueError:
-        return None
-    for uni in UNIVERSITIES:
-        if uni['id'] == university_id:
-            return uni
-    return None 
\ No newline at end of file
+    """Returns a single immutable university record by its ID, or None if not found."""
+    return get_catalog().get(university_id)
@@ -51,9 +51,10 @@ urlpatterns = [
     path('payments/', views.payments, name='payments'),
     path('payments/unified/', views.unified_payment, name='unified_payment'),
     path('api/payment-statuses/', views.payment_statuses, name='payment_statuses'),
+    path('api/payment-statuses/stream/', views.payment_status_stream, name='payment_status_stream'),
 
     # AI Chat
-    path('chat/', views.chat_history, name='ai_chat'),
+    path('chat/', views.ai_chat, name='ai_chat'),
     path('chat/history/', views.chat_history, name='chat_history'),
 
     # Course Advice
@@ -70,8 +71,13 @@ urlpatterns = [
 
     # API endpoints
     path('api/universities/search/', views.university_search_api, name='university_search_api'),
+    path('api/autocomplete/', views.autocomplete_api, name='autocomplete_api'),
     path('api/chat/message/', views.chat_message_api, name='chat_message_api'),
+    path('api/chat/stream/', views.chat_stream_api, name='chat_stream_api'),
+    path('api/chat-stats/', views.chat_stats_api, name='chat_stats_api'),
     path('api/documents/verify/', views.verify_document_api, name='verify_document_api'),
+    path('api/cache-stats/dashboard/', views.dashboard_cache_stats_api, name='dashboard_cache_stats_api'),
+    path('api/query-stats/', views.query_stats_api, name='query_stats_api'),
     path('edit-marks/', views.edit_marks, name='edit_marks'),
     path('pay-subscription-fee/', views.pay_subscription_fee, name='pay_subscription_fee'),
     path('upgrade-subscription/', views.upgrade_subscription, name='upgrade_subscription'),
@@ -98,4 +98,9 @@ def calculate_payment_breakdown(universities_data):
         'total_university_fee': total_university_fee,
         'package_cost': package_cost,
         'total_payment': total_payment
-    } 
\ No newline at end of file
+    } 
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile (``fraction`` in 0..1) of an already sorted, non-empty list."""
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
@@ -6,10 +6,10 @@ from django.contrib import messages
 from django.utils.safestring import mark_safe
 from django.urls import reverse
 from .forms import DocumentUploadForm, MarksForm
-from .models import DocumentUpload, University, StudentProfile, Payment
+from .models import DocumentUpload, University, StudentProfile, Payment, UniversitySelection
 from .faculty_data import FACULTY_COURSES, FACULTIES_OPEN
-from django_ratelimit.decorators import ratelimit
-from django.http import JsonResponse, HttpResponse, HttpResponseNotFound, HttpResponseNotAllowed, HttpResponseBadRequest
+from django_ratelimit.core import is_ratelimited
+from django.http import JsonResponse, HttpResponse, HttpResponseNotFound, HttpResponseNotAllowed, HttpResponseBadRequest, StreamingHttpResponse
 from django.utils.html import escape
 import openai
 from django.conf import settings
@@ -23,10 +23,33 @@ from .forms import (
     ExtendedUserCreationForm, StudentProfileForm, UniversitySearchForm, ChatForm,
     ApplicationStatusForm, DocumentVerificationForm, WhatsAppEnableForm
 )
-from .university_static_data import get_all_universities, get_university_by_id
+from .university_static_data import get_catalog, get_university_by_id
+from .eligibility import highly_qualified_universities, qualified_universities
+from .aps import calculate_aps
+from .reconciliation import apply_subscription_verification, latest_payment_proofs, reconcile_payments
+from .auto_verification import is_auto_verified
+from .payment_status import build_payment_statuses, payment_status_state
+from .payment_status_markers import payment_status_marker
+from .conditional import conditional_json_response
+from .dashboard_cache import dashboard_cache_stats, get_dashboard_context
+from .middleware import query_stats
+from .openai_client import CircuitOpenError, achat_completion, get_breaker, stream_chat_completion
+from .chat_metrics import chat_stream_stats, stream_duration, time_to_first_token
+from .answer_cache import answer_cache, estimate_tokens, profile_facets
+from .catalog_answers import answer_catalog_question, catalog_answer_stats
+from .payloads import qualified_universities_script_json, universities_api_payload
+from .university_filters import filter_cache_stats, filter_universities, get_facets, normalize_filters
+from .faculty_index import get_faculty_index
+from .search import DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT, search_catalog
+from .nsc_subjects import is_nsc_subject
+from .autocomplete import DEFAULT_LIMIT as DEFAULT_AUTOCOMPLETE_LIMIT, autocomplete
+from django.views.decorators.cache import cache_control
 import time
+import asyncio
+from asgiref.sync import sync_to_async
 from .utils import calculate_application_fees, calculate_payment_breakdown
 from django.db import transaction
+from django.db.models import F
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -37,120 +60,6 @@ if hasattr(settings, 'OPENAI_API_KEY') and settings.OPENAI_API_KEY:
 else:
     logger.critical("OPENAI_API_KEY is not set in settings. AI chat functionality will fail.")
 
-# Valid NSC subjects
-NSC_SUBJECTS = {
-    'compulsory': [
-        "English Home Language",
-        "English First Additional Language",
-        "Afrikaans Home Language",
-        "Afrikaans First Additional Language",
-        "IsiNdebele Home Language",
-        "IsiNdebele First Additional Language",
-        "IsiXhosa Home Language",
-        "IsiXhosa First Additional Language",
-        "IsiZulu Home Language",
-        "IsiZulu First Additional Language",
-        "Sepedi Home Language",
-        "Sepedi First Additional Language",
-        "Sesotho Home Language",
-        "Sesotho First Additional Language",
-        "Setswana Home Language",
-        "Setswana First Additional Language",
-        "Siswati Home Language",
-        "Siswati First Additional Language",
-        "Tshivenda Home Language",
-        "Tshivenda First Additional Language",
-        "Xitsonga Home Language",
-        "Xitsonga First Additional Language",
-        "Life Orientation",
-        "Mathematics",
-        "Mathematical Literacy"
-    ],
-    'elective': [
-        "Accounting",
-        "Agricultural Sciences",
-        "Business Studies",
-        "Consumer Studies",
-        "Dramatic Arts",
-        "Economics",
-        "Engineering Graphics and Design",
-        "Geography",
-        "History",
-        "Information Technology",
-        "Life Sciences",
-        "Music",
-        "Physical Sciences",
-        "Tourism",
-        "Visual Arts",
-        "Computer Applications Technology",
-        "Religion Studies"
-    ]
-}
-
-def calculate_aps(marks):
-    """
-    Calculate APS score based on NSC marks according to official South African requirements.
-    APS is calculated using the best 6 subjects (excluding Life Orientation).
-    Points are awarded as follows:
-    80-100% = 7 points
-    70-79% = 6 points
-    60-69% = 5 points
-    50-59% = 4 points
-    40-49% = 3 points
-    30-39% = 2 points
-    0-29% = 1 point
-    """
-    if not marks or not isinstance(marks, dict) or len(marks) != 7:
-        return None
-
-    # Store all valid subject marks
-    subject_marks = []
-    has_life_orientation = False
-
-    for subject, mark in marks.items():
-        if mark is None:
-            return None
-
-        try:
-            mark_num = float(mark)
-        except (ValueError, TypeError):
-            return None
-
-        if not 0 <= mark_num <= 100:
-            return None
-
-        # Track Life Orientation but don't include in APS calculation
-        if subject == 'Life Orientation':
-            has_life_orientation = True
-            continue
-
-        # Calculate points based on mark ranges
-        if mark_num >= 80:
-            points = 7
-        elif mark_num >= 70:
-            points = 6
-        elif mark_num >= 60:
-            points = 5
-        elif mark_num >= 50:
-            points = 4
-        elif mark_num >= 40:
-            points = 3
-        elif mark_num >= 30:
-            points = 2
-        else:
-            points = 1
-
-        subject_marks.append(points)
-
-    # Validate requirements
-    if not has_life_orientation or len(subject_marks) != 6:
-        return None
-
-    # Calculate total APS (sum of best 6 subjects)
-    aps = sum(subject_marks)
-
-    return aps
-
 def custom_404(request, exception):
     """Handle 404 errors with a custom page."""
     return render(request, '404.html', status=404)
@@ -316,7 +225,8 @@ def subscription_selection(request):
 def dashboard_student(request):
     """Display student dashboard."""
     try:
-        profile = StudentProfile.objects.get(user=request.user)
+        # Through the relation, so base.html's user.studentprofile reuses it instead of querying again
+        profile = request.user.studentprofile
     except StudentProfile.DoesNotExist:
         # Create a new profile with default values
         profile = StudentProfile.objects.create(
@@ -325,68 +235,53 @@ def dashboard_student(request):
         )
     
     applications = ApplicationStatus.objects.filter(student=profile)
-    documents = DocumentUpload.objects.filter(user=request.user)
     form = DocumentUploadForm()
-    
-    marks_list = []
-    if profile.marks:
-        for subject, mark in profile.marks.items():
-            marks_list.append({'subject': subject, 'mark': mark})
-    else:
-        marks_list = [{'subject': None, 'mark': None} for _ in range(7)]
-    
-    all_static_universities = get_all_universities()
-    recommended_universities_list = []
-    qualified_universities_list = []
-    
-    # Get selected universities from profile
-    selected_uni_ids = profile.selected_universities or []
-    selected_universities = []
-    
-    # Get details for each selected university
-    for uni_id in selected_uni_ids:
-        uni = get_university_by_id(uni_id)
-        if uni:
-            uni['detail_url'] = reverse('helper:university_detail', args=[uni_id])
-            selected_universities.append(uni)
-
-    if profile.stored_aps_score is not None:
-        qualified_universities_list = [
-            uni for uni in all_static_universities 
-            if uni['minimum_aps'] <= profile.stored_aps_score
-        ]
-        qualified_universities_list.sort(key=lambda x: x['minimum_aps'])
-        
-        recommended_universities_list = [
-            uni for uni in qualified_universities_list 
-            if uni['id'] not in selected_uni_ids
-        ][:5]
-        
-        # Add detail_url and select_url to recommended_universities_list
-        for uni in recommended_universities_list:
-            uni['detail_url'] = reverse('helper:university_detail', args=[uni['id']])
-            uni['select_url'] = reverse('helper:select_university', args=[uni['id']])
-
-    qualified_unis_data_for_js = []
-    for uni in qualified_universities_list:
-        js_uni_data = uni.copy()
-        js_uni_data['detail_url'] = reverse('helper:university_detail', args=[uni['id']])
-        js_uni_data['select_url'] = reverse('helper:select_university', args=[uni['id']])
-        qualified_unis_data_for_js.append(js_uni_data)
+
+    def build_context():
+        marks_list = []
+        if profile.marks:
+            for subject, mark in profile.marks.items():
+                marks_list.append({'subject': subject, 'mark': mark})
+        else:
+            marks_list = [{'subject': None, 'mark': None} for _ in range(7)]
+
+        recommended_universities_list = []
+        qualified_universities_list = []
+
+        # Get selected universities from profile
+        selected_uni_ids = profile.selected_university_ids()
+
+        # Catalog records are immutable and already carry their detail/select URLs
+        selected_universities = get_catalog().get_many(selected_uni_ids)
+
+        if profile.stored_aps_score is not None:
+            # Memoized bisect over the APS-sorted catalog; no per-request filter or sort
+            qualified_universities_list = qualified_universities(profile.stored_aps_score)
+
+            recommended_universities_list = [
+                uni for uni in qualified_universities_list
+                if uni.id not in selected_uni_ids
+            ][:5]
+
+        return {
+            # Evaluated here so the list (and each document's university) is cached too
+            'documents': list(DocumentUpload.objects.filter(user=request.user).select_related('university')),
+            'marks_list': marks_list,
+            'recommended_universities': recommended_universities_list,
+            # Pre-encoded per APS; the same string for every student with this score
+            'universities': qualified_universities_script_json(profile.stored_aps_score),
+            'selected_universities': selected_universities,
+            'qualified_universities_list': qualified_universities_list,
+        }
 
     context = {
         'profile': profile,
         'applications': applications,
-        'documents': documents,
         'form': form,
         'title': 'Dashboard',
-        'marks_list': marks_list,
-        'nsc_subjects': NSC_SUBJECTS,
         'student_aps': profile.stored_aps_score,
-        'recommended_universities': recommended_universities_list,
-        'universities': json.dumps(qualified_unis_data_for_js, cls=DjangoJSONEncoder) if qualified_unis_data_for_js else '[]',
-        'selected_universities': selected_universities,
-        'qualified_universities_list': qualified_universities_list,
+        # Cached per student until the profile, an application or a document changes
+        **get_dashboard_context(profile, build_context),
     }
     return render(request, 'helper/dashboard_student.html', context)
 
@@ -427,6 +322,12 @@ def update_marks(request):
             messages.error(request, "Please enter exactly 7 subject marks.")
             return redirect('helper:dashboard_student')
 
+        # Subjects are typed with autocomplete suggestions, so check they are real NSC subjects
+        unknown_subjects = [subject for subject in marks if not is_nsc_subject(subject)]
+        if unknown_subjects:
+            messages.error(request, f"Unknown subject: {unknown_subjects[0]}. Please choose a subject from the suggestions.")
+            return redirect('helper:dashboard_student')
+
         # Check for required subjects
         required_subjects = {
             "Life Orientation": False,
@@ -465,8 +366,8 @@ def update_marks(request):
         profile.stored_aps_score = aps
         profile.save()
 
-        # Get number of qualified universities
-        qualified_count = University.objects.filter(minimum_aps__lte=aps).count()
+        # Get number of qualified universities from the static catalog
+        qualified_count = len(qualified_universities(aps))
         messages.success(request, f"Marks updated successfully! Your APS score is {aps}. You qualify for {qualified_count} universities.")
         return redirect('helper:dashboard_student')
     
@@ -603,24 +504,7 @@ def verify_document(request, doc_id):
                 
                 # If this is a subscription payment document, update related records
                 if document.document_type == 'subscription_payment':
-                    # Update any related payment records
-                    updated_payments = Payment.objects.filter(
-                        user=document.user,
-                        payment_status='pending'
-                    ).update(
-                        payment_status='paid' if document.verified else 'not_paid',
-                        verification_date=timezone.now() if document.verified else None
-                    )
-                    logger.info(f"Updated {updated_payments} payment records for user {document.user.id}")
-                    
-                    # Update any related application statuses
-                    updated_applications = ApplicationStatus.objects.filter(
-                        student__user=document.user,
-                        status='pending'
-                    ).update(
-                        payment_verified=document.verified
-                    )
-                    logger.info(f"Updated {updated_applications} application statuses for user {document.user.id}")
+                    apply_subscription_verification(document)
                 
                 messages.success(request, "Document verification status updated!")
                 return redirect('helper:document_list')
@@ -640,101 +524,81 @@ def verify_document(request, doc_id):
 @login_required
 def universities_list(request):
     profile = get_object_or_404(StudentProfile, user=request.user)
-    
-    # Get all unique faculties for the filter dropdown
-    all_faculties = set()
-    for faculties in FACULTIES_OPEN.values():
-        all_faculties.update(faculties)
-    all_faculties = sorted(list(all_faculties))
-    
-    # Create form with dynamic faculty choices
+
+    # Facets are computed once per catalog version
+    facets = get_facets()
+    all_faculties = facets.faculties
+
+    # Create form with dynamic faculty and province choices
     form = UniversitySearchForm(request.GET)
     form.fields['faculty'].choices = [('', 'All Faculties')] + [(f, f) for f in all_faculties]
-    
-    student_aps = profile.stored_aps_score
+    form.fields['province'].choices = [('', 'All Provinces')] + [(p, p) for p in facets.provinces]
 
-    # Get all universities from static data
-    all_universities = get_all_universities()
-    universities_to_display = list(all_universities) # Start with a copy
+    student_aps = profile.stored_aps_score
 
     # Get selected universities from profile
-    selected_uni_ids = profile.selected_universities or []
+    selected_uni_ids = profile.selected_university_ids()
+    selected_id_set = set(selected_uni_ids)
 
-    # Apply search filters if form is valid
+    # Matching IDs are cached per normalized filter combination
     if form.is_valid():
-        search_query = form.cleaned_data.get('search')
-        province_filter = form.cleaned_data.get('province')
-        min_aps_filter = form.cleaned_data.get('min_aps') # User's filter input for min_aps
-        faculty_filter = form.cleaned_data.get('faculty') # New faculty filter
-
-        if search_query:
-            universities_to_display = [uni for uni in universities_to_display if search_query.lower() in uni['name'].lower()]
-        
-        if province_filter:
-            universities_to_display = [uni for uni in universities_to_display if uni['province'] == province_filter]
-        
-        if min_aps_filter is not None: # If user filtered by a specific APS
-            universities_to_display = [uni for uni in universities_to_display if uni['minimum_aps'] <= min_aps_filter]
-        
-        if faculty_filter: # Filter by faculty
-            universities_to_display = [
-                uni for uni in universities_to_display 
-                if uni['name'] in FACULTIES_OPEN and faculty_filter in FACULTIES_OPEN[uni['name']]
-            ]
-    
-    # Prepare list for template, checking eligibility based on student's actual APS
+        filter_key = normalize_filters(
+            search=form.cleaned_data.get('search'),
+            province=form.cleaned_data.get('province'),
+            min_aps=form.cleaned_data.get('min_aps'),  # User's filter input for min_aps
+            faculty=form.cleaned_data.get('faculty'),
+            course=form.cleaned_data.get('course'),
+        )
+    else:
+        filter_key = normalize_filters()
+    filtered = filter_universities(filter_key)
+
+    catalog = get_catalog()
+    faculty_index = get_faculty_index()
+    # Prepare list for template, checking eligibility based on student's actual APS.
+    # Qualification only depends on the APS difference, so the old qualification sort
+    # is the same as ordering by minimum APS, which the cached result already has.
     eligible_universities_for_template = []
     if student_aps is not None:
-        for uni in universities_to_display: # Iterate through already filtered list
-            aps_difference = student_aps - uni['minimum_aps']
+        # Memoized per APS, shared with the dashboard
+        qualified_ids = {uni.id for uni in qualified_universities(student_aps)}
+        highly_qualified_ids = {uni.id for uni in highly_qualified_universities(student_aps)}
+        for uni in catalog.get_many(filtered.ids_by_aps):
+            aps_difference = student_aps - uni.minimum_aps
             qualification_status = 'not_qualified'
             qualification_message = f"You are {abs(aps_difference)} points below the minimum APS requirement"
 
-            if aps_difference >= 5:
+            if uni.id in highly_qualified_ids:
                 qualification_status = 'highly_qualified'
                 qualification_message = f"You exceed the minimum APS requirement by {aps_difference} points"
-            elif aps_difference >= 0:
+            elif uni.id in qualified_ids:
                 qualification_status = 'qualified'
                 qualification_message = f"You meet the minimum APS requirement"
-            
+
             # Add qualification data to the university dict for the template
-            uni_data_for_template = uni.copy() # Work with a copy
+            uni_data_for_template = uni.as_dict() # Work with a copy
             uni_data_for_template['qualification_status'] = qualification_status
             uni_data_for_template['qualification_message'] = qualification_message
             uni_data_for_template['aps_difference'] = aps_difference
-            uni_data_for_template['fee'] = uni.get('application_fee', 'N/A')
-            uni_data_for_template['is_selected'] = uni['id'] in selected_uni_ids
+            uni_data_for_template['fee'] = uni.application_fee or 'N/A'
+            uni_data_for_template['is_selected'] = uni.id in selected_id_set
             # Add faculties information
-            uni_data_for_template['faculties'] = FACULTIES_OPEN.get(uni['name'], [])
+            uni_data_for_template['faculties'] = faculty_index.faculties_for(uni.id)
             eligible_universities_for_template.append(uni_data_for_template)
     else: # If student_aps is None, show all universities from the filtered list without qualification status
-        for uni in universities_to_display:
-            uni_data_for_template = uni.copy()
+        for uni in catalog.get_many(filtered.ids):
+            uni_data_for_template = uni.as_dict()
             uni_data_for_template['qualification_status'] = 'unknown'
             uni_data_for_template['qualification_message'] = 'Your APS score is not available to determine qualification.'
             uni_data_for_template['aps_difference'] = 0
-            uni_data_for_template['fee'] = uni.get('application_fee', 'N/A')
-            uni_data_for_template['is_selected'] = uni['id'] in selected_uni_ids
+            uni_data_for_template['fee'] = uni.application_fee or 'N/A'
+            uni_data_for_template['is_selected'] = uni.id in selected_id_set
             # Add faculties information
-            uni_data_for_template['faculties'] = FACULTIES_OPEN.get(uni['name'], [])
+            uni_data_for_template['faculties'] = faculty_index.faculties_for(uni.id)
             eligible_universities_for_template.append(uni_data_for_template)
 
-    # Sort eligible universities by qualification status and APS difference
-    eligible_universities_for_template.sort(key=lambda x: (
-        x['qualification_status'] == 'not_qualified', # True (1) comes after False (0)
-        x['qualification_status'] == 'unknown', 
-        x['qualification_status'] != 'highly_qualified', # False (0) for highly qualified first
-        x['qualification_status'] != 'qualified',
-        -x.get('aps_difference', 0) # Sort by largest positive difference first
-    ))
-    
     # Get details for selected universities
-    selected_with_details = []
-    for uni_id in selected_uni_ids:
-        uni = get_university_by_id(uni_id)
-        if uni:
-            uni['detail_url'] = reverse('helper:university_detail', args=[uni_id])
-            selected_with_details.append(uni)
+    selected_with_details = get_catalog().get_many(selected_uni_ids)
 
     context = {
         'form': form,
@@ -743,7 +607,8 @@ def universities_list(request):
         'eligible_universities': eligible_universities_for_template,
         'selected_with_details': selected_with_details,
         'student_profile': profile,
-        'all_faculties': all_faculties  # Add faculties list to context
+        'all_faculties': all_faculties,  # Add faculties list to context
+        'aps_buckets': facets.aps_buckets,
     }
     return render(request, 'helper/universities_list.html', context)
 
@@ -755,12 +620,12 @@ def university_detail(request, uni_id):
     
     profile = get_object_or_404(StudentProfile, user=request.user)
     
-    # Data is directly from the university dictionary
+    # Data is directly from the immutable catalog record
     context = {
-        'university': university, # Pass the whole dictionary
-        'application_fee': university.get('application_fee', "Not specified"),
-        'due_date': university.get('due_date', "Not specified"),
-        'faculties_open': FACULTIES_OPEN.get(university['name'], []), # Assuming FACULTIES_OPEN is still used and keyed by name
+        'university': university, # Pass the whole record
+        'application_fee': university.application_fee or "Not specified",
+        'due_date': university.due_date or "Not specified",
+        'faculties_open': get_faculty_index().faculties_for(university.id),
         'student_profile': profile
     }
     return render(request, 'helper/university_detail.html', context)
@@ -769,8 +634,8 @@ def university_detail(request, uni_id):
 def university_faculties(request, uni_id):
     """Display university faculties and courses."""
     university = get_object_or_404(University, id=uni_id)
-    # Get faculties for this university from FACULTIES_OPEN
-    faculties = FACULTIES_OPEN.get(university.name, [])
+    # University rows share their IDs with the catalog, which the faculty index is keyed by
+    faculties = get_faculty_index().faculties_for(university.id)
     return render(request, 'helper/university_faculties.html', {
         'university': university,
         'faculties': faculties
@@ -790,48 +655,52 @@ def select_university(request, uni_id):
             return redirect('helper:universities_list')
 
         # Check if student qualifies for the university (APS score)
-        if profile.stored_aps_score is not None and university['minimum_aps'] <= profile.stored_aps_score:
-            # Get current selected universities from profile
-            selected_unis = profile.selected_universities or []
-            
-            # Check if university is already selected
-            if uni_id not in selected_unis:
-                # Add university to selected list
-                selected_unis.append(uni_id)
-                profile.selected_universities = selected_unis
-                profile.application_count = len(selected_unis)
-                profile.save()
-
+        if profile.stored_aps_score is not None and university.minimum_aps <= profile.stored_aps_score:
+            with transaction.atomic():
                 # Get or create the university in the database
                 university_instance, created = University.objects.get_or_create(
                     id=uni_id,
                     defaults={
-                        'name': university['name'],
-                        'province': university.get('province', ''),
-                        'minimum_aps': university['minimum_aps'],
-                        'application_fee': university.get('application_fee', '0'),
-                        'due_date': university.get('due_date', '')
+                        'name': university.name,
+                        'province': university.province,
+                        'minimum_aps': university.minimum_aps,
+                        'application_fee': university.application_fee or '0',
+                        'due_date': university.due_date
                     }
                 )
 
-                # Create application status
-                ApplicationStatus.objects.get_or_create(
+                # The unique constraint makes concurrent selections of the same university safe
+                _, selected = UniversitySelection.objects.get_or_create(
                     student=profile,
                     university=university_instance,
-                    defaults={'status': 'pending'}
                 )
-                message = f'Successfully selected {university["name"]}.'
+                if selected:
+                    StudentProfile.objects.filter(pk=profile.pk).update(
+                        application_count=F('application_count') + 1,
+                        updated_at=timezone.now(),  # update() bypasses auto_now
+                    )
+
+                    # Create application status
+                    ApplicationStatus.objects.get_or_create(
+                        student=profile,
+                        university=university_instance,
+                        defaults={'status': 'pending'}
+                    )
+            profile.refresh_from_db(fields=['application_count', 'updated_at'])
+
+            if selected:
+                message = f'Successfully selected {university.name}.'
             else:
                 # University is already selected, no change but still success
-                message = f'{university["name"]} is already in your selected list.'
+                message = f'{university.name} is already in your selected list.'
             
             # Prepare selected university details
             selected_university = {
-                'id': university['id'],
-                'name': university['name'],
-                'due_date': university.get('due_date', ''),
-                'application_fee': university.get('application_fee', ''),
-                'detail_url': reverse('helper:university_detail', args=[university['id']]),
+                'id': university.id,
+                'name': university.name,
+                'due_date': university.due_date,
+                'application_fee': university.application_fee,
+                'detail_url': university.detail_url,
                 'message': message,
                 'application_count': profile.application_count
             }
@@ -847,7 +716,7 @@ def select_university(request, uni_id):
                 messages.success(request, message)
                 return redirect('helper:universities_list')
         else:
-            error_message = f'Your APS score ({profile.stored_aps_score}) does not meet the minimum requirement ({university["minimum_aps"]}) for {university["name"]}.'
+            error_message = f'Your APS score ({profile.stored_aps_score}) does not meet the minimum requirement ({university.minimum_aps}) for {university.name}.'
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
                 return JsonResponse({
                     'success': False,
@@ -873,25 +742,24 @@ def deselect_university(request, uni_id):
         messages.error(request, "University not found.")
         return redirect('helper:universities_list')
     
-    # Get current selected universities from profile
-    selected_unis = profile.selected_universities or []
-    
-    if uni_id in selected_unis:
-        # Remove university from selected list
-        selected_unis.remove(uni_id)
-        profile.selected_universities = selected_unis
-        profile.application_count = len(selected_unis)
-        profile.save()
-        
-        # Remove application status
-        ApplicationStatus.objects.filter(
-            student=profile,
-            university_id=uni_id
-        ).delete()
-        
-        messages.success(request, f"Successfully removed {university['name']} from your selections.")
+    with transaction.atomic():
+        removed, _ = UniversitySelection.objects.filter(student=profile, university_id=uni_id).delete()
+        if removed:
+            StudentProfile.objects.filter(pk=profile.pk).update(
+                application_count=F('application_count') - 1,
+                updated_at=timezone.now(),  # update() bypasses auto_now
+            )
+
+            # Remove application status
+            ApplicationStatus.objects.filter(
+                student=profile,
+                university_id=uni_id
+            ).delete()
+
+    if removed:
+        messages.success(request, f"Successfully removed {university.name} from your selections.")
     else:
-        messages.info(request, f"{university['name']} was not in your selections.")
+        messages.info(request, f"{university.name} was not in your selections.")
         
     return redirect('helper:universities_list')
 
@@ -899,32 +767,31 @@ def deselect_university(request, uni_id):
 def application_list(request):
     """Display list of applications."""
     profile = get_object_or_404(StudentProfile, user=request.user)
-    applications = ApplicationStatus.objects.filter(student=profile)  # Removed incorrect select_related
+    applications = list(ApplicationStatus.objects.filter(student=profile))  # Removed incorrect select_related
 
     # Get all documents for the user
     documents = DocumentUpload.objects.filter(user=request.user)
 
-    # Build a dict of universities by ID for fast lookup in template
-    all_static_universities = get_all_universities()
-    universities_by_id = {uni['id']: uni for uni in all_static_universities}
+    # Catalog index of universities by ID for fast lookup in template
+    universities_by_id = get_catalog().by_id
 
-    # Check payment proof status for each application
+    # Fetch all payment proofs in one query, keyed by university ID
+    latest_proofs = latest_payment_proofs(request.user)
+
+    # Reset applications whose payment proof is gone, collecting changes for one bulk write.
+    # The 24-hour auto-verification is applied by the run_jobs background sweep, not here.
+    now = timezone.now()
+    changed_applications = []
     for application in applications:
-        payment_proof = DocumentUpload.objects.filter(
-            user=request.user,
-            document_type='payment_proof',
-            university__id=application.university_id
-        ).first()
-        if payment_proof:
-            time_since_upload = timezone.now() - payment_proof.uploaded_at
-            if time_since_upload.total_seconds() >= 24 * 3600:
-                application.payment_verified = True
-                application.save()
-        else:
+        if application.university_id not in latest_proofs:
             if application.status != 'not_started':
                 application.status = 'not_started'
                 application.payment_verified = False
-                application.save()
+                changed_applications.append(application)
+    if changed_applications:
+        for application in changed_applications:
+            application.last_updated = now  # bulk_update bypasses auto_now
+        ApplicationStatus.objects.bulk_update(changed_applications, ['status', 'payment_verified', 'last_updated'])
 
     # Prepare data for fee calculation
     universities_data_for_fee_calc = []
@@ -932,12 +799,9 @@ def application_list(request):
     for application in applications:
         static_uni_data = universities_by_id.get(application.university_id)
         if static_uni_data:
-            fee_str = static_uni_data.get('application_fee', '0')
-            # Convert fee string to numeric value for calculations
-            try:
-                fee_value = int(fee_str.replace('R', '').strip())
-            except ValueError:
-                fee_value = 0
+            fee_str = static_uni_data.application_fee or '0'
+            # Fee amounts are parsed once when the catalog is built
+            fee_value = static_uni_data.fee_amount
             
             application_fees_dict_for_template[application.university_id] = {
                 'name': fee_str,
@@ -972,8 +836,7 @@ def application_detail(request, app_id):
     """Display application details."""
     profile = get_object_or_404(StudentProfile, user=request.user)
     application = get_object_or_404(ApplicationStatus, id=app_id, student=profile)
-    all_static_universities = get_all_universities()
-    universities_by_id = {uni['id']: uni for uni in all_static_universities}
+    universities_by_id = get_catalog().by_id
     university = universities_by_id.get(application.university_id)
     payment_proof = DocumentUpload.objects.filter(
         user=request.user,
@@ -982,10 +845,8 @@ def application_detail(request, app_id):
     ).first()
     time_since_upload = None
     if payment_proof:
+        # Display only; the 24-hour auto-verification is applied by the run_jobs background sweep
         time_since_upload = timezone.now() - payment_proof.uploaded_at
-        if time_since_upload.total_seconds() >= 24 * 3600:
-            application.payment_verified = True
-            application.save()
     context = {
         'application': application,
         'university': university,
@@ -1029,7 +890,7 @@ def pay_application_fee(request, uni_id):
         static_uni_data = get_university_by_id(university_db_instance.id)
         application_fee = "Not specified"
         if static_uni_data:
-            application_fee = static_uni_data.get('application_fee', "Not specified")
+            application_fee = static_uni_data.application_fee or "Not specified"
         
         subscription_payment = DocumentUpload.objects.filter(
             user=request.user,
@@ -1151,10 +1012,10 @@ def pay_all_application_fees(request):
         static_uni_data = get_university_by_id(application.university.id)
         fee_str = '0'
         if static_uni_data:
-            fee_str = static_uni_data.get('application_fee', '0')
+            fee_str = static_uni_data.application_fee or '0'
         
         universities_data_for_fee_calc.append({
-            # 'university' key here is not used by calculate_application_fees, only 'application_fee'
+            'university': application.university,  # calculate_application_fees labels each row with its name
             'application_fee': fee_str 
         })
     
@@ -1207,67 +1068,214 @@ def pay_all_application_fees(request):
     
     return render(request, 'helper/pay_all_fees.html', context)
 
-@login_required
-@ratelimit(key='user', rate='10/m', method=['POST'])
-def chat_message_api(request):
-    """Handle chat message API requests."""
+CHAT_SYSTEM_PROMPT = "You are a helpful university application assistant."
+CHAT_RATE_LIMIT = '10/m'
+# Streamed and plain chat messages share one rate limit bucket
+CHAT_RATE_LIMIT_GROUP = 'helper.views.chat_message_api'
+
+async def _prepare_chat_request(request):
+    """
+    Run the checks shared by the async chat views.
+
+    Returns:
+        ``(message, profile, None)`` for a valid request, otherwise
+        ``(None, None, error_response)``.
+    """
     if request.method != 'POST':
-        return JsonResponse({'error': 'Only POST requests are allowed'}, status=405)
-    
+        return None, None, JsonResponse({'error': 'Only POST requests are allowed'}, status=405)
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return None, None, JsonResponse({'error': 'Authentication required'}, status=401)
+    limited = await sync_to_async(is_ratelimited)(
+        request, group=CHAT_RATE_LIMIT_GROUP, key='user', rate=CHAT_RATE_LIMIT, method='POST', increment=True,
+    )
+    if limited:
+        return None, None, JsonResponse({'error': 'Too many messages. Please wait a minute and try again.'}, status=429)
+
     try:
-        data = json.loads(request.body)
-        message = data.get('message', '').strip()
-        
-        if not message:
-            return JsonResponse({'error': 'Message is required'}, status=400)
-        
-        # Get user's profile
-        profile = request.user.studentprofile
-        
-        # Check if user has access to chat
-        if not profile.can_access_whatsapp_chat():
-            return JsonResponse({
-                'error': 'You need a Premium or Ultimate subscription to access the chat feature'
-            }, status=403)
-        
-        # Process the message with OpenAI
+        message = json.loads(request.body).get('message', '').strip()
+    except (json.JSONDecodeError, AttributeError):
+        return None, None, JsonResponse({'error': 'Invalid JSON data'}, status=400)
+    if not message:
+        return None, None, JsonResponse({'error': 'Message is required'}, status=400)
+
+    try:
+        profile = await StudentProfile.objects.aget(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return None, None, JsonResponse({'error': 'Student profile not found'}, status=404)
+    if not profile.can_access_whatsapp_chat():
+        return None, None, JsonResponse({
+            'error': 'You need a Premium or Ultimate subscription to access the chat feature'
+        }, status=403)
+    if not settings.OPENAI_API_KEY:
+        logger.critical("OpenAI API Key not configured.")
+        return None, None, JsonResponse({'error': "AI service not configured."}, status=503)
+    return message, profile, None
+
+def _touch_last_chat_date(profile_pk):
+    """Record that the student just chatted. Only last_chat_date changes, so skip save() and its cache invalidation."""
+    StudentProfile.objects.filter(pk=profile_pk).update(last_chat_date=timezone.now())
+
+def _chat_messages(message):
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": message},
+    ]
+
+async def chat_message_api(request):
+    """
+    Handle chat message API requests.
+
+    Async, so waiting for the completion does not hold a worker thread; under
+    the ASGI worker one process keeps many chat requests in flight. Factual
+    catalog questions (minimum APS, fees, closing dates, provinces, faculties)
+    are answered from the catalog, and answers to the same or a near-duplicate
+    question from a student in the same APS band and package come from the
+    answer cache, both without calling OpenAI.
+    """
+    message, profile, error_response = await _prepare_chat_request(request)
+    if error_response is not None:
+        return error_response
+
+    catalog_answer = answer_catalog_question(message, aps=profile.stored_aps_score)
+    if catalog_answer is not None:
+        await sync_to_async(_touch_last_chat_date)(profile.pk)
+        return JsonResponse({
+            'response': catalog_answer.answer,
+            'timestamp': timezone.now().isoformat(),
+            'source': 'catalog',
+        })
+
+    facets = profile_facets(profile)
+    cached = answer_cache.lookup(message, facets)
+    if cached is not None:
+        await sync_to_async(_touch_last_chat_date)(profile.pk)
+        return JsonResponse({
+            'response': cached.answer,
+            'timestamp': timezone.now().isoformat(),
+            'cached': True,
+        })
+
+    try:
+        response = await achat_completion(_chat_messages(message))
+        ai_response = response.choices[0].message.content
+    except CircuitOpenError:
+        logger.warning("Chat message refused: OpenAI circuit is open")
+        return JsonResponse({
+            'error': 'The AI assistant is temporarily unavailable. Please try again in a minute.'
+        }, status=503)
+    except openai.OpenAIError as e:
+        logger.error(f"OpenAI API error: {str(e)}")
+        return JsonResponse({
+            'error': 'Unable to process your message at this time. Please try again later.'
+        }, status=500)
+    except Exception as e:
+        logger.error(f"Chat API error: {str(e)}")
+        return JsonResponse({'error': 'An unexpected error occurred'}, status=500)
+
+    if ai_response:
+        tokens = response.usage.total_tokens if response.usage else estimate_tokens(message, ai_response)
+        answer_cache.store(message, facets, ai_response, tokens)
+    await sync_to_async(_touch_last_chat_date)(profile.pk)
+    return JsonResponse({
+        'response': ai_response,
+        'timestamp': timezone.now().isoformat()
+    })
+
+def _sse_event(event, data):
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def chat_stream_api(request):
+    """
+    Stream the assistant's answer to a chat message as server-sent events.
+
+    Sends a ``token`` event per completion chunk, then a ``done`` event with
+    the time to first token, or an ``error`` event if the completion fails.
+    A catalog or cached answer is sent as a single ``token`` event and a
+    ``done`` event marked ``source: catalog`` or ``cached``. Errors found before the stream starts are plain JSON
+    responses like chat_message_api's.
+    """
+    started = time.perf_counter()
+    message, profile, error_response = await _prepare_chat_request(request)
+    if error_response is not None:
+        return error_response
+    messages_for_model = _chat_messages(message)
+    facets = profile_facets(profile)
+
+    async def answer_events(answer, **done_flags):
+        yield _sse_event('token', {'text': answer})
+        await sync_to_async(_touch_last_chat_date)(profile.pk)
+        yield _sse_event('done', {
+            'timestamp': timezone.now().isoformat(),
+            'time_to_first_token_ms': round((time.perf_counter() - started) * 1000, 1),
+            **done_flags,
+        })
+
+    async def events():
+        first_token_ms = None
+        chunks = []
         try:
-            # Check if OpenAI API key is configured
-            if not hasattr(settings, 'OPENAI_API_KEY') or not settings.OPENAI_API_KEY:
-                logger.critical("OpenAI API Key not configured.")
-                return JsonResponse({'error': "AI service not configured."}, status=503)
-
-            # Use the latest OpenAI API format
-            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful university application assistant."},
-                    {"role": "user", "content": message}
-                ]
-            )
-            ai_response = response.choices[0].message.content
-            
-            # Update last chat date
-            profile.last_chat_date = timezone.now()
-            profile.save()
-            
-            return JsonResponse({
-                'response': ai_response,
-                'timestamp': timezone.now().isoformat()
+            async for text in stream_chat_completion(messages_for_model):
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - started) * 1000
+                    time_to_first_token.add(first_token_ms)
+                chunks.append(text)
+                yield _sse_event('token', {'text': text})
+        except CircuitOpenError:
+            logger.warning("Chat stream refused: OpenAI circuit is open")
+            yield _sse_event('error', {
+                'error': 'The AI assistant is temporarily unavailable. Please try again in a minute.'
             })
-            
+            return
         except openai.OpenAIError as e:
-            logger.error(f"OpenAI API error: {str(e)}")
-            return JsonResponse({
+            logger.error(f"OpenAI streaming error: {str(e)}")
+            yield _sse_event('error', {
                 'error': 'Unable to process your message at this time. Please try again later.'
-            }, status=500)
-            
-    except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON data'}, status=400)
-    except Exception as e:
-        logger.error(f"Chat API error: {str(e)}")
-        return JsonResponse({'error': 'An unexpected error occurred'}, status=500)
+            })
+            return
+
+        stream_duration.add((time.perf_counter() - started) * 1000)
+        answer = ''.join(chunks)
+        if answer:
+            # Streamed completions carry no usage data
+            answer_cache.store(message, facets, answer, estimate_tokens(CHAT_SYSTEM_PROMPT, message, answer))
+        await sync_to_async(_touch_last_chat_date)(profile.pk)
+        yield _sse_event('done', {
+            'timestamp': timezone.now().isoformat(),
+            'time_to_first_token_ms': round(first_token_ms, 1) if first_token_ms is not None else None,
+        })
+
+    catalog_answer = answer_catalog_question(message, aps=profile.stored_aps_score)
+    cached = answer_cache.lookup(message, facets) if catalog_answer is None else None
+    if catalog_answer is not None:
+        stream = answer_events(catalog_answer.answer, source='catalog')
+    elif cached is not None:
+        stream = answer_events(cached.answer, cached=True)
+    else:
+        stream = events()
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
+
+@login_required
+def chat_stats_api(request):
+    """Staff-only streamed chat latency percentiles, catalog and cache answer counters, and the OpenAI circuit breaker state."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse({
+        **chat_stream_stats(),
+        'catalog_answers': catalog_answer_stats(),
+        'answer_cache': answer_cache.stats(),
+        'circuit': get_breaker().stats(),
+    })
+
+@login_required
+def ai_chat(request):
+    """Full-page AI assistant chat, streamed through chat_stream_api."""
+    profile = get_object_or_404(StudentProfile, user=request.user)
+    return render(request, 'helper/ai_chat.html', {'student_profile': profile})
 
 @login_required
 def chat_history(request):
@@ -1341,11 +1349,60 @@ def concierge_request(request):
 
 @login_required
 def university_search_api(request):
-    """API endpoint for university search."""
+    """
+    API endpoint for fuzzy search over universities, faculties and courses.
+
+    Served from the in-memory trigram index in helper/search.py; no database
+    queries. ``?type=`` restricts results to university, faculty or course
+    entries. Every match is returned unless ``?limit=`` caps the ranked
+    ``results`` (and so the ``universities`` drawn from them). An empty or
+    missing ``?q=`` lists every university in ``universities``, as this
+    endpoint always has, with no ranked ``results``.
+    """
     query = request.GET.get('q', '')
-    universities = University.objects.filter(name__icontains=query)
-    data = [{'id': u.id, 'name': u.name, 'province': u.province} for u in universities]
-    return JsonResponse({'universities': data})
+    if not query.strip():
+        return JsonResponse({
+            'results': [],
+            'universities': [{'id': uni.id, 'name': uni.name, 'province': uni.province} for uni in get_catalog()],
+        })
+    limit = None  # Older clients expect every matching university
+    if 'limit' in request.GET:
+        try:
+            limit = int(request.GET['limit'])
+        except ValueError:
+            limit = DEFAULT_SEARCH_LIMIT
+    kinds = tuple(sorted(set(request.GET.getlist('type')) & {'university', 'faculty', 'course'})) or None
+
+    results = search_catalog(query, limit, kinds)
+
+    # Distinct matching universities, best first, in the shape older clients expect
+    universities = {}
+    for result in results:
+        universities.setdefault(result['university_id'], {
+            'id': result['university_id'],
+            'name': result['university'],
+            'province': result['province'],
+        })
+    return JsonResponse({'results': list(results), 'universities': list(universities.values())})
+
+@cache_control(public=True, max_age=settings.AUTOCOMPLETE_MAX_AGE)
+def autocomplete_api(request):
+    """
+    Autocomplete for NSC subjects, university names and course names.
+
+    ``?q=`` is the typed prefix, ``?type=`` is subject (default), university or course,
+    ``?group=`` narrows subjects to one marks-form group. The data is static, so
+    responses are public and cached by browsers for AUTOCOMPLETE_MAX_AGE seconds.
+    """
+    kind = request.GET.get('type', 'subject')
+    if kind not in ('subject', 'university', 'course'):
+        return JsonResponse({'error': 'Unknown type'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = DEFAULT_AUTOCOMPLETE_LIMIT
+    results = autocomplete(request.GET.get('q', ''), kind, request.GET.get('group') or None, limit)
+    return JsonResponse({'results': list(results)})
 
 @login_required
 def verify_document_api(request):
@@ -1369,24 +1426,7 @@ def verify_document_api(request):
             
             # If this is a subscription payment document, update related records
             if document.document_type == 'subscription_payment':
-                # Update any related payment records
-                updated_payments = Payment.objects.filter(
-                    user=document.user,
-                    payment_status='pending'
-                ).update(
-                    payment_status='paid' if document.verified else 'not_paid',
-                    verification_date=timezone.now() if document.verified else None
-                )
-                logger.info(f"Updated {updated_payments} payment records for user {document.user.id}")
-                
-                # Update any related application statuses
-                updated_applications = ApplicationStatus.objects.filter(
-                    student__user=document.user,
-                    status='pending'
-                ).update(
-                    payment_verified=document.verified
-                )
-                logger.info(f"Updated {updated_applications} application statuses for user {document.user.id}")
+                apply_subscription_verification(document)
             
             return JsonResponse({
                 'status': 'success',
@@ -1426,6 +1466,12 @@ def edit_marks(request):
             messages.error(request, "Please enter exactly 7 subject marks.")
             return redirect('helper:edit_marks')
 
+        # Subjects are typed with autocomplete suggestions, so check they are real NSC subjects
+        unknown_subjects = [subject for subject in marks if not is_nsc_subject(subject)]
+        if unknown_subjects:
+            messages.error(request, f"Unknown subject: {unknown_subjects[0]}. Please choose a subject from the suggestions.")
+            return redirect('helper:edit_marks')
+
         # Check for required subjects
         required_subjects = {
             "Life Orientation": False,
@@ -1464,8 +1510,8 @@ def edit_marks(request):
         profile.stored_aps_score = aps
         profile.save()
 
-        # Get number of qualified universities
-        qualified_count = University.objects.filter(minimum_aps__lte=aps).count()
+        # Get number of qualified universities from the static catalog
+        qualified_count = len(qualified_universities(aps))
         messages.success(request, f"Marks updated successfully! Your APS score is {aps}. You qualify for {qualified_count} universities.")
         return redirect('helper:edit_marks')
     
@@ -1483,7 +1529,6 @@ def edit_marks(request):
     context = {
         'profile': profile,
         'marks_list': marks_list,
-        'nsc_subjects': NSC_SUBJECTS,
         'student_aps': profile.stored_aps_score,
         'title': 'Edit Marks'
     }
@@ -1491,24 +1536,42 @@ def edit_marks(request):
 
 @login_required
 def universities_api(request):
+    """
+    Qualified universities for the student's stored APS.
+
+    The ETag combines the catalog version with the student's APS, so clients that
+    send If-None-Match get a 304 until either changes.
+    """
     profile = get_object_or_404(StudentProfile, user=request.user)
-    all_static_universities = get_all_universities()
-    universities_data = []
-
-    if profile.stored_aps_score is not None:
-        qualified_list = [
-            uni for uni in all_static_universities
-            if uni['minimum_aps'] <= profile.stored_aps_score
-        ]
-        qualified_list.sort(key=lambda x: x['minimum_aps'])
-
-        for uni in qualified_list:
-            uni_data_for_api = uni.copy()
-            uni_data_for_api['detail_url'] = reverse('helper:university_detail', args=[uni['id']])
-            # uni_data_for_api['select_url'] = reverse('helper:select_university', args=[uni['id']]) # select_university would change
-            universities_data.append(uni_data_for_api)
-            
-    return JsonResponse({'universities': universities_data})
+    catalog = get_catalog()
+    version = f'{catalog.version}-{profile.stored_aps_score}'
+
+    def build():
+        # Encoded once per catalog version and APS, shared by every student
+        return universities_api_payload(profile.stored_aps_score)
+
+    return conditional_json_response(request, version, build, last_modified=profile.updated_at)
+
+@login_required
+def dashboard_cache_stats_api(request):
+    """Staff-only hit/miss counters of the per-student dashboard context cache and the university filter cache."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse({
+        **dashboard_cache_stats(),
+        'university_filters': filter_cache_stats(),  # Per worker process
+    })
+
+@login_required
+def query_stats_api(request):
+    """Staff-only per-view latency and SQL query percentiles recorded by QueryBudgetMiddleware."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse({
+        'budget': settings.QUERY_BUDGET,
+        'window': query_stats.window,
+        'views': query_stats.summary(),
+    })
 
 @login_required
 def view_payment_proof(request, app_id):
@@ -1695,8 +1758,7 @@ def unified_payment(request):
         user=request.user,
         document_type__in=['payment_proof', 'subscription_payment']
     )
-    all_static_universities = get_all_universities()
-    universities_by_id = {uni['id']: uni for uni in all_static_universities}
+    universities_by_id = get_catalog().by_id
     
     # Handle payment upload
     if request.method == 'POST':
@@ -1771,10 +1833,8 @@ def unified_payment(request):
     subscription_status = "Not Paid"
     if subscription_payment_doc:
         time_since_upload = timezone.now() - subscription_payment_doc.uploaded_at
-        if subscription_payment_doc.verified or time_since_upload.total_seconds() >= 24 * 3600:
-            if not subscription_payment_doc.verified:
-                subscription_payment_doc.verified = True
-                subscription_payment_doc.save()
+        # Overdue proofs are persisted as verified by the run_jobs background sweep
+        if is_auto_verified(subscription_payment_doc):
             subscription_status = "Verified"
         else:
             subscription_status = "Pending Verification"
@@ -1789,20 +1849,12 @@ def unified_payment(request):
     for application in applications:
         static_data = universities_by_id.get(application.university_id)
         if static_data:
-            fee_val_str = static_data.get('application_fee', "0")
+            # Fee amounts are parsed once when the catalog is built (0 for free/unknown fees)
             application_fees_context_dict[application.university_id] = {
-                'name': fee_val_str,
-                'value': 0
+                'name': static_data.application_fee or "0",
+                'value': static_data.fee_amount
             }
-            
-            # Calculate fee value if it's not free
-            if fee_val_str.upper() != "FREE" and fee_val_str != "0" and fee_val_str != "Not specified" and fee_val_str != "Varies":
-                try:
-                    fee_value = int(fee_val_str.replace('R', '').strip())
-                    application_fees_context_dict[application.university_id]['value'] = fee_value
-                    display_total_application_fees += fee_value
-                except ValueError:
-                    pass
+            display_total_application_fees += static_data.fee_amount
 
     # Calculate subscription fee
     subscription_fee_value = profile.get_subscription_fee()
@@ -1881,44 +1933,17 @@ def upload_payment_proof(request):
 
 @login_required
 def payments(request):
+    """Display payment state for each application without per-application writes."""
     profile = get_object_or_404(StudentProfile, user=request.user)
-    applications = ApplicationStatus.objects.filter(student=profile)
+    applications = list(ApplicationStatus.objects.filter(student=profile).select_related('university'))
     payments = Payment.objects.filter(user=request.user)
     documents = DocumentUpload.objects.filter(
         user=request.user,
         document_type='payment_proof'
     )
-    all_static_universities = get_all_universities()
-    universities_by_id = {uni['id']: uni for uni in all_static_universities}
-    for application in applications:
-        payment_proof = DocumentUpload.objects.filter(
-            user=request.user,
-            document_type='payment_proof',
-            university__id=application.university_id
-        ).first()
-        payment, created = Payment.objects.get_or_create(
-            user=request.user,
-            university=universities_by_id.get(application.university_id, {}).get('name', ''),
-            defaults={'payment_status': 'not_paid'}
-        )
-        if payment_proof:
-            if payment_proof.verified:
-                application.payment_verified = True
-                application.status = 'pending'
-                payment.payment_status = 'paid'
-            else:
-                application.payment_verified = False
-                application.status = 'pending'
-                payment.payment_status = 'pending'
-            application.save()
-            payment.save()
-        else:
-            if application.status != 'not_started':
-                application.status = 'not_started'
-                application.payment_verified = False
-                application.save()
-            payment.payment_status = 'not_paid'
-            payment.save()
+    universities_by_id = get_catalog().by_id
+    # Derive payment state from one set of proofs and payments; only transitions are written, in bulk
+    reconcile_payments(request.user, applications, universities_by_id)
     context = {
         'applications': applications,
         'universities_by_id': universities_by_id,
@@ -1930,50 +1955,69 @@ def payments(request):
 
 @login_required
 def payment_statuses(request):
-    """API endpoint to get payment statuses for all applications."""
+    """
+    API endpoint to get payment statuses for all applications.
+
+    Responses carry an ETag and Last-Modified; if the client's copy is still
+    current the answer is a 304 and the statuses are not rebuilt.
+    """
     student_profile = get_object_or_404(StudentProfile, user=request.user)
-    applications = ApplicationStatus.objects.filter(student=student_profile)
-    
-    statuses = []
-    for application in applications:
-        payment = DocumentUpload.objects.filter(
-            user=request.user,
-            document_type='payment_proof',
-            university_id=application.university_id
-        ).first()
-        
-        # Get university data for fee information
-        university_data = get_university_by_id(application.university_id)
-        is_free = university_data and university_data.get('application_fee', '').upper() == 'FREE'
-        
-        # Determine payment status
-        if is_free:
-            status = 'free'
-            message = 'No payment required'
-        elif payment:
-            time_since_upload = timezone.now() - payment.uploaded_at
-            if payment.verified or time_since_upload.total_seconds() >= 24 * 3600:
-                if not payment.verified:
-                    payment.verified = True
-                    payment.save()
-                status = 'verified'
-                message = 'Payment verified'
+    state = payment_status_state(request.user)
+    return conditional_json_response(
+        request, state.version,
+        lambda: build_payment_statuses(request.user, student_profile),
+        last_modified=state.last_modified, safe=False,
+    )
+
+async def payment_status_stream(request):
+    """
+    Server-sent events stream of the student's payment statuses.
+
+    Sends a ``statuses`` event when the status version changes and a keep-alive
+    comment otherwise. Each tick reads the student's change marker from the
+    cache (see helper.payment_status_markers); the status queries only run on
+    the first tick, after a write has replaced the marker and once a pending
+    proof has waited out the auto-verification period, or on every tick if the
+    cache cannot hold markers. Each connection is closed after a while;
+    the browser's EventSource reconnects and resumes from the Last-Event-ID it
+    was given.
+    """
+    is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    user = request.user
+    try:
+        profile = await StudentProfile.objects.aget(user=user)
+    except StudentProfile.DoesNotExist:
+        return JsonResponse({'error': 'Student profile not found'}, status=404)
+
+    interval = settings.PAYMENT_STATUS_STREAM_INTERVAL
+    duration = settings.PAYMENT_STATUS_STREAM_DURATION
+    last_version = request.headers.get('Last-Event-ID') or request.GET.get('version')
+
+    async def events():
+        nonlocal last_version
+        # Tell the browser how long to wait before reconnecting after we close
+        yield f"retry: {int(interval * 1000)}\n\n"
+        deadline = time.monotonic() + duration
+        checked_marker = None
+        expires_at = None
+        while time.monotonic() < deadline:
+            # The marker is read before the statuses, so a write in between moves it again
+            marker = await sync_to_async(payment_status_marker)(user.id)
+            version = last_version
+            if marker is None or marker != checked_marker or (expires_at and expires_at <= timezone.now()):
+                checked_marker = marker
+                version, _, expires_at = await sync_to_async(payment_status_state)(user)
+            if version != last_version:
+                statuses = await sync_to_async(build_payment_statuses)(user, profile)
+                last_version = version
+                yield f"id: {version}\nevent: statuses\ndata: {json.dumps(statuses, cls=DjangoJSONEncoder)}\n\n"
             else:
-                status = 'pending'
-                minutes_ago = int(time_since_upload.total_seconds() / 60)
-                message = f'Pending verification (Uploaded {minutes_ago} minutes ago)'
-        else:
-            status = 'not_paid'
-            message = 'Payment not uploaded'
-        
-        statuses.append({
-            'id': application.id,
-            'university_id': application.university_id,
-            'status': status,
-            'message': message,
-            'is_free': is_free,
-            'uploaded_at': payment.uploaded_at.isoformat() if payment else None,
-            'verified': payment.verified if payment else False
-        })
-    
-    return JsonResponse(statuses, safe=False)
\ No newline at end of file
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(interval)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+    return response
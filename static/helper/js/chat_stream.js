@@ -0,0 +1,66 @@
+(function () {
+    // Streamed chat answers: POSTs the message and reads the server-sent events from the response body
+    // (EventSource only supports GET, so the stream is parsed here)
+    const CONFIG = {
+        STREAM_URL: '/api/chat/stream/',
+        EVENT_SEPARATOR: '\n\n',
+    };
+
+    function parseFrame(frame) {
+        let event = 'message';
+        const data = [];
+        frame.split('\n').forEach(line => {
+            if (line.startsWith('event:')) { event = line.slice(6).trim(); }
+            else if (line.startsWith('data:')) { data.push(line.slice(5).trimStart()); }
+        });
+        return data.length ? { event, data: JSON.parse(data.join('\n')) } : null;
+    }
+
+    // Resolves with the full answer; onToken gets each chunk as it arrives.
+    // Rejects with the server's error message if the request or the completion fails.
+    async function send(message, { csrfToken, url = CONFIG.STREAM_URL, signal, onToken, onDone } = {}) {
+        const started = performance.now();
+        const response = await fetch(url, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream', 'X-CSRFToken': csrfToken },
+            body: JSON.stringify({ message }),
+            signal,
+        });
+        if (!response.ok || !response.body) {
+            let error = `Assistant error! Status: ${response.status}`;
+            try { error = (await response.json()).error || error; } catch (parseError) { /* Not JSON */ }
+            throw new Error(error);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let answer = '';
+        let firstTokenMs = null;
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf(CONFIG.EVENT_SEPARATOR)) !== -1) {
+                const parsed = parseFrame(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + CONFIG.EVENT_SEPARATOR.length);
+                if (!parsed) continue;
+                if (parsed.event === 'token') {
+                    if (firstTokenMs === null) { firstTokenMs = Math.round(performance.now() - started); }
+                    answer += parsed.data.text;
+                    if (onToken) onToken(parsed.data.text, answer);
+                } else if (parsed.event === 'error') {
+                    throw new Error(parsed.data.error);
+                } else if (parsed.event === 'done') {
+                    const metrics = { ...parsed.data, client_time_to_first_token_ms: firstTokenMs };
+                    if (onDone) onDone(answer, metrics);
+                }
+            }
+        }
+        return answer;
+    }
+
+    window.ChatStream = { send };
+})();
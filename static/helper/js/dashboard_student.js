@@ -416,9 +416,48 @@
                 
                 appendChatMessage(message, "user"); 
                 chatInput.value = ""; 
-                const thinkingMsg = appendChatMessage("...", "ai thinking"); 
-                try { 
-                    const controller = new AbortController(); 
+                const thinkingMsg = appendChatMessage("...", "ai thinking");
+                const streamUrl = chatForm.dataset.streamUrl;
+                if (streamUrl && window.ChatStream && window.ReadableStream) {
+                    // Streamed answer: the reply bubble replaces the dots with the first token and grows from there
+                    const controller = new AbortController();
+                    const timeoutId = setTimeout(() => controller.abort(), CONFIG.API_TIMEOUT);
+                    let replyMsg = null;
+                    try {
+                        const answer = await window.ChatStream.send(message, {
+                            url: getApiUrl(streamUrl),
+                            csrfToken,
+                            signal: controller.signal,
+                            onToken: (token, text) => {
+                                if (!replyMsg) {
+                                    clearTimeout(timeoutId); // The timeout covers the wait for the first token only
+                                    thinkingMsg.remove();
+                                    replyMsg = appendChatMessage("", "ai");
+                                }
+                                replyMsg.textContent = text;
+                                if (chatBody) { chatBody.scrollTop = chatBody.scrollHeight; }
+                            },
+                            onDone: (text, metrics) => debugLog("Chat answer streamed", metrics),
+                        });
+                        if (!replyMsg) {
+                            thinkingMsg.remove();
+                            appendChatMessage(answer || "Sorry, I couldn't respond.", "ai");
+                        }
+                    } catch (error) {
+                        thinkingMsg.remove();
+                        debugLog("Chat error", { error: error.message, name: error.name });
+                        appendChatMessage(`Error: ${error.name === "AbortError" ? "Request timed out." : error.message}`, "error");
+                    } finally {
+                        clearTimeout(timeoutId);
+                        this.isSubmitting = false;
+                        chatInput.disabled = false;
+                        if (submitButton) submitButton.disabled = false;
+                        chatInput.focus();
+                    }
+                    return;
+                }
+                try {
+                    const controller = new AbortController();
                     const timeoutId = setTimeout(() => controller.abort(), CONFIG.API_TIMEOUT); 
                     const response = await fetch(chatUrl, { 
                         method: "POST", 
@@ -491,6 +530,7 @@
         intervalId: null,
         intervalMs: 7000,
         isLoading: false,
+        etag: null,  // ETag of the last /universities/api/ response
 
         init() {
             debugLog('Starting qualified universities display initialization...');
@@ -594,21 +634,35 @@
         },
 
         fetchUniversities() {
+            const headers = {
+                'Accept': 'application/json',
+                'X-Requested-With': 'XMLHttpRequest'
+            };
+            // Revalidate instead of re-downloading when we already have the list
+            if (this.etag) {
+                headers['If-None-Match'] = this.etag;
+            }
             fetch('/universities/api/', {
                 method: 'GET',
                 credentials: 'same-origin',
-                headers: {
-                    'Accept': 'application/json',
-                    'X-Requested-With': 'XMLHttpRequest'
-                }
+                headers
             })
             .then(response => {
+                if (response.status === 304) {
+                    debugLog('Qualified universities unchanged');
+                    return null;
+                }
                 if (!response.ok) {
                     throw new Error(`Network response was not ok: ${response.statusText}`);
                 }
+                this.etag = response.headers.get('ETag');
                 return response.json();
             })
             .then(data => {
+                if (data === null) {
+                    this.initializeDisplay();
+                    return;
+                }
                 if (Array.isArray(data.universities) && data.universities.length > 0) {
                     this.universities = data.universities;
                     debugLog('Fetched qualified universities data', { count: this.universities.length });
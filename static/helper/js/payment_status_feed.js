@@ -0,0 +1,75 @@
+(function () {
+    // Payment status updates: server-sent events, with a versioned polling fallback
+    const CONFIG = {
+        STREAM_URL: '/api/payment-statuses/stream/',
+        POLL_URL: '/api/payment-statuses/',
+        POLL_INTERVAL: 30000,     // Fallback polling interval (ms)
+        MAX_STREAM_ERRORS: 3,     // Consecutive stream failures before falling back to polling
+    };
+
+    function subscribe(onStatuses) {
+        let version = null;
+        let source = null;
+        let pollTimer = null;
+        let streamErrors = 0;
+        let usePolling = typeof window.EventSource === 'undefined';
+
+        function startStream() {
+            source = new EventSource(CONFIG.STREAM_URL + (version ? `?version=${encodeURIComponent(version)}` : ''));
+            source.addEventListener('statuses', (event) => {
+                streamErrors = 0;
+                version = event.lastEventId || version;
+                onStatuses(JSON.parse(event.data));
+            });
+            source.onopen = () => { streamErrors = 0; };
+            source.onerror = () => {
+                // EventSource reconnects on its own after the server closes the stream;
+                // only give up on it after repeated failures.
+                streamErrors += 1;
+                if (streamErrors >= CONFIG.MAX_STREAM_ERRORS) {
+                    stop();
+                    usePolling = true;
+                    start();
+                }
+            };
+        }
+
+        function poll() {
+            const headers = { 'Accept': 'application/json' };
+            // The status version doubles as the endpoint's ETag
+            if (version) { headers['If-None-Match'] = `"${version}"`; }
+            fetch(CONFIG.POLL_URL, { credentials: 'same-origin', headers })
+                .then(response => {
+                    // 304 means nothing changed since the version we sent
+                    if (response.status === 304) return null;
+                    const etag = response.headers.get('ETag');
+                    if (etag) { version = etag.replace(/^W\//, '').replace(/"/g, ''); }
+                    return response.json();
+                })
+                .then(data => { if (data) onStatuses(data); })
+                .catch(error => console.error('Error updating statuses:', error));
+        }
+
+        function start() {
+            if (usePolling) {
+                poll();
+                pollTimer = setInterval(poll, CONFIG.POLL_INTERVAL);
+            } else {
+                startStream();
+            }
+        }
+
+        function stop() {
+            if (source) { source.close(); source = null; }
+            if (pollTimer) { clearInterval(pollTimer); pollTimer = null; }
+        }
+
+        // Hidden tabs hold no connection and send no polls
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) { stop(); } else { start(); }
+        });
+        if (!document.hidden) { start(); }
+    }
+
+    window.PaymentStatusFeed = { subscribe };
+})();
@@ -0,0 +1,53 @@
+(function () {
+    // Suggestions fetched from the autocomplete API: subjects on the marks forms
+    // (data-subject-autocomplete="<group>") and universities/courses on the
+    // universities list (data-autocomplete="<type>")
+    const CONFIG = {
+        URL: '/api/autocomplete/',
+        DEBOUNCE_MS: 150,
+        LIMIT: 25,     // Enough to list a whole subject group on an empty prefix
+    };
+
+    function fillOptions(datalist, results) {
+        datalist.replaceChildren(...results.map(result => {
+            const option = document.createElement('option');
+            option.value = result.value;
+            return option;
+        }));
+    }
+
+    function fetchSuggestions(input, datalist) {
+        const params = new URLSearchParams({ q: input.value.trim(), limit: CONFIG.LIMIT });
+        if (input.dataset.autocomplete) {
+            params.set('type', input.dataset.autocomplete);
+        } else {
+            params.set('type', 'subject');
+            params.set('group', input.dataset.subjectAutocomplete);
+        }
+        // Responses are public and long-lived, so repeats are served from the browser cache
+        fetch(`${CONFIG.URL}?${params}`, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(data => fillOptions(datalist, data.results || []))
+            .catch(error => console.error('Error loading suggestions:', error));
+    }
+
+    function init() {
+        document.querySelectorAll('input[data-subject-autocomplete], input[data-autocomplete]').forEach(input => {
+            const datalist = document.getElementById(input.getAttribute('list'));
+            if (!datalist) return;
+            let timer = null;
+            const update = () => {
+                clearTimeout(timer);
+                timer = setTimeout(() => fetchSuggestions(input, datalist), CONFIG.DEBOUNCE_MS);
+            };
+            input.addEventListener('focus', update);
+            input.addEventListener('input', update);
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', init);
+    } else {
+        init();
+    }
+})();
@@ -2,14 +2,14 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save # Import for signals
 from django.dispatch import receiver # Import for signals
-# Attempt to import static university data from the helper app
+# Attempt to import the APS eligibility engine from the helper app
 try:
-    from helper.university_static_data import get_all_universities as get_static_universities
+    from helper.eligibility import qualified_universities
 except ImportError:
-    get_static_universities = None
+    qualified_universities = None
     # This print statement is for server startup, not for every request.
     # Consider using Django's logging framework for more robust error indication.
-    print("WARNING: Could not import static university data from helper.university_static_data.")
+    print("WARNING: Could not import helper.eligibility.")
     print("UserProfile.get_qualified_universities will return an empty list.")
 
 class UserProfile(models.Model):
@@ -22,18 +22,12 @@ class UserProfile(models.Model):
 
     def get_qualified_universities(self):
         """
-        Returns a list of university dictionaries for which the user qualifies based on their APS score,
-        using the static university data from helper.university_static_data.
+        Returns a list of university records for which the user qualifies based on their APS score,
+        using the static university data from helper.university_static_data via helper.eligibility.
         """
-        if self.aps_score is not None and get_static_universities:
-            all_universities = get_static_universities()
-            qualified = [
-                uni for uni in all_universities 
-                if uni.get('minimum_aps') is not None and uni['minimum_aps'] <= self.aps_score
-            ]
-            # Sort by name or minimum_aps if desired
-            qualified.sort(key=lambda x: (x.get('minimum_aps', 999), x.get('name', '')))
-            return qualified
+        if self.aps_score is not None and qualified_universities:
+            # Memoized bisect over the catalog, already ordered by minimum APS
+            return list(qualified_universities(self.aps_score))
         return [] # Return an empty list if no APS score or static data not available
 
     def __str__(self):
@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static file serving
+    'helper.middleware.QueryBudgetMiddleware',  # Before sessions/auth so their queries are counted
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -67,9 +68,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-# URL and WSGI configuration
+# URL, WSGI and ASGI configuration (production serves ASGI through uvicorn workers,
+# so the async chat and SSE views do not hold a worker thread while they wait)
 ROOT_URLCONF = 'varsity_plug.urls'
 WSGI_APPLICATION = 'varsity_plug.wsgi.application'
+ASGI_APPLICATION = 'varsity_plug.asgi.application'
 
 # Template configuration
 TEMPLATES = [
@@ -105,10 +108,14 @@ else:
     DATABASE_URL = os.getenv('DATABASE_URL')
     if not DATABASE_URL:
         raise ImproperlyConfigured("DATABASE_URL environment variable is required in production.")
+    # Served over ASGI, sync ORM work runs in a different thread from request to
+    # request, and each thread keeps its own persistent connection, so they pile
+    # up until Postgres refuses more. Close connections after each request
+    # unless a pooler (e.g. PgBouncer) sits in front and DB_CONN_MAX_AGE says so.
     DATABASES = {
         'default': dj_database_url.config(
             default=DATABASE_URL,
-            conn_max_age=600,
+            conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '0')),
             conn_health_checks=True,
             ssl_require=True
         )
@@ -210,6 +217,50 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 if not OPENAI_API_KEY and not DEBUG:
     logger.warning("OPENAI_API_KEY not set in production; AI chat functionality will be disabled.")
 
+# Shared OpenAI client (helper/openai_client.py). OPENAI_BASE_URL points it at a
+# proxy or a local fake server; timeouts and delays are in seconds
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+OPENAI_CHAT_MODEL = os.getenv('OPENAI_CHAT_MODEL', 'gpt-3.5-turbo')
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '30'))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+OPENAI_RETRY_BASE_DELAY = float(os.getenv('OPENAI_RETRY_BASE_DELAY', '0.5'))
+OPENAI_RETRY_MAX_DELAY = float(os.getenv('OPENAI_RETRY_MAX_DELAY', '4'))
+# Consecutive failed calls that open the circuit, and how long it stays open
+OPENAI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('OPENAI_CIRCUIT_FAILURE_THRESHOLD', '5'))
+OPENAI_CIRCUIT_RESET_SECONDS = float(os.getenv('OPENAI_CIRCUIT_RESET_SECONDS', '30'))
+# Recent streamed chat answers kept for the time-to-first-token percentiles
+CHAT_METRICS_WINDOW = int(os.getenv('CHAT_METRICS_WINDOW', '500'))
+
+# Per-process cache of chat answers (helper/answer_cache.py): lifetime in seconds,
+# size, and the TF-IDF cosine similarity a question needs to reuse a cached answer
+ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', '86400'))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '2000'))
+ANSWER_CACHE_SIMILARITY = float(os.getenv('ANSWER_CACHE_SIMILARITY', '0.75'))
+
+# Background jobs (python manage.py run_jobs)
+# How often the 24-hour payment auto-verification sweep runs, in seconds
+AUTO_VERIFY_INTERVAL_SECONDS = int(os.getenv('AUTO_VERIFY_INTERVAL_SECONDS', '300'))
+
+# Payment status server-sent events: seconds between change checks, and how long
+# each stream stays open before the browser reconnects
+PAYMENT_STATUS_STREAM_INTERVAL = int(os.getenv('PAYMENT_STATUS_STREAM_INTERVAL', '10'))
+PAYMENT_STATUS_STREAM_DURATION = int(os.getenv('PAYMENT_STATUS_STREAM_DURATION', '300'))
+
+# Per-student dashboard context cache lifetime, in seconds (entries are also
+# dropped whenever the profile, an application or a document changes)
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', '900'))
+
+# Browser cache lifetime of the (static) subject/university autocomplete responses
+AUTOCOMPLETE_MAX_AGE = int(os.getenv('AUTOCOMPLETE_MAX_AGE', '86400'))
+
+# SQL queries a request may run before a warning is logged, and how many recent
+# requests per view the query stats endpoint keeps (per worker process)
+QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '25'))
+QUERY_STATS_WINDOW = int(os.getenv('QUERY_STATS_WINDOW', '500'))
+
 # Message tags for styling
 from django.contrib.messages import constants as message_constants
 MESSAGE_TAGS = {